@@ -12,10 +12,10 @@ import logging
 import random
 import time
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import psutil
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 
 from app.api.websocket import ws_manager
 from app.config import settings
@@ -63,10 +63,14 @@ logger = logging.getLogger(__name__)
 frontend_router = APIRouter()
 
 
-def _to_py_dt(val) -> datetime:
-    """Convert neo4j.time.DateTime (or any value) to a Python datetime."""
+def _to_py_dt(val, default: Optional[datetime] = None) -> datetime:
+    """
+    Convert neo4j.time.DateTime (or any value) to a Python datetime.
+    Unparseable / missing values fall back to *default* – batch builders
+    pass one ``now`` for the whole response – else the current time.
+    """
     if val is None:
-        return datetime.now(timezone.utc)
+        return default or datetime.now(timezone.utc)
     if isinstance(val, datetime):
         return val
     # neo4j.time.DateTime has .to_native()
@@ -86,7 +90,7 @@ def _to_py_dt(val) -> datetime:
     try:
         return datetime.fromisoformat(str(val))
     except Exception:
-        return datetime.now(timezone.utc)
+        return default or datetime.now(timezone.utc)
 
 # ── dependency pointers (filled in by init_frontend_routes) ──
 _neo4j = None
@@ -310,83 +314,104 @@ async def graph_network(
             except ValueError:
                 cids.append(c.strip())
 
+    nodes: Dict[str, GraphNodeOut] = {}
+    # One edge per (source, target): TRANSFERRED_TO is MERGEd per pair, but
+    # concurrent ingests can race a duplicate relationship in – fold those
+    edges: Dict[Tuple[str, str], GraphEdgeOut] = {}
+    now = datetime.now(timezone.utc)  # one clock read for every missing timestamp
+
+    # Records are consumed as they stream in – fields are read straight
+    # off each Record, no per-row dict or materialised row list
+    async def _collect() -> None:
+        async for r in _neo4j.stream_async(_ENRICHED_NETWORK, {"cluster_ids": cids}):
+            sid = r.get("source_id")
+            tid = r.get("target_id")
+
+            if sid and sid not in nodes:
+                s_risk = r.get("source_risk") or 0
+                s_betw = r.get("source_betweenness") or 0
+                s_fi = r.get("source_fan_in") or 0
+                s_fo = r.get("source_fan_out") or 0
+                nodes[sid] = GraphNodeOut(
+                    id=sid,
+                    name=sid,
+                    upi=f"{sid}@upi",
+                    type=_classify_node(s_risk, s_betw, s_fi, s_fo),
+                    risk_score=round(s_risk, 2),
+                    fan_in=s_fi,
+                    fan_out=s_fo,
+                    betweenness_centrality=round(s_betw, 4) if s_betw else 0,
+                    page_rank=round(r.get("source_pagerank") or 0, 6),
+                    device_count=r.get("source_device_cnt") or 1,
+                    city="",
+                    last_active=_to_py_dt(r.get("source_last_active"), now),
+                    is_flagged=s_risk > settings.MEDIUM_RISK_THRESHOLD,
+                    is_blocked=s_risk > settings.HIGH_RISK_THRESHOLD,
+                    cluster=r.get("source_cluster"),
+                    cycle_detected=False,
+                    local_cluster_coeff=round(r.get("source_cc") or 0, 4),
+                )
+
+            if tid and tid not in nodes:
+                t_risk = r.get("target_risk") or 0
+                t_betw = r.get("target_betweenness") or 0
+                t_fi = r.get("target_fan_in") or 0
+                t_fo = r.get("target_fan_out") or 0
+                nodes[tid] = GraphNodeOut(
+                    id=tid,
+                    name=tid,
+                    upi=f"{tid}@upi",
+                    type=_classify_node(t_risk, t_betw, t_fi, t_fo),
+                    risk_score=round(t_risk, 2),
+                    fan_in=t_fi,
+                    fan_out=t_fo,
+                    betweenness_centrality=round(t_betw, 4) if t_betw else 0,
+                    page_rank=round(r.get("target_pagerank") or 0, 6),
+                    device_count=r.get("target_device_cnt") or 1,
+                    city="",
+                    last_active=_to_py_dt(r.get("target_last_active"), now),
+                    is_flagged=t_risk > settings.MEDIUM_RISK_THRESHOLD,
+                    is_blocked=t_risk > settings.HIGH_RISK_THRESHOLD,
+                    cluster=r.get("target_cluster"),
+                    cycle_detected=False,
+                    local_cluster_coeff=round(r.get("target_cc") or 0, 4),
+                )
+
+            if sid and tid:
+                amount = r.get("edge_amount") or 0
+                count = r.get("edge_tx_count") or 1
+                ts = _to_py_dt(r.get("edge_last_tx"), now)
+                e = edges.get((sid, tid))
+                if e is None:
+                    edges[(sid, tid)] = GraphEdgeOut(
+                        source=sid,
+                        target=tid,
+                        amount=amount,
+                        count=count,
+                        timestamp=ts,
+                        is_3_hop=False,
+                    )
+                else:
+                    e.amount += amount
+                    e.count += count
+                    if ts > e.timestamp:
+                        e.timestamp = ts
+
     try:
-        rows = await asyncio.wait_for(
-            _neo4j.read_async(_ENRICHED_NETWORK, {"cluster_ids": cids}),
-            timeout=25.0,
-        )
+        await asyncio.wait_for(_collect(), timeout=25.0)
     except asyncio.TimeoutError:
         logger.warning("graph/network query timed out")
         return {"nodes": [], "edges": []}
 
-    nodes: Dict[str, dict] = {}
-    edges: list = []
-
-    for r in rows:
-        sid = r.get("source_id")
-        tid = r.get("target_id")
-
-        if sid and sid not in nodes:
-            s_risk = r.get("source_risk") or 0
-            s_betw = r.get("source_betweenness") or 0
-            s_fi = r.get("source_fan_in") or 0
-            s_fo = r.get("source_fan_out") or 0
-            nodes[sid] = GraphNodeOut(
-                id=sid,
-                name=sid,
-                upi=f"{sid}@upi",
-                type=_classify_node(s_risk, s_betw, s_fi, s_fo),
-                risk_score=round(s_risk, 2),
-                fan_in=s_fi,
-                fan_out=s_fo,
-                betweenness_centrality=round(s_betw, 4) if s_betw else 0,
-                page_rank=round(r.get("source_pagerank") or 0, 6),
-                device_count=r.get("source_device_cnt") or 1,
-                city="",
-                last_active=_to_py_dt(r.get("source_last_active")),
-                is_flagged=s_risk > settings.MEDIUM_RISK_THRESHOLD,
-                is_blocked=s_risk > settings.HIGH_RISK_THRESHOLD,
-                cluster=r.get("source_cluster"),
-                cycle_detected=False,
-                local_cluster_coeff=round(r.get("source_cc") or 0, 4),
-            ).model_dump(by_alias=True)
-
-        if tid and tid not in nodes:
-            t_risk = r.get("target_risk") or 0
-            t_betw = r.get("target_betweenness") or 0
-            t_fi = r.get("target_fan_in") or 0
-            t_fo = r.get("target_fan_out") or 0
-            nodes[tid] = GraphNodeOut(
-                id=tid,
-                name=tid,
-                upi=f"{tid}@upi",
-                type=_classify_node(t_risk, t_betw, t_fi, t_fo),
-                risk_score=round(t_risk, 2),
-                fan_in=t_fi,
-                fan_out=t_fo,
-                betweenness_centrality=round(t_betw, 4) if t_betw else 0,
-                page_rank=round(r.get("target_pagerank") or 0, 6),
-                device_count=r.get("target_device_cnt") or 1,
-                city="",
-                last_active=_to_py_dt(r.get("target_last_active")),
-                is_flagged=t_risk > settings.MEDIUM_RISK_THRESHOLD,
-                is_blocked=t_risk > settings.HIGH_RISK_THRESHOLD,
-                cluster=r.get("target_cluster"),
-                cycle_detected=False,
-                local_cluster_coeff=round(r.get("target_cc") or 0, 4),
-            ).model_dump(by_alias=True)
-
-        if sid and tid:
-            edges.append(GraphEdgeOut(
-                source=sid,
-                target=tid,
-                amount=r.get("edge_amount") or 0,
-                count=r.get("edge_tx_count") or 1,
-                timestamp=_to_py_dt(r.get("edge_last_tx")),
-                is_3_hop=False,
-            ).model_dump(by_alias=True))
-
-    return {"nodes": list(nodes.values()), "edges": edges}
+    # Models stay models until here: one camelCase JSON pass in Rust via
+    # GraphNetworkOut's prebuilt serializer, no per-node dicts for FastAPI
+    # to walk again
+    return Response(
+        GraphNetworkOut(
+            nodes=list(nodes.values()), edges=list(edges.values()),
+        ).model_dump_json(by_alias=True),
+        media_type="application/json",
+    )
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -447,8 +472,8 @@ async def subgraph(node_id: str):
 
     r = rows[0]
     now = datetime.now(timezone.utc)
-    nodes: list = []
-    edges: list = []
+    nodes: List[SubgraphNodeOut] = []
+    edges: List[SubgraphEdgeOut] = []
     node_ids: set = set()
 
     # Center node (level 0)
@@ -459,7 +484,7 @@ async def subgraph(node_id: str):
         type=_classify_node(center_risk, r.get("center_betweenness") or 0, 0, 0),
         risk_score=center_risk,
         city="", device_count=1, fan_in=0, fan_out=0,
-    ).model_dump(by_alias=True))
+    ))
     node_ids.add(node_id)
 
     # Helper to add node + edges per level
@@ -481,36 +506,36 @@ async def subgraph(node_id: str):
                 city=n.get("city") or "",
                 device_count=n.get("dc") or 1,
                 fan_in=nfi, fan_out=nfo,
-            ).model_dump(by_alias=True))
+            ))
         for e in (e_list or []):
             s = e.get("s")
             t = e.get("t")
             if s and t:
                 amt = e.get("amt") or 0
-                ts = _to_py_dt(e.get("ts"))
+                ts = _to_py_dt(e.get("ts"), now)
                 edges.append(SubgraphEdgeOut(
                     source=s, target=t, amount=amt,
                     timestamp=ts, level=level,
                     velocity=round(amt / 10, 2) if amt else 0,
-                ).model_dump(by_alias=True))
+                ))
 
     _add_level(1, r.get("l1_nodes"), r.get("l1_edges"))
     _add_level(2, r.get("l2_nodes"), r.get("l2_edges"))
 
     # Check for cycles
-    sources = {e["source"] for e in edges}
-    targets = {e["target"] for e in edges}
+    sources = {e.source for e in edges}
+    targets = {e.target for e in edges}
     cycle_nodes_set = sources & targets & {node_id}
 
-    unique_senders = len({e["source"] for e in edges if e.get("level", 0) in [1, 2]})
+    unique_senders = len({e.source for e in edges if e.level in (1, 2)})
     total_paths = len(edges)
     reach = round(total_paths / max(unique_senders, 1), 2)
 
-    return RealtimeSubgraphOut(
+    subgraph_out = RealtimeSubgraphOut(
         tx_id=node_id,
         timestamp=now,
-        nodes=[SubgraphNodeOut(**n) for n in nodes] if False else nodes,  # already dicts
-        edges=[SubgraphEdgeOut(**e) for e in edges] if False else edges,
+        nodes=nodes,
+        edges=edges,
         reachability_score=reach,
         circularity_index=0.8 if cycle_nodes_set else 0.05,
         hop_adjusted_velocity=0,
@@ -520,7 +545,8 @@ async def subgraph(node_id: str):
         betweenness_centrality=round(r.get("center_betweenness") or 0, 4),
         geo_ip_convergence=0,
         identity_density=1,
-    ).model_dump(by_alias=True)
+    )
+    return Response(subgraph_out.model_dump_json(by_alias=True), media_type="application/json")
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -559,12 +585,13 @@ async def node_transactions(node_id: str, limit: int = Query(20, ge=1, le=100)):
         return {"transactions": []}
 
     txs = []
+    now = datetime.now(timezone.utc)
     for r in rows:
         sid = r.get("sender_id") or ""
         rid = r.get("receiver_id") or ""
         txs.append(TransactionOut(
             id=r.get("tx_id") or "",
-            timestamp=_to_py_dt(r.get("timestamp")),
+            timestamp=_to_py_dt(r.get("timestamp"), now),
             sender_name=sid,
             sender_upi=r.get("sender_upi") or f"{sid}@upi",
             receiver_name=rid,
@@ -600,6 +627,7 @@ async def mule_aggregators(limit: int = Query(20, ge=1, le=100)):
         return {"aggregators": []}
 
     aggs = []
+    now = datetime.now(timezone.utc)
     for r in rows[:limit]:
         uid = r.get("user_id") or ""
         aggs.append(AggregatorNodeOut(
@@ -612,7 +640,7 @@ async def mule_aggregators(limit: int = Query(20, ge=1, le=100)):
             fan_out=0,
             total_volume=(r.get("total_inflow") or 0) + (r.get("total_outflow") or 0),
             risk_score=r.get("risk_score") or 0,
-            flagged_at=datetime.now(timezone.utc),
+            flagged_at=now,
             cluster=r.get("community_id") or 0,
             device_count=1,
         ).model_dump(by_alias=True))
@@ -722,12 +750,13 @@ async def asn_transactions(provider: str, limit: int = Query(15, ge=1, le=50)):
         return {"transactions": []}
 
     txs = []
+    now = datetime.now(timezone.utc)
     for r in rows:
         sid = r.get("sender_id") or ""
         rid = r.get("receiver_id") or ""
         txs.append(TransactionOut(
             id=r.get("tx_id") or "",
-            timestamp=_to_py_dt(r.get("timestamp")),
+            timestamp=_to_py_dt(r.get("timestamp"), now),
             sender_name=sid,
             sender_upi=r.get("sender_upi") or f"{sid}@upi",
             receiver_name=rid,
@@ -763,13 +792,14 @@ async def device_clusters(min_accounts: int = Query(2, ge=2)):
         return {"clusters": []}
 
     clusters = []
+    now = datetime.now(timezone.utc)
     for r in rows:
         clusters.append(DeviceClusterOut(
             device_id=r.get("device_id") or "",
             user_count=r.get("user_count") or 0,
             users=r.get("user_ids") or [],
-            first_seen=datetime.now(timezone.utc),
-            last_seen=datetime.now(timezone.utc),
+            first_seen=now,
+            last_seen=now,
             risk_score=r.get("device_score") or 0,
         ).model_dump(by_alias=True))
 
@@ -828,6 +858,7 @@ async def recent_transactions(limit: int = Query(50, ge=1, le=200)):
         return {"transactions": []}
 
     txs = []
+    now = datetime.now(timezone.utc)
     for r in rows:
         sid = r.get("sender_id") or ""
         rid = r.get("receiver_id") or ""
@@ -901,7 +932,7 @@ async def recent_transactions(limit: int = Query(50, ge=1, le=200)):
 
         txs.append(TransactionOut(
             id=r.get("tx_id") or "",
-            timestamp=_to_py_dt(r.get("timestamp")),
+            timestamp=_to_py_dt(r.get("timestamp"), now),
             sender_name=sid,
             sender_upi=s_upi,
             receiver_name=rid,
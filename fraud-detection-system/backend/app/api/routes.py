@@ -59,6 +59,7 @@ async def health():
             "processed": _worker_pool.processed_count if _worker_pool else 0,
             "avg_latency_ms": round(_worker_pool.avg_latency_ms, 2) if _worker_pool else 0,
             "tps": round(_worker_pool.tps, 1) if _worker_pool else 0,
+            "msgs_per_read": round(_worker_pool.msgs_per_read, 1) if _worker_pool else 0,
         },
     }
 
@@ -85,6 +86,7 @@ async def score_transaction(tx: TransactionInput):
         "device_type": tx.device_type.value if tx.device_type else None,
         "app_version": tx.app_version,
         "capability_mask": tx.capability_mask,
+        "capability_mask_int": tx.capability_mask_int,
         "tx_id": tx.tx_id,
         "amount": tx.amount,
         "timestamp": tx.timestamp.isoformat(),
@@ -106,6 +108,7 @@ async def score_transaction(tx: TransactionInput):
         except Exception as exc:
             logger.error("Ingestion failed: %s", exc)
             raise HTTPException(500, f"Ingestion error: {exc}")
+    _risk_engine.baselines.record_transaction(tx.sender_id, tx.amount, tx.timestamp)
 
     if tx.ip_address:
         asn_info = asn_resolve(tx.ip_address)
@@ -117,11 +120,11 @@ async def score_transaction(tx: TransactionInput):
                 "geo_lon": tx.sender_lon,
                 "is_vpn": False,
                 "city": None,
-                "country": asn_info.get("country") or None,
-                "asn": asn_info.get("asn") or None,
-                "asn_type": asn_info.get("asn_class") or None,
-                "asn_org": asn_info.get("org_name") or None,
-                "asn_country": asn_info.get("country") or None,
+                "country": asn_info.country or None,
+                "asn": asn_info.asn or None,
+                "asn_type": asn_info.asn_class or None,
+                "asn_org": asn_info.org_name or None,
+                "asn_country": asn_info.country or None,
                 "user_id": tx.sender_id,
             },
         )
@@ -233,6 +236,30 @@ async def analytics_status():
     return _graph_analyzer.last_run_stats
 
 
+# ── cache stats ──────────────────────────────────────────────
+
+@router.get("/meta/cache-stats")
+async def cache_stats():
+    if not _risk_engine:
+        raise HTTPException(503, "Engine not ready")
+    baselines = _risk_engine.baselines
+    lookups = baselines.hits + baselines.misses
+    device_risk = _risk_engine.device_risk
+    return {
+        **_risk_engine.entity_cache.stats(),
+        "device_memo": {
+            "hits": device_risk.memo_hits,
+            "size": len(device_risk._memo),
+        },
+        "user_baseline": {
+            "hits": baselines.hits,
+            "misses": baselines.misses,
+            "hit_rate": round(baselines.hits / lookups, 4) if lookups else 0.0,
+            "size": len(baselines),
+        },
+    }
+
+
 # ── DB info ──────────────────────────────────────────────────
 
 @router.get("/db/counts")
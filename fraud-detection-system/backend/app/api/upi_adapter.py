@@ -27,6 +27,7 @@ Endpoints:
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import random
 import uuid
@@ -285,7 +286,7 @@ async def ingest_single(tx: UPITransaction):
             tx.sender_upi_id,
             tx.receiver_upi_id,
             tx.amount,
-            stream_id,
+            stream_id.decode(),
         )
         return UPIIngestResponse(accepted=1, stream_ids=[stream_id])
     except Exception as exc:
@@ -307,17 +308,30 @@ async def ingest_batch(batch: UPIBatchRequest):
     errors: List[str] = []
     stream_ids: List[str] = []
 
+    # Transform everything first, then publish concurrently so the XADDs
+    # share pipelined round trips
+    ready = []
     for i, tx in enumerate(batch.transactions):
         try:
-            nested = _upi_to_nested(tx)
-            sid = await publish_transaction(_redis, nested)
-            stream_ids.append(sid)
-            accepted += 1
+            ready.append((i, tx, _upi_to_nested(tx)))
         except Exception as exc:
             failed += 1
             errors.append(f"tx[{i}] ({tx.transaction_id or '?'}): {exc}")
             logger.error("❌ Batch item %d failed: %s", i, exc)
 
+    results = await asyncio.gather(
+        *(publish_transaction(_redis, nested) for _, _, nested in ready),
+        return_exceptions=True,
+    )
+    for (i, tx, _), res in zip(ready, results):
+        if isinstance(res, Exception):
+            failed += 1
+            errors.append(f"tx[{i}] ({tx.transaction_id or '?'}): {res}")
+            logger.error("❌ Batch item %d failed: %s", i, res)
+        else:
+            stream_ids.append(res)
+            accepted += 1
+
     logger.info(
         "📥 UPI batch ingest: %d accepted, %d failed out of %d",
         accepted, failed, len(batch.transactions),
@@ -350,6 +364,7 @@ async def ingest_csv_rows(rows: List[Dict[str, Any]]):
     errors: List[str] = []
     stream_ids: List[str] = []
 
+    ready = []
     for i, row in enumerate(rows):
         try:
             # Map CSV header names to our flat model
@@ -363,15 +378,25 @@ async def ingest_csv_rows(rows: List[Dict[str, Any]]):
                 amount=float(row.get("Amount (INR)") or row.get("amount") or 0),
                 status=row.get("Status") or row.get("status") or "SUCCESS",
             )
-            nested = _upi_to_nested(flat)
-            sid = await publish_transaction(_redis, nested)
-            stream_ids.append(sid)
-            accepted += 1
+            ready.append((i, _upi_to_nested(flat)))
         except Exception as exc:
             failed += 1
             errors.append(f"row[{i}]: {exc}")
             logger.error("❌ CSV row %d failed: %s", i, exc)
 
+    results = await asyncio.gather(
+        *(publish_transaction(_redis, nested) for _, nested in ready),
+        return_exceptions=True,
+    )
+    for (i, _), res in zip(ready, results):
+        if isinstance(res, Exception):
+            failed += 1
+            errors.append(f"row[{i}]: {res}")
+            logger.error("❌ CSV row %d failed: %s", i, res)
+        else:
+            stream_ids.append(res)
+            accepted += 1
+
     logger.info(
         "📥 UPI CSV ingest: %d accepted, %d failed out of %d",
         accepted, failed, len(rows),
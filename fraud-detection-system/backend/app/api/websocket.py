@@ -8,10 +8,10 @@ whenever a transaction exceeds the MEDIUM_RISK_THRESHOLD.
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect
 
 logger = logging.getLogger(__name__)
@@ -35,15 +35,22 @@ class ConnectionManager:
             self._connections.discard(ws)
         logger.info("WS client disconnected (%d total)", len(self._connections))
 
-    async def broadcast(self, data: Dict) -> None:
-        """Send JSON data to every connected client."""
-        payload = json.dumps(data, default=str)
+    async def broadcast(self, data: Dict, payload: Optional[bytes] = None) -> None:
+        """Send JSON data to every connected client.
+
+        *payload* may carry the already-serialised form of *data* so the
+        encode happens once per message regardless of subscriber count.
+        """
+        if payload is None:
+            payload = orjson.dumps(data, default=str)
+        # Text frames: the dashboard JSON.parse()s event.data directly
+        text = payload.decode()
         dead: List[WebSocket] = []
         async with self._lock:
             targets = list(self._connections)
         for ws in targets:
             try:
-                await ws.send_text(payload)
+                await ws.send_text(text)
             except Exception:  # noqa: BLE001
                 dead.append(ws)
         # cleanup
@@ -61,9 +68,9 @@ class ConnectionManager:
 ws_manager = ConnectionManager()
 
 
-async def alert_callback(alert_data: Dict) -> None:
+async def alert_callback(alert_data: Dict, payload: Optional[bytes] = None) -> None:
     """Called by the worker pool when a flagged transaction is scored."""
-    await ws_manager.broadcast(alert_data)
+    await ws_manager.broadcast(alert_data, payload)
 
 
 async def websocket_endpoint(ws: WebSocket) -> None:
@@ -22,12 +22,20 @@ class Settings(BaseSettings):
     NEO4J_USER: str = "neo4j"
     NEO4J_PASSWORD: str = "password123"
     NEO4J_DATABASE: str = "neo4j"
+    # Async pool = max(this, WORKER_COUNT × NEO4J_MAX_CONCURRENT_READS); keep
+    # the server's server.bolt.thread_pool_max_size at or above it
     NEO4J_MAX_POOL_SIZE: int = 50
+    NEO4J_POOL_ACQUIRE_TIMEOUT_SEC: float = 5.0  # fail fast on pool exhaustion
+    NEO4J_MAX_CONCURRENT_READS: int = 4   # per-request fan-out cap (fallback reads)
+    NEO4J_HEALTH_CACHE_TTL_SEC: float = 5.0  # health_check result reuse across polls
+    STARTUP_WARMUP: bool = True           # plan cache / kernels / extractors (off for local dev)
 
     # ── Redis ───────────────────────────────────────────────
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    REDIS_MAX_CONNECTIONS: int = 128     # shared pool: workers + adapters + publishers
+    REDIS_POOL_TIMEOUT_SEC: float = 5.0  # wait for a free pooled connection
 
     # Inbound stream — raw UPI gateway payloads land here
     REDIS_UPI_STREAM_KEY: str = "upi_raw"
@@ -38,10 +46,20 @@ class Settings(BaseSettings):
     REDIS_STREAM_KEY: str = "fraud_queue"
     REDIS_CONSUMER_GROUP: str = "fraud_workers"
     REDIS_ALERTS_CHANNEL: str = "fraud_alerts"
+    # XADDs from concurrent producers share one non-transactional pipeline
+    STREAM_PUBLISH_PIPELINE: bool = True
+    STREAM_PUBLISH_BATCH_MAX: int = 128
+    # Approximate cap on upi_raw / fraud_queue length (0 = unbounded).  Must
+    # stay well above consumer lag: trimmed entries are gone even if pending
+    REDIS_STREAM_MAXLEN: int = 100_000
+    # lz4-frame stream payloads larger than this (needs lz4; 0 = never)
+    STREAM_PAYLOAD_COMPRESS_MIN_BYTES: int = 512
 
     # ── Worker Pool ─────────────────────────────────────────
     WORKER_COUNT: int = 4
-    WORKER_BATCH_SIZE: int = 10
+    WORKER_BATCH_SIZE: int = 512          # XREADGROUP COUNT
+    WORKER_BLOCK_MS: int = 5000           # XREADGROUP BLOCK
+    USE_UVLOOP: bool = True               # libuv event loop (ships with uvicorn[standard])
 
     # ── Graph Analytics (batch interval) ────────────────────
     GRAPH_ANALYTICS_INTERVAL_SEC: int = 5
@@ -108,6 +126,32 @@ class Settings(BaseSettings):
     # Geo-IP distance anomaly (km)
     GEO_IP_DISTANCE_THRESHOLD_KM: float = 500.0
 
+    # ASN density / history snapshot (refreshed each graph-analytics cycle)
+    ASN_CACHE_ACTIVE_WINDOW_SEC: int = 3600   # senders active in this window
+    ASN_CACHE_MAX_USERS: int = 50000
+    ASN_RISK_CACHE_TTL_SEC: int = 300         # per (sender, IP) risk memo
+
+    # Per-sender baseline cache (profile + hour distribution)
+    USER_BASELINE_TTL_SEC: int = 300
+    USER_BASELINE_MAX_USERS: int = 50000
+    # Low-risk fast path: after this many consecutive fused scores below
+    # LOW_RISK_SCORE_MAX (same IP, known device) skip the behavioural Neo4j read
+    LOW_RISK_FASTPATH_STREAK: int = 20
+    LOW_RISK_SCORE_MAX: float = 10.0
+
+    # Micro-batch coalescing of device / graph / velocity reads across
+    # concurrent transactions (one UNWIND query per window)
+    EXTRACTOR_MICRO_BATCH: bool = True
+    BATCH_WINDOW_MS: float = 5.0
+    BATCH_MAX_SIZE: int = 32
+
+    # Redis cache-aside for hot graph entities (dev:{id}, community:{id})
+    DEVICE_INFO_CACHE_TTL_SEC: int = 60
+    COMMUNITY_STATS_CACHE_TTL_SEC: int = 300  # also dropped after each analytics cycle
+    # in-process device bundle memo in front of dev:{id} (hot repeat devices)
+    DEVICE_INFO_MEMO_TTL_SEC: float = 30.0
+    DEVICE_INFO_MEMO_MAX: int = 10000
+
     # Simulation ──────────────────────────────────────────
     SIMULATION_TPS: int = 500
     SIMULATION_TOTAL_TX: int = 10000
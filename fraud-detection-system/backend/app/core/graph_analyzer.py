@@ -8,6 +8,7 @@ Periodically (every GRAPH_ANALYTICS_INTERVAL_SEC):
   4. If GDS is available: projection → Louvain → Betweenness → PageRank → CC
      If GDS is unavailable: pure-Cypher approximations for the above
   5. Triggers collusive fraud pattern detection refresh
+  6. Snapshots ASN densities + active senders' ASN histories
 
 Heavy algorithms run here so the per-transaction fast-path only reads
 pre-computed node properties.
@@ -23,6 +24,8 @@ from typing import Dict, Optional
 from app.neo4j_manager import Neo4jManager
 from app.utils import cypher_queries as CQ
 from app.detection.collusive_fraud import CollusiveFraudDetector
+from app.features.asn_intelligence import refresh_asn_stats
+from app.utils.redis_cache import RedisEntityCache
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -35,9 +38,12 @@ class GraphAnalyzer:
         self,
         neo4j: Neo4jManager,
         collusive_detector: CollusiveFraudDetector,
+        entity_cache: Optional[RedisEntityCache] = None,
     ) -> None:
         self.neo4j = neo4j
         self.collusive = collusive_detector
+        # community:{id} entries go stale once communities are rewritten
+        self.entity_cache = entity_cache
         self._task: Optional[asyncio.Task] = None
         self._running = False
         self.last_run_stats: Dict = {}
@@ -133,6 +139,8 @@ class GraphAnalyzer:
             await self._run_gds_algorithms(stats)
         else:
             await self._run_fallback_algorithms(stats)
+        if self.entity_cache is not None:
+            stats["community_cache_dropped"] = await self.entity_cache.invalidate("community")
 
         # ── Phase 4: Collusive pattern refresh + relay mule ──
         try:
@@ -141,6 +149,12 @@ class GraphAnalyzer:
         except Exception as exc:  # noqa: BLE001
             logger.warning("Collusive detection refresh failed: %s", exc)
 
+        # ── Phase 5: ASN density / history snapshot ──
+        try:
+            stats["asn_cache"] = await refresh_asn_stats(self.neo4j)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("ASN snapshot refresh failed: %s", exc)
+
         elapsed = time.perf_counter() - t0
         stats["elapsed_sec"] = round(elapsed, 3)
         logger.info("📊 Graph analytics cycle complete in %.1f s", elapsed)
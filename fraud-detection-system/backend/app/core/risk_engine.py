@@ -24,7 +24,8 @@ from app.config import settings
 from app.neo4j_manager import Neo4jManager
 from app.features.behavioral import BehavioralFeatureExtractor
 from app.features.dead_account import DeadAccountDetector
-from app.features.device_risk import DeviceRiskExtractor
+from app.features.user_baseline import UserBaselineCache
+from app.features.device_risk import DeviceRiskExtractor, device_flag_strings
 from app.features.graph_intelligence import GraphIntelligenceExtractor
 from app.features.velocity import VelocityExtractor
 from app.detection.mule_detection import MuleDetector
@@ -32,9 +33,22 @@ from app.detection.collusive_fraud import CollusiveFraudDetector
 from app.models.transaction import TransactionInput, RiskLevel, TransactionStatus
 from app.models.risk_score import RiskBreakdown, RiskResponse
 from app.utils.cypher_queries import UPDATE_TX_RISK, UPDATE_USER_RISK
+from app.utils.redis_cache import RedisEntityCache
 
 logger = logging.getLogger(__name__)
 
+# Fusion weights / thresholds, bound once (settings are fixed after startup)
+_PASS_THROUGH_RATIO_THRESHOLD = settings.PASS_THROUGH_RATIO_THRESHOLD
+_DEVICE_ACCOUNT_THRESHOLD = settings.DEVICE_ACCOUNT_THRESHOLD
+_HIGH_RISK_THRESHOLD = settings.HIGH_RISK_THRESHOLD
+_MEDIUM_RISK_THRESHOLD = settings.MEDIUM_RISK_THRESHOLD
+_WEIGHT_GRAPH = settings.WEIGHT_GRAPH
+_WEIGHT_BEHAVIORAL = settings.WEIGHT_BEHAVIORAL
+_WEIGHT_DEVICE = settings.WEIGHT_DEVICE
+_WEIGHT_DEAD_ACCOUNT = settings.WEIGHT_DEAD_ACCOUNT
+_WEIGHT_VELOCITY = settings.WEIGHT_VELOCITY
+_CIRCADIAN_BOOST = settings.CIRCADIAN_NEW_DEVICE_PENALTY - settings.CIRCADIAN_ANOMALY_PENALTY
+
 
 # ── Explainability helpers ───────────────────────────────────
 
@@ -49,7 +63,7 @@ def _build_reason(
     if dead.get("is_dormant") or dead.get("is_first_strike"):
         days = dead.get("days_inactive") or dead.get("days_slept", 0)
         parts.append(f"Account activated after {int(days)} days of inactivity")
-    if dead.get("pass_through_ratio", 0) > settings.PASS_THROUGH_RATIO_THRESHOLD:
+    if dead.get("pass_through_ratio", 0) > _PASS_THROUGH_RATIO_THRESHOLD:
         parts.append(
             f"Pass-through ratio {dead['pass_through_ratio']:.0%} exceeds threshold"
         )
@@ -71,7 +85,7 @@ def _build_reason(
 
     # Device risk (v3 signals)
     acc_cnt = device.get("account_count", 0)
-    if acc_cnt >= settings.DEVICE_ACCOUNT_THRESHOLD:
+    if acc_cnt >= _DEVICE_ACCOUNT_THRESHOLD:
         parts.append(f"Shared device with {acc_cnt} other accounts")
     if device.get("new_device_flag"):
         parts.append("Transaction from a new/unseen device")
@@ -117,11 +131,11 @@ def _build_reason(
     # Velocity
     if vel.get("tx_per_min", 0) > 5:
         parts.append(f"Velocity: {vel['tx_per_min']:.1f} tx/min in last window")
-    if vel.get("outflow_inflow_ratio", 0) > settings.PASS_THROUGH_RATIO_THRESHOLD:
+    if vel.get("outflow_inflow_ratio", 0) > _PASS_THROUGH_RATIO_THRESHOLD:
         parts.append("Rapid fund relay pattern")
 
     if not parts:
-        if fused >= settings.HIGH_RISK_THRESHOLD:
+        if fused >= _HIGH_RISK_THRESHOLD:
             parts.append("Multiple minor indicators combined above threshold")
         else:
             return "No significant risk indicators"
@@ -132,15 +146,36 @@ def _build_reason(
 class RiskEngine:
     """Central risk scoring engine – one instance per app."""
 
-    def __init__(self, neo4j: Neo4jManager) -> None:
+    def __init__(
+        self,
+        neo4j: Neo4jManager,
+        redis_client=None,
+        *,
+        entity_cache: Optional[RedisEntityCache] = None,
+        device_risk: Optional[DeviceRiskExtractor] = None,
+        graph_intel: Optional[GraphIntelligenceExtractor] = None,
+        velocity: Optional[VelocityExtractor] = None,
+    ) -> None:
+        """
+        Stateless extractors built once at startup (``main.lifespan``) may be
+        passed in and are shared; anything omitted is constructed here.
+        """
         self.neo4j = neo4j
 
+        # Redis cache-aside for device info / community stats
+        self.entity_cache = (
+            entity_cache if entity_cache is not None else RedisEntityCache(redis_client)
+        )
+
+        # per-sender profile / hour-distribution cache (patched at ingest)
+        self.baselines = UserBaselineCache()
+
         # feature extractors
-        self.behavioral = BehavioralFeatureExtractor(neo4j)
-        self.dead_account = DeadAccountDetector(neo4j)
-        self.device_risk = DeviceRiskExtractor(neo4j)
-        self.graph_intel = GraphIntelligenceExtractor(neo4j)
-        self.velocity = VelocityExtractor(neo4j)
+        self.behavioral = BehavioralFeatureExtractor(neo4j, self.baselines)
+        self.dead_account = DeadAccountDetector(neo4j, self.baselines)
+        self.device_risk = device_risk or DeviceRiskExtractor(neo4j, self.entity_cache)
+        self.graph_intel = graph_intel or GraphIntelligenceExtractor(neo4j, self.entity_cache)
+        self.velocity = velocity or VelocityExtractor(neo4j)
 
         # detection modules
         self.mule_detector = MuleDetector()
@@ -149,6 +184,24 @@ class RiskEngine:
     def set_collusive_detector(self, detector: CollusiveFraudDetector) -> None:
         self.collusive_detector = detector
 
+    async def warm_up(self) -> None:
+        """
+        One read-only pass through every extractor with a sentinel id, so
+        the async driver pool, micro-batchers and scoring kernels are hot
+        before the first real transaction.  Nothing is written.
+        """
+        import asyncio
+
+        sentinel = "__warmup__"
+        await asyncio.gather(
+            self.behavioral.compute(sentinel, 1.0, datetime.now(), receiver_id=sentinel),
+            self.dead_account.compute(sentinel, 1.0),
+            self.device_risk.compute(device_id=sentinel, sender_id=sentinel, amount=1.0),
+            self.graph_intel.compute(sentinel),
+            self.velocity.compute(sentinel, 1.0),
+        )
+        self.baselines.invalidate(sentinel)
+
     # ── main entry point ─────────────────────────────────────
 
     async def score_transaction(self, tx: TransactionInput) -> RiskResponse:
@@ -183,6 +236,7 @@ class RiskEngine:
                 device_os=tx.device_os,
                 credential_type=tx.credential_type.value if tx.credential_type else None,
                 credential_sub_type=tx.credential_sub_type.value if tx.credential_sub_type else None,
+                capability_mask_int=tx.capability_mask_int,
             )
         )
         graph_task = asyncio.create_task(
@@ -206,23 +260,24 @@ class RiskEngine:
         # 2b. Circadian + New Device compound boost
         #     If circadian anomaly detected AND device is new, amplify behavioral
         if behav.get("circadian_anomaly") and device.get("new_device_flag"):
-            circadian_boost = settings.CIRCADIAN_NEW_DEVICE_PENALTY - settings.CIRCADIAN_ANOMALY_PENALTY
+            circadian_boost = _CIRCADIAN_BOOST
             s_behavioral = min(s_behavioral + circadian_boost, 100.0)
 
         # 3. Weighted fusion
         fused = (
-            settings.WEIGHT_GRAPH * s_graph
-            + settings.WEIGHT_BEHAVIORAL * s_behavioral
-            + settings.WEIGHT_DEVICE * s_device
-            + settings.WEIGHT_DEAD_ACCOUNT * s_dead
-            + settings.WEIGHT_VELOCITY * s_velocity
+            _WEIGHT_GRAPH * s_graph
+            + _WEIGHT_BEHAVIORAL * s_behavioral
+            + _WEIGHT_DEVICE * s_device
+            + _WEIGHT_DEAD_ACCOUNT * s_dead
+            + _WEIGHT_VELOCITY * s_velocity
         )
         fused = min(fused, 100.0)
+        self.baselines.record_score(tx.sender_id, fused)
 
         # 4. Risk level
-        if fused >= settings.HIGH_RISK_THRESHOLD:
+        if fused >= _HIGH_RISK_THRESHOLD:
             risk_level = RiskLevel.HIGH
-        elif fused >= settings.MEDIUM_RISK_THRESHOLD:
+        elif fused >= _MEDIUM_RISK_THRESHOLD:
             risk_level = RiskLevel.MEDIUM
         else:
             risk_level = RiskLevel.LOW
@@ -231,7 +286,7 @@ class RiskEngine:
         flags: list[str] = []
         flags.extend(behav.get("flags", []))
         flags.extend(dead.get("flags", []))
-        flags.extend(device.get("flags", []))
+        flags.extend(device_flag_strings(device))
         flags.extend(graph.get("flags", []))
         flags.extend(vel.get("flags", []))
 
@@ -241,9 +296,9 @@ class RiskEngine:
 
         # Mule evaluation
         mule = self.mule_detector.evaluate(behav, dead, device, graph, vel, fused)
-        if mule["is_mule"]:
-            flags.append(f"MULE SUSPECTED (confidence={mule['confidence']:.0%})")
-            flags.extend(mule["reasons"])
+        if mule.is_mule:
+            flags.append(f"MULE SUSPECTED (confidence={mule.confidence:.0%})")
+            flags.extend(mule.reasons)
 
         # Deduplicate flags
         flags = list(dict.fromkeys(flags))
@@ -274,21 +329,18 @@ class RiskEngine:
             else TransactionStatus.COMPLETED
         )
         try:
-            await self.neo4j.write_async(
-                UPDATE_TX_RISK,
-                {
+            # tx + sender risk share one transaction (one commit round trip)
+            await self.neo4j.write_many_async([
+                (UPDATE_TX_RISK, {
                     "tx_id": tx.tx_id,
                     "risk_score": round(fused, 2),
                     "status": status.value,
                     "reason": reason,
                     "sender_lat": tx.sender_lat,
                     "sender_lon": tx.sender_lon,
-                },
-            )
-            await self.neo4j.write_async(
-                UPDATE_USER_RISK,
-                {"user_id": tx.sender_id, "risk_score": round(fused, 2)},
-            )
+                }),
+                (UPDATE_USER_RISK, {"user_id": tx.sender_id, "risk_score": round(fused, 2)}),
+            ])
         except Exception as exc:  # noqa: BLE001
             logger.warning("Failed to persist risk score: %s", exc)
 
@@ -2,7 +2,10 @@
 Async worker pool – optimised for 500 TPS.
 
 Strategy: "Decoupled Write"
-  1. Ingest transaction into Neo4j (lock-free hot path)
+  1. Ingest transaction into Neo4j (lock-free hot path), then the
+     IP-intelligence write – committed before scoring, because
+     unique_ip_count, IP rotation and ASN drift read the ACCESSED_FROM
+     edge it creates
   2. Score via RiskEngine (parallel reads, no writes)
   3. Write-back risk score (fire-and-forget)
 
@@ -14,19 +17,21 @@ Deadlock mitigation:
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import math
 import random
 import time
 from typing import Any, Callable, Dict, List, Optional
 
+import orjson
+
 from app.config import settings
 from app.neo4j_manager import Neo4jManager
 from app.models.transaction import TransactionInput
 from app.core.risk_engine import RiskEngine
 from app.utils.cypher_queries import INGEST_TRANSACTION, INGEST_TRANSACTION_SAFE, INGEST_IP, UPDATE_TX_RISK
 from app.features.asn_intelligence import resolve as asn_resolve
+from app.streaming.redis_stream import stream_payload
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +50,33 @@ def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
 
+# Static part of the dashboard "behavioralSignature" radar – only
+# velocityBurst varies per transaction.
+_BEHAV_TEMPLATE: Dict[str, float] = {
+    "amountEntropy": 50,
+    "fanInRatio": 25,
+    "temporalAlignment": 80,
+    "deviceAging": 85,
+    "networkDiversity": 20,
+    "velocityBurst": 0,
+    "circadianBitmask": 80,
+    "ispConsistency": 85,
+}
+
+_RULE_SEVERITY = "WARNING"
+_MAX_TRIGGERED_RULES = 5
+
+
+def _build_triggered_rules(flags: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Map the first few risk flags onto the frontend TriggeredRule shape."""
+    if not flags:
+        return []
+    return [
+        {"severity": _RULE_SEVERITY, "rule": f, "detail": "", "scoreImpact": 0}
+        for f in flags[:_MAX_TRIGGERED_RULES]
+    ]
+
+
 def _build_geo_evidence(
     dev_lat: float, dev_lon: float,
     ip_lat: float, ip_lon: float,
@@ -86,7 +118,7 @@ class WorkerPool:
         self.neo4j = neo4j
         self.risk_engine = risk_engine
         self.redis = redis_client
-        self.alert_callback = alert_callback  # called with RiskResponse dict
+        self.alert_callback = alert_callback  # called with (enriched dict, JSON bytes)
 
         self._tasks: List[asyncio.Task] = []
         self._running = False
@@ -96,6 +128,8 @@ class WorkerPool:
         self.total_latency_ms = 0.0
         self.deadlock_retries = 0
         self.ingest_errors = 0
+        self.read_calls = 0             # non-empty XREADGROUP replies
+        self.read_messages = 0
         self._start_time: float = 0
 
     # ── lifecycle ────────────────────────────────────────────
@@ -182,6 +216,13 @@ class WorkerPool:
         elapsed = time.time() - self._start_time if self._start_time else 1
         return self.processed_count / max(elapsed, 1)
 
+    @property
+    def msgs_per_read(self) -> float:
+        """Average batch size returned by XREADGROUP (batch amortisation)."""
+        if self.read_calls == 0:
+            return 0
+        return self.read_messages / self.read_calls
+
     # ── deadlock-safe write ──────────────────────────────────
 
     async def _ingest_with_retry(self, query: str, params: Dict) -> None:
@@ -237,21 +278,35 @@ class WorkerPool:
                     consumername=name,
                     streams={settings.REDIS_STREAM_KEY: ">"},
                     count=settings.WORKER_BATCH_SIZE,
-                    block=1000,  # ms
+                    block=settings.WORKER_BLOCK_MS,
                 )
                 if not messages:
                     _idle_ticks += 1
-                    if _idle_ticks % 30 == 0:  # log every 30s of idle
-                        logger.debug("%s idle for %ds, waiting for messages...", name, _idle_ticks)
+                    if _idle_ticks % 6 == 0:  # log every ~30s of idle
+                        logger.debug("%s idle for %ds, waiting for messages...",
+                                     name, _idle_ticks * settings.WORKER_BLOCK_MS // 1000)
                     continue
 
                 _idle_ticks = 0
-                for stream_name, entries in messages:
-                    if _first_msg:
-                        logger.info("📨 %s received first batch (%d msgs)", name, len(entries))
-                        _first_msg = False
-                    for msg_id, data in entries:
-                        await self._process_message(name, msg_id, data)
+                self.read_calls += 1
+                ack_ids: List[bytes] = []
+                try:
+                    for stream_name, entries in messages:
+                        self.read_messages += len(entries)
+                        if _first_msg:
+                            logger.info("📨 %s received first batch (%d msgs)", name, len(entries))
+                            _first_msg = False
+                        for msg_id, data in entries:
+                            if await self._process_message(name, msg_id, data):
+                                ack_ids.append(msg_id)
+                finally:
+                    # One multi-ID XACK per batch; failed messages stay pending
+                    if ack_ids:
+                        await self.redis.xack(
+                            settings.REDIS_STREAM_KEY,
+                            settings.REDIS_CONSUMER_GROUP,
+                            *ack_ids,
+                        )
 
             except asyncio.CancelledError:
                 break
@@ -261,27 +316,34 @@ class WorkerPool:
 
     async def _process_message(
         self, worker_name: str, msg_id: bytes, data: Dict[bytes, bytes]
-    ) -> None:
+    ) -> bool:
+        """Ingest, score and alert one message.  Returns True if it can be ACKed."""
         t0 = time.perf_counter()
 
         try:
-            # Decode Redis hash fields
-            decoded = {
-                k.decode() if isinstance(k, bytes) else k:
-                v.decode() if isinstance(v, bytes) else v
-                for k, v in data.items()
-            }
-
-            # Parse payload (stored as JSON in "payload" field)
-            if "payload" in decoded:
-                tx_data = json.loads(decoded["payload"])
+            # Parse + validate the payload (JSON in the "payload" field)
+            # straight from bytes in pydantic-core – no intermediate dict.
+            # Adapter metadata (sender/receiver names from the UPI server)
+            # rides in its own "meta" field.
+            raw = stream_payload(data)
+            meta_raw = data.get(b"meta", data.get("meta"))
+            if isinstance(raw, bytes) and b'"_meta"' not in raw:
+                tx = TransactionInput.model_validate_json(raw)
+                _meta = orjson.loads(meta_raw) if meta_raw else {}
             else:
-                tx_data = decoded
-
-            # Extract adapter metadata (sender/receiver names from UPI server)
-            _meta = tx_data.pop("_meta", {}) if isinstance(tx_data, dict) else {}
-
-            tx = TransactionInput(**tx_data)
+                if raw is not None:
+                    # queued before meta moved out of the payload
+                    tx_data = orjson.loads(raw)
+                else:
+                    # Decode Redis hash fields
+                    tx_data = {
+                        k.decode() if isinstance(k, bytes) else k:
+                        v.decode() if isinstance(v, bytes) else v
+                        for k, v in data.items()
+                    }
+                _meta = tx_data.pop("_meta", {}) if isinstance(tx_data, dict) else {}
+                tx = TransactionInput.model_validate(tx_data)
+            ts_iso = tx.timestamp.isoformat()
 
             # ── Step 1: Ingest (lock-free hot path with retry) ──
             ingest_params = {
@@ -294,9 +356,10 @@ class WorkerPool:
                 "device_type": tx.device_type.value if tx.device_type else None,
                 "app_version": tx.app_version,
                 "capability_mask": tx.capability_mask,
+                "capability_mask_int": tx.capability_mask_int,
                 "tx_id": tx.tx_id,
                 "amount": tx.amount,
-                "timestamp": tx.timestamp.isoformat(),
+                "timestamp": ts_iso,
                 "currency": tx.currency,
                 "txn_type": tx.txn_type.value,
                 "credential_type": tx.credential_type.value if tx.credential_type else None,
@@ -305,13 +368,13 @@ class WorkerPool:
                 "mcc_code": tx.mcc_code,
             }
             await self._ingest_with_retry(INGEST_TRANSACTION, ingest_params)
+            self.risk_engine.baselines.record_transaction(tx.sender_id, tx.amount, tx.timestamp)
 
             # ── Step 1b: IP intelligence write (MMDB-enriched) ──
             ip_geo_lat = 0.0
             ip_geo_lon = 0.0
             ip_city = ""
             ip_country = ""
-            asn_info: Dict = {}
             if tx.ip_address:
                 asn_info = asn_resolve(tx.ip_address)
                 _dev_lat = tx.sender_lat or 0.0
@@ -321,7 +384,7 @@ class WorkerPool:
                 # Foreign / cloud IPs get resolved to a genuinely distant
                 # gateway city so the geodesic-arc map shows realistic
                 # impossible-travel evidence instead of a ~20 km jitter.
-                _asn_class = (asn_info.get("asn_class") or "").upper()
+                _asn_class = asn_info.asn_class.upper()
                 _is_foreign = _asn_class in ("FOREIGN", "HOSTING", "SATELLITE")
                 _is_cloud   = _asn_class in ("INDIAN_CLOUD", "CLOUD")
 
@@ -357,24 +420,30 @@ class WorkerPool:
                     ip_geo_lon = _dev_lon + random.uniform(-0.3, 0.3)
 
                 if not ip_city:
-                    ip_city = asn_info.get("org_name", "")[:30] if asn_info.get("valid") else ""
-                ip_country = asn_info.get("country") or ""
-                await self.neo4j.write_async(
-                    INGEST_IP,
-                    {
-                        "ip_address": tx.ip_address,
-                        "geo_lat": ip_geo_lat,
-                        "geo_lon": ip_geo_lon,
-                        "is_vpn": False,
-                        "city": ip_city or None,
-                        "country": asn_info.get("country") or None,
-                        "asn": asn_info.get("asn") or None,
-                        "asn_type": asn_info.get("asn_class") or None,
-                        "asn_org": asn_info.get("org_name") or None,
-                        "asn_country": asn_info.get("country") or None,
-                        "user_id": tx.sender_id,
-                    },
-                )
+                    ip_city = asn_info.org_name[:30] if asn_info.valid else ""
+                ip_country = asn_info.country or ""
+                ip_params = {
+                    "ip_address": tx.ip_address,
+                    "geo_lat": ip_geo_lat,
+                    "geo_lon": ip_geo_lon,
+                    "is_vpn": False,
+                    "city": ip_city or None,
+                    "country": asn_info.country or None,
+                    "asn": asn_info.asn or None,
+                    "asn_type": asn_info.asn_class or None,
+                    "asn_org": asn_info.org_name or None,
+                    "asn_country": asn_info.country or None,
+                    "user_id": tx.sender_id,
+                }
+
+                # Must commit before scoring: the behavioral bundle, IP
+                # rotation and ASN-drift reads all traverse the sender's
+                # ACCESSED_FROM edges, which should include this IP.  A
+                # failed IP write does not drop the tx.
+                try:
+                    await self.neo4j.write_async(INGEST_IP, ip_params)
+                except Exception as exc:
+                    logger.warning("Failed to ingest IP for %s: %s", tx.tx_id, exc)
 
             # ── Step 2: Score (parallel reads, no Neo4j writes) ──
             risk_response = await self.risk_engine.score_transaction(tx)
@@ -397,14 +466,17 @@ class WorkerPool:
 
             # ── Step 3: Push alert via WebSocket ──
             if self.alert_callback:
+                behav_sig = _BEHAV_TEMPLATE.copy()
+                behav_sig["velocityBurst"] = min(risk_response.breakdown.velocity, 100)
+
                 # Build enriched transaction dict matching frontend TransactionOut shape
                 enriched = {
                     "id": tx.tx_id,
-                    "timestamp": tx.timestamp.isoformat(),
+                    "timestamp": ts_iso,
                     "senderName": _meta.get("sender_name") or tx.sender_id,
-                    "senderUPI": tx.upi_id_sender or f"{tx.sender_id}@upi",
+                    "senderUPI": tx.upi_id_sender or (tx.sender_id + "@upi"),
                     "receiverName": _meta.get("receiver_name") or tx.receiver_id,
-                    "receiverUPI": tx.upi_id_receiver or f"{tx.receiver_id}@upi",
+                    "receiverUPI": tx.upi_id_receiver or (tx.receiver_id + "@upi"),
                     "amount": tx.amount,
                     "status": tx_status,
                     "riskScore": risk_response.risk_score,
@@ -419,10 +491,7 @@ class WorkerPool:
                         "deadAccount": risk_response.breakdown.dead_account,
                         "velocity": risk_response.breakdown.velocity,
                     },
-                    "triggeredRules": [
-                        {"severity": "WARNING", "rule": f, "detail": "", "scoreImpact": 0}
-                        for f in (risk_response.flags or [])[:5]
-                    ],
+                    "triggeredRules": _build_triggered_rules(risk_response.flags),
                     "geoEvidence": _build_geo_evidence(
                         tx.sender_lat or 0,
                         tx.sender_lon or 0,
@@ -430,28 +499,14 @@ class WorkerPool:
                         ip_geo_lon,
                         ip_city,
                     ),
-                    "behavioralSignature": {
-                        "amountEntropy": 50,
-                        "fanInRatio": 25,
-                        "temporalAlignment": 80,
-                        "deviceAging": 85,
-                        "networkDiversity": 20,
-                        "velocityBurst": min(risk_response.breakdown.velocity, 100),
-                        "circadianBitmask": 80,
-                        "ispConsistency": 85,
-                    },
+                    "behavioralSignature": behav_sig,
                     "semanticAlert": risk_response.reason or "",
                     "probabilityMatrix": [],
                 }
-                await self.alert_callback(enriched)
-
-            # ── Step 4: ACK message ──
-            await self.redis.xack(
-                settings.REDIS_STREAM_KEY,
-                settings.REDIS_CONSUMER_GROUP,
-                msg_id,
-            )
+                # Serialise once here; subscribers all reuse the same bytes
+                await self.alert_callback(enriched, orjson.dumps(enriched, default=str))
 
+            # ── Step 4: ACK (batched by the caller) ──
             elapsed_ms = (time.perf_counter() - t0) * 1000
             self.processed_count += 1
             self.total_latency_ms += elapsed_ms
@@ -462,17 +517,23 @@ class WorkerPool:
                     tx.tx_id, risk_response.risk_score, elapsed_ms,
                 )
 
-            if self.processed_count % 50 == 0:
+            if self.processed_count % 50 == 0 and logger.isEnabledFor(logging.INFO):
                 logger.info(
-                    "📈 %s | processed=%d | avg=%.1fms | tps=%.0f | retries=%d | errors=%d",
+                    "📈 %s | processed=%d | avg=%.1fms | tps=%.0f | batch=%.1f | retries=%d | errors=%d",
                     worker_name,
                     self.processed_count,
                     self.avg_latency_ms,
                     self.tps,
+                    self.msgs_per_read,
                     self.deadlock_retries,
                     self.ingest_errors,
                 )
+            return True
 
         except Exception as exc:  # noqa: BLE001
             self.ingest_errors += 1
-            logger.error("❌ Failed to process msg %s: %s", msg_id, exc, exc_info=True)
+            # Tracebacks only at DEBUG – a malformed-payload flood would
+            # otherwise spend most of its CPU formatting stack traces.
+            logger.error("❌ Failed to process msg %s: %s", msg_id, exc,
+                         exc_info=logger.isEnabledFor(logging.DEBUG))
+            return False
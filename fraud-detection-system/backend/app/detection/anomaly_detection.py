@@ -7,8 +7,9 @@ extractors (z-score, IQR, Mahalanobis, isolation-like scoring).
 
 from __future__ import annotations
 
+import bisect
 import math
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
 
 import numpy as np
 
@@ -24,11 +25,27 @@ def z_score(value: float, values: List[float]) -> float:
     return (value - mean) / std
 
 
+def quartiles(values: Sequence[float]) -> Tuple[float, float]:
+    """
+    (Q1, Q3) with numpy's default linear interpolation, via one
+    introselect (np.partition) on the four bracketing ranks – no full sort.
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    last = arr.size - 1
+    p1, p3 = 0.25 * last, 0.75 * last
+    i1, i3 = int(p1), int(p3)
+    j1, j3 = min(i1 + 1, last), min(i3 + 1, last)
+    part = np.partition(arr, sorted({i1, j1, i3, j3}))
+    q1 = part[i1] + (part[j1] - part[i1]) * (p1 - i1)
+    q3 = part[i3] + (part[j3] - part[i3]) * (p3 - i3)
+    return float(q1), float(q3)
+
+
 def iqr_outlier(value: float, values: List[float], k: float = 1.5) -> bool:
     """Return True if *value* lies outside Q1 - k*IQR … Q3 + k*IQR."""
     if len(values) < 4:
         return False
-    q1, q3 = float(np.percentile(values, 25)), float(np.percentile(values, 75))
+    q1, q3 = (float(q) for q in np.percentile(values, (25, 75)))
     iqr = q3 - q1
     return value < (q1 - k * iqr) or value > (q3 + k * iqr)
 
@@ -41,6 +58,14 @@ def mahalanobis_distance(
     return float(np.sqrt(diff @ cov_inv @ diff))
 
 
+def mahalanobis_batch(
+    X: np.ndarray, mean: np.ndarray, cov_inv: np.ndarray
+) -> np.ndarray:
+    """Mahalanobis distance of each row of an ``(N, d)`` array in one pass."""
+    D = np.asarray(X, dtype=np.float64) - mean
+    return np.sqrt(np.einsum("ij,jk,ik->i", D, cov_inv, D))
+
+
 def rolling_stats(values: List[float], window: int = 25) -> Tuple[float, float]:
     """Return (mean, std) over the most recent *window* values."""
     subset = values[:window]
@@ -49,19 +74,32 @@ def rolling_stats(values: List[float], window: int = 25) -> Tuple[float, float]:
     return float(np.mean(subset)), float(np.std(subset))
 
 
-def time_velocity(timestamps_sec: List[float], window_sec: float = 60.0) -> float:
-    """Count of events within the last *window_sec* seconds."""
+def time_velocity(timestamps_sec: Sequence[float], window_sec: float = 60.0) -> float:
+    """Count of events within the last *window_sec* seconds.
+
+    *timestamps_sec* must be sorted newest-first, so the events inside the
+    window form a prefix and the cutoff is found by binary search.
+    """
     if not timestamps_sec:
         return 0.0
     ref = timestamps_sec[0]  # most recent
-    return float(sum(1 for t in timestamps_sec if (ref - t) <= window_sec))
+    # Negating the key turns the descending list into an ascending one:
+    # (ref - t) <= window  ⇔  -t <= window - ref
+    return float(bisect.bisect_right(timestamps_sec, window_sec - ref, key=lambda t: -t))
 
 
-def burst_detect(timestamps_sec: List[float], threshold: int = 10, window_sec: float = 60.0) -> bool:
+def burst_detect(timestamps_sec: Sequence[float], threshold: int = 10, window_sec: float = 60.0) -> bool:
     """Return True if more than *threshold* events happened in *window_sec*."""
     return time_velocity(timestamps_sec, window_sec) >= threshold
 
 
 def normalize_score(value: float, min_val: float = 0, max_val: float = 100) -> float:
     """Clamp and normalise a raw score to [0, 100]."""
-    return max(min_val, min(value, max_val))
+    return min_val if value < min_val else (max_val if value > max_val else value)
+
+
+def normalize_score_vec(
+    values: np.ndarray, min_val: float = 0.0, max_val: float = 100.0
+) -> np.ndarray:
+    """Vectorised :func:`normalize_score` for a batch of raw scores."""
+    return np.minimum(max_val, np.maximum(min_val, values))
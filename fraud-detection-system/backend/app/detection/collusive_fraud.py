@@ -14,14 +14,21 @@ Results are cached and refreshed every graph-analytics batch cycle.
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Set
+from collections import OrderedDict
+from typing import Any, Dict, List, Set, Tuple
+
+from neo4j.exceptions import ClientError
 
 from app.neo4j_manager import Neo4jManager
 from app.utils import cypher_queries as CQ
 
 logger = logging.getLogger(__name__)
 
+# Max users whose get_user_flags result is memoised between refreshes
+_FLAGS_CACHE_SIZE = 200_000
+
 
 class CollusiveFraudDetector:
     """Detect collusive fraud patterns in the transaction graph."""
@@ -37,10 +44,21 @@ class CollusiveFraudDetector:
         self.star_hubs: List[Dict] = []
         self.relay_mules: List[Dict] = []
 
-        # lookup: user_id → set of cluster_ids they belong to
-        self._user_clusters: Dict[str, set] = {}
+        # lookup: user_id → cluster_ids they belong to (usually 1-2, so a list)
+        self._user_clusters: Dict[str, List[str]] = {}
+        # lookup: user_id → primary (first-seen) cluster_id
+        self._user_primary_cluster: Dict[str, str] = {}
         # lookup: user_id → relay info (for O(1) per-tx)
         self._relay_mule_ids: Set[str] = set()
+        # O(1) per-tx lookups for routers / hubs
+        self._router_ids: Set[str] = set()
+        self._hub_by_id: Dict[str, Dict] = {}
+        # user_id → ring id (first ring seen), for per-flag ring detail
+        self._ring_lookup: Dict[str, str] = {}
+        # memo: user_id → flags, valid until the next refresh (LRU-capped)
+        self._flags_cache: OrderedDict[str, Tuple[str, ...]] = OrderedDict()
+        # cleared if the server rejects DETECT_ALL_COLLUSION (e.g. no nested CALL)
+        self._use_combined_query = True
 
     # ── batch refresh (called every GRAPH_ANALYTICS_INTERVAL) ──
 
@@ -48,67 +66,88 @@ class CollusiveFraudDetector:
         """Re-run all detection queries and update caches."""
         counts: Dict[str, int] = {}
 
-        try:
-            self.fraud_islands = await self.neo4j.read_async(
-                CQ.DETECT_FRAUD_ISLANDS, {"min_avg_risk": 40}
-            )
-            counts["fraud_islands"] = len(self.fraud_islands)
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("fraud_islands query failed: %s", exc)
-            counts["fraud_islands"] = 0
-
-        try:
-            self.money_routers = await self.neo4j.read_async(
-                CQ.DETECT_MONEY_ROUTERS, {"min_betweenness": 0.01}
-            )
-            counts["money_routers"] = len(self.money_routers)
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("money_routers query failed: %s", exc)
-            counts["money_routers"] = 0
-
-        try:
-            self.circular_flows = await self.neo4j.read_async(CQ.DETECT_CIRCULAR_FLOWS)
-            counts["circular_flows"] = len(self.circular_flows)
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("circular_flows query failed: %s", exc)
-            counts["circular_flows"] = 0
-
-        try:
-            self.rapid_chains = await self.neo4j.read_async(CQ.DETECT_RAPID_CHAINS)
-            counts["rapid_chains"] = len(self.rapid_chains)
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("rapid_chains query failed: %s", exc)
-            counts["rapid_chains"] = 0
-
-        try:
-            self.star_hubs = await self.neo4j.read_async(
-                CQ.DETECT_STAR_HUBS, {"min_in_degree": 5, "min_out_degree": 5}
-            )
-            counts["star_hubs"] = len(self.star_hubs)
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("star_hubs query failed: %s", exc)
-            counts["star_hubs"] = 0
-
-        # ── relay mule detection (flow ratio analysis) ──
-        try:
-            self.relay_mules = await self.neo4j.read_async(
-                CQ.DETECT_RELAY_MULE, {"min_flow_ratio": 0.75}
+        queries = (
+            ("fraud_islands", CQ.DETECT_FRAUD_ISLANDS, {"min_avg_risk": 40}),
+            ("money_routers", CQ.DETECT_MONEY_ROUTERS, {"min_betweenness": 0.01}),
+            ("circular_flows", CQ.DETECT_CIRCULAR_FLOWS, None),
+            ("rapid_chains", CQ.DETECT_RAPID_CHAINS, None),
+            ("star_hubs", CQ.DETECT_STAR_HUBS, {"min_in_degree": 5, "min_out_degree": 5}),
+            # relay mule detection (flow ratio analysis)
+            ("relay_mules", CQ.DETECT_RELAY_MULE, {"min_flow_ratio": 0.75}),
+        )
+
+        # One transaction / round trip for all six detectors …
+        results: List[Any] = []
+        if self._use_combined_query:
+            try:
+                combined_params: Dict[str, Any] = {}
+                for _, _, params in queries:
+                    combined_params.update(params or {})
+                rows = await self.neo4j.read_async(CQ.DETECT_ALL_COLLUSION, combined_params)
+                row = rows[0] if rows else {}
+                results = [row.get(name) or [] for name, _, _ in queries]
+            except ClientError as exc:
+                logger.warning(
+                    "Combined collusion query rejected – using per-query refresh: %s", exc,
+                )
+                self._use_combined_query = False
+            except Exception as exc:  # noqa: BLE001
+                # transient (timeout, leader switch): retried next refresh
+                logger.warning(
+                    "Combined collusion query failed – per-query refresh this cycle: %s", exc,
+                )
+
+        if not results:
+            # … or the six independent queries run concurrently on separate
+            # sessions, which keeps per-query failure isolation.
+            results = await asyncio.gather(
+                *(self.neo4j.read_async(query, params) for _, query, params in queries),
+                return_exceptions=True,
             )
-            counts["relay_mules"] = len(self.relay_mules)
-            # rebuild relay lookup
+
+        for (name, _, _), result in zip(queries, results):
+            if isinstance(result, Exception):
+                # keep the previous cycle's cache on failure
+                logger.warning("%s query failed: %s", name, result)
+                counts[name] = 0
+                continue
+            setattr(self, name, result)
+            counts[name] = len(result)
+
+        # rebuild relay lookup
+        if not isinstance(results[-1], Exception):
             self._relay_mule_ids = {
                 r.get("user_id") for r in self.relay_mules if r.get("user_id")
             }
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("relay_mules query failed: %s", exc)
-            counts["relay_mules"] = 0
+
+        # rebuild router / hub / ring lookups
+        self._router_ids = {
+            r["user_id"] for r in self.money_routers if r.get("user_id")
+        }
+        self._hub_by_id = {
+            h["user_id"]: h for h in self.star_hubs if h.get("user_id")
+        }
+        self._ring_lookup = {}
+        for ring in self.circular_flows:
+            members = (ring.get("node_a"), ring.get("node_b"), ring.get("node_c"))
+            ring_id = ring.get("ring_id") or " → ".join(str(m) for m in members)
+            for uid in members:
+                if uid:
+                    self._ring_lookup.setdefault(uid, ring_id)
 
         # rebuild user → cluster lookup
         self._user_clusters.clear()
+        self._user_primary_cluster.clear()
         for island in self.fraud_islands:
             cid = str(island.get("cluster_id", ""))
             for uid in island.get("member_ids", []):
-                self._user_clusters.setdefault(uid, set()).add(cid)
+                lst = self._user_clusters.setdefault(uid, [])
+                if cid not in lst:
+                    lst.append(cid)
+                self._user_primary_cluster.setdefault(uid, cid)
+
+        # lookups changed – memoised flags are stale
+        self._flags_cache.clear()
 
         logger.info(
             "Collusive detection refreshed – islands=%d routers=%d rings=%d chains=%d hubs=%d relays=%d",
@@ -125,43 +164,44 @@ class CollusiveFraudDetector:
 
     def get_user_flags(self, user_id: str) -> List[str]:
         """Return cached collusion flags for a user (O(1) lookup)."""
+        cached = self._flags_cache.get(user_id)
+        if cached is not None:
+            self._flags_cache.move_to_end(user_id)
+            return list(cached)
+
         flags: List[str] = []
 
         # cluster membership
-        clusters = self._user_clusters.get(user_id, set())
+        clusters = self._user_clusters.get(user_id, ())
         for cid in clusters:
             flags.append(f"Part of Fraud Cluster {cid}")
 
         # money router
-        for router in self.money_routers:
-            if router.get("user_id") == user_id:
-                flags.append("Money Router (High Betweenness)")
-                break
+        if user_id in self._router_ids:
+            flags.append("Money Router (High Betweenness)")
 
         # circular flow participant
-        for ring in self.circular_flows:
-            if user_id in (ring.get("node_a"), ring.get("node_b"), ring.get("node_c")):
-                flags.append("Circular Money Flow Detected")
-                break
+        ring_id = self._ring_lookup.get(user_id)
+        if ring_id:
+            flags.append(f"Circular Money Flow Detected ({ring_id})")
 
         # star hub
-        for hub in self.star_hubs:
-            if hub.get("user_id") == user_id:
-                flags.append(f"Star Hub ({hub.get('hub_type', 'RELAY')})")
-                break
+        hub = self._hub_by_id.get(user_id)
+        if hub is not None:
+            flags.append(f"Star Hub ({hub.get('hub_type', 'RELAY')})")
 
         # relay mule (O(1) set lookup)
         if user_id in self._relay_mule_ids:
             flags.append("HIGH_VELOCITY_RELAY: rapid fund relay pattern")
 
+        self._flags_cache[user_id] = tuple(flags)
+        if len(self._flags_cache) > _FLAGS_CACHE_SIZE:
+            self._flags_cache.popitem(last=False)
         return flags
 
     def get_user_cluster_id(self, user_id: str) -> str | None:
         """Return the primary fraud cluster the user belongs to."""
-        clusters = self._user_clusters.get(user_id)
-        if clusters:
-            return next(iter(clusters))
-        return None
+        return self._user_primary_cluster.get(user_id)
 
     # ── summary for API / dashboard ────────────────────────────
 
@@ -21,7 +21,8 @@ to generate explicit mule flags.
 from __future__ import annotations
 
 import logging
-from typing import Dict, List
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +33,86 @@ _DEVICE_SHARE_THRESHOLD = 3
 _DORMANT_DAYS_THRESHOLD = 20
 
 
+# Feature-dict slots passed to the rule table
+_BEHAV, _DEAD, _DEVICE, _GRAPH, _VEL = range(5)
+
+# (source, predicate, weight, reason) – evaluated in order, reason only
+# formatted when the rule fires.
+_Rule = Tuple[int, Callable[[Dict], bool], float, Callable[[Dict], str]]
+_RULES: Tuple[_Rule, ...] = (
+    # ── first-strike dormant activation ──────────────────
+    (_DEAD, lambda d: d.get("is_first_strike"), 0.30,
+     lambda d: f"First-strike: dormant "
+               f"{int(d.get('days_slept') or d.get('days_inactive', 0))}d → suddenly active"),
+    (_DEAD, lambda d: not d.get("is_first_strike") and d.get("is_dormant") and d.get("risk", 0) > 40,
+     0.25, lambda d: "Dormant account activated with suspicious inflow"),
+    # ── sleep-and-flash mule (woken mule) ────────────────
+    (_DEAD, lambda d: d.get("sleep_flash_flag"), 0.25,
+     lambda d: f"Sleep-and-flash mule: amount {d.get('sleep_flash_ratio', 0):.0f}x "
+               f"historical avg, dormant >30d"),
+    # ── high pass-through (relay pattern) ────────────────
+    (_VEL, lambda v: v.get("outflow_inflow_ratio", 0) > _PASSTHROUGH_THRESHOLD, 0.20,
+     lambda v: f"High pass-through ratio ({v.get('outflow_inflow_ratio', 0):.2f})"),
+    # ── shared device ────────────────────────────────────
+    (_DEVICE, lambda d: d.get("account_count", 0) >= _DEVICE_SHARE_THRESHOLD, 0.15,
+     lambda d: f"Device shared across {d['account_count']} accounts"),
+    # ── SIM-swap multi-user device ───────────────────────
+    (_DEVICE, lambda d: d.get("device_multi_user_flag"), 0.20,
+     lambda d: f"SIM-swap: {d.get('device_multi_user_count', 0)} users "
+               f"on same device in 24h"),
+    # ── graph cluster membership ─────────────────────────
+    (_GRAPH, lambda g: g.get("community_risk", 0) > 50, 0.15,
+     lambda g: f"Member of high-risk cluster (risk={g['community_risk']:.0f})"),
+    # ── relay mule flag from velocity ────────────────────
+    (_VEL, lambda v: v.get("tx_per_min", 0) > 5 and v.get("outflow_inflow_ratio", 0) > 0.6, 0.10,
+     lambda v: f"Relay pattern: {v['tx_per_min']:.1f} tx/min, "
+               f"ratio={v.get('outflow_inflow_ratio', 0):.2f}"),
+    # ── behavioural anomaly ──────────────────────────────
+    (_BEHAV, lambda b: b.get("impossible_travel"), 0.10,
+     lambda b: "Impossible travel detected"),
+    (_BEHAV, lambda b: b.get("spike_flag"), 0.05,
+     lambda b: "Amount spike vs historical baseline"),
+    # ── new device + high amount + MPIN compound ─────────
+    (_DEVICE, lambda d: d.get("new_device_high_mpin"), 0.15,
+     lambda d: "New device + high amount + MPIN authentication"),
+    # ── capability mask anomaly ──────────────────────────
+    (_DEVICE, lambda d: d.get("cap_mask_anomaly", 0) >= 2, 0.08,
+     lambda d: f"Device capability mask changed (Hamming={d['cap_mask_anomaly']})"),
+    # ── new/unknown device ───────────────────────────────
+    (_DEVICE, lambda d: d.get("new_device_flag") and not d.get("new_device_high_mpin"), 0.05,
+     lambda d: "Transaction from new/unseen device"),
+    # ── IP rotation pattern ──────────────────────────────
+    (_BEHAV, lambda b: b.get("ip_rotation_flag"), 0.08,
+     lambda b: f"IP rotation: {b.get('ip_rotation_count', 0)} unique IPs in 24h"),
+    # ── fixed-amount pattern (structuring) ───────────────
+    (_BEHAV, lambda b: b.get("fixed_amount_flag"), 0.08,
+     lambda b: "Fixed-amount pattern (possible structuring)"),
+    # ── circadian anomaly ────────────────────────────────
+    (_BEHAV, lambda b: b.get("circadian_anomaly"), 0.10,
+     lambda b: "Transaction at unusual hour for user's pattern"),
+    # ── TX identicality index ────────────────────────────
+    (_BEHAV, lambda b: b.get("tx_identicality_flag"), 0.15,
+     lambda b: f"TX identicality: {b.get('tx_identicality_count', 0)} identical-amount "
+               f"transfers to same receiver in 1h"),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class MuleVerdict:
+    """Result of ``MuleDetector.evaluate``."""
+    is_mule: bool
+    confidence: float       # 0-1
+    reasons: List[str]
+
+
+# Shared verdict for the explain=False fast path
+_FUSED_RISK_VERDICT = MuleVerdict(
+    is_mule=True,
+    confidence=1.0,
+    reasons=[f"Fused risk >= {_MULE_RISK_THRESHOLD}"],
+)
+
+
 class MuleDetector:
     """Heuristic mule-classification on top of feature vectors."""
 
@@ -43,125 +124,34 @@ class MuleDetector:
         graph: Dict,
         velocity: Dict,
         fused_risk: float,
-    ) -> Dict:
+        *,
+        explain: bool = True,
+    ) -> MuleVerdict:
         """
-        Return:
-            is_mule : bool
-            confidence : float 0-1
-            reasons : List[str]
+        Return a ``MuleVerdict`` (is_mule, confidence 0-1, reasons).
+
+        With ``explain=False`` (bulk / backfill scoring) a fused risk at or
+        above the mule threshold decides the verdict without evaluating the
+        rules; confidence and reasons are then not meaningful.
         """
+        if not explain and fused_risk >= _MULE_RISK_THRESHOLD:
+            return _FUSED_RISK_VERDICT
+
         reasons: List[str] = []
         score = 0.0  # accumulator 0 → 1
 
-        # ── first-strike dormant activation ──────────────────
-        if dead_account.get("is_first_strike"):
-            score += 0.30
-            days = dead_account.get("days_slept") or dead_account.get("days_inactive", 0)
-            reasons.append(f"First-strike: dormant {int(days)}d → suddenly active")
-        elif dead_account.get("is_dormant") and dead_account.get("risk", 0) > 40:
-            score += 0.25
-            reasons.append("Dormant account activated with suspicious inflow")
-
-        # ── sleep-and-flash mule (woken mule) ────────────────
-        if dead_account.get("sleep_flash_flag"):
-            score += 0.25
-            ratio = dead_account.get("sleep_flash_ratio", 0)
-            reasons.append(
-                f"Sleep-and-flash mule: amount {ratio:.0f}x historical avg, "
-                f"dormant >30d"
-            )
-
-        # ── high pass-through (relay pattern) ────────────────
-        pt_ratio = velocity.get("outflow_inflow_ratio", 0)
-        if pt_ratio > _PASSTHROUGH_THRESHOLD:
-            score += 0.20
-            reasons.append(f"High pass-through ratio ({pt_ratio:.2f})")
-
-        # ── shared device ────────────────────────────────────
-        if device.get("account_count", 0) >= _DEVICE_SHARE_THRESHOLD:
-            score += 0.15
-            reasons.append(
-                f"Device shared across {device['account_count']} accounts"
-            )
-
-        # ── SIM-swap multi-user device ───────────────────────
-        if device.get("device_multi_user_flag"):
-            score += 0.20
-            reasons.append(
-                f"SIM-swap: {device.get('device_multi_user_count', 0)} users "
-                f"on same device in 24h"
-            )
-
-        # ── graph cluster membership ─────────────────────────
-        if graph.get("community_risk", 0) > 50:
-            score += 0.15
-            reasons.append(
-                f"Member of high-risk cluster (risk={graph['community_risk']:.0f})"
-            )
-
-        # ── relay mule flag from velocity ────────────────────
-        if velocity.get("tx_per_min", 0) > 5 and pt_ratio > 0.6:
-            score += 0.10
-            reasons.append(
-                f"Relay pattern: {velocity['tx_per_min']:.1f} tx/min, "
-                f"ratio={pt_ratio:.2f}"
-            )
-
-        # ── behavioural anomaly ──────────────────────────────
-        if behavioral.get("impossible_travel"):
-            score += 0.10
-            reasons.append("Impossible travel detected")
-        if behavioral.get("spike_flag"):
-            score += 0.05
-            reasons.append("Amount spike vs historical baseline")
-
-        # ── new device + high amount + MPIN compound ─────────
-        if device.get("new_device_high_mpin"):
-            score += 0.15
-            reasons.append("New device + high amount + MPIN authentication")
-
-        # ── capability mask anomaly ──────────────────────────
-        if device.get("cap_mask_anomaly", 0) >= 2:
-            score += 0.08
-            reasons.append(
-                f"Device capability mask changed (Hamming={device['cap_mask_anomaly']})"
-            )
-
-        # ── new/unknown device ───────────────────────────────
-        if device.get("new_device_flag") and not device.get("new_device_high_mpin"):
-            score += 0.05
-            reasons.append("Transaction from new/unseen device")
-
-        # ── IP rotation pattern ──────────────────────────────
-        if behavioral.get("ip_rotation_flag"):
-            score += 0.08
-            ip_count = behavioral.get("ip_rotation_count", 0)
-            reasons.append(f"IP rotation: {ip_count} unique IPs in 24h")
-
-        # ── fixed-amount pattern (structuring) ───────────────
-        if behavioral.get("fixed_amount_flag"):
-            score += 0.08
-            reasons.append("Fixed-amount pattern (possible structuring)")
-
-        # ── circadian anomaly ────────────────────────────────
-        if behavioral.get("circadian_anomaly"):
-            score += 0.10
-            reasons.append("Transaction at unusual hour for user's pattern")
-
-        # ── TX identicality index ────────────────────────────
-        if behavioral.get("tx_identicality_flag"):
-            score += 0.15
-            count = behavioral.get("tx_identicality_count", 0)
-            reasons.append(
-                f"TX identicality: {count} identical-amount transfers "
-                f"to same receiver in 1h"
-            )
+        sources = (behavioral, dead_account, device, graph, velocity)
+        for src_idx, predicate, weight, reason in _RULES:
+            src = sources[src_idx]
+            if predicate(src):
+                score += weight
+                reasons.append(reason(src))
 
         score = min(score, 1.0)
         is_mule = score >= 0.5 or fused_risk >= _MULE_RISK_THRESHOLD
 
-        return {
-            "is_mule": is_mule,
-            "confidence": round(score, 3),
-            "reasons": reasons,
-        }
+        return MuleVerdict(
+            is_mule=is_mule,
+            confidence=round(score, 3),
+            reasons=reasons,
+        )
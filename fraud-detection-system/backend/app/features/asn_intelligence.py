@@ -31,13 +31,21 @@ MMDB record structure (asn_ipv4_small.mmdb)
 
 from __future__ import annotations
 
+import asyncio
 import ipaddress
 import logging
 import math
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import maxminddb
+import numpy as np
 
 from app.config import settings
 
@@ -105,6 +113,16 @@ _HOSTING_ASNS: frozenset = frozenset({
     137194,                                # DE-CIX India
 })
 
+# Flattened ASN → class map.  Later entries win on overlap, so build from
+# lowest to highest priority (Mobile > Broadband > Enterprise > Cloud > Hosting).
+_ASN_TO_CLASS: Dict[int, str] = {
+    **{a: "HOSTING" for a in _HOSTING_ASNS},
+    **{a: "INDIAN_CLOUD" for a in _INDIAN_CLOUD_ASNS},
+    **{a: "ENTERPRISE" for a in _ENTERPRISE_ASNS},
+    **{a: "BROADBAND" for a in _BROADBAND_ASNS},
+    **{a: "MOBILE_ISP" for a in _MOBILE_ISP_ASNS},
+}
+
 # ── Keyword → class mapping (fallback when ASN not in curated maps)
 _ORG_KEYWORDS: List[Tuple[str, str]] = [
     ("jio", "MOBILE_ISP"),
@@ -139,6 +157,17 @@ _ORG_KEYWORDS: List[Tuple[str, str]] = [
     ("data centre", "HOSTING"),
 ]
 
+# Single compiled pass over the org name instead of one substring scan per
+# keyword.  The zero-width lookahead reports a match at every position, so
+# keywords that overlap are still seen; the lowest list index wins, as in
+# the original first-match loop.
+_ORG_KEYWORD_RANK: Dict[str, Tuple[int, str]] = {
+    kw: (i, cls) for i, (kw, cls) in enumerate(_ORG_KEYWORDS)
+}
+_ORG_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(re.escape(kw) for kw, _ in _ORG_KEYWORDS) + "))"
+)
+
 # ── Base risk scores per classification (Step 4)
 _CLASS_BASE_SCORES: Dict[str, float] = {
     "MOBILE_ISP":   0.0,
@@ -156,6 +185,8 @@ _CLASS_BASE_SCORES: Dict[str, float] = {
 # ══════════════════════════════════════════════════════════════
 
 _reader: Optional[maxminddb.Reader] = None
+# Guards first open / close – resolve misses run in worker threads too
+_reader_lock = threading.Lock()
 
 
 def _find_mmdb() -> Optional[Path]:
@@ -178,42 +209,74 @@ def _find_mmdb() -> Optional[Path]:
 
 
 def _get_reader() -> Optional[maxminddb.Reader]:
-    """Lazy-load MMDB reader (singleton)."""
+    """Lazy-load MMDB reader (singleton, double-checked under a lock)."""
     global _reader
     if _reader is not None:
         return _reader
 
-    mmdb_path = _find_mmdb()
-    if mmdb_path is None:
-        logger.warning(
-            "MMDB file not found (configured: %s) – ASN intelligence disabled",
-            settings.MMDB_PATH,
-        )
-        return None
-    try:
-        _reader = maxminddb.open_database(str(mmdb_path))
-        logger.info("✅ MMDB loaded: %s", mmdb_path)
-        return _reader
-    except Exception as exc:
-        logger.error("Failed to open MMDB: %s", exc)
-        return None
+    with _reader_lock:
+        if _reader is not None:
+            return _reader
+
+        mmdb_path = _find_mmdb()
+        if mmdb_path is None:
+            logger.warning(
+                "MMDB file not found (configured: %s) – ASN intelligence disabled",
+                settings.MMDB_PATH,
+            )
+            return None
+        try:
+            _reader = maxminddb.open_database(str(mmdb_path))
+            logger.info("✅ MMDB loaded: %s", mmdb_path)
+            return _reader
+        except Exception as exc:
+            logger.error("Failed to open MMDB: %s", exc)
+            return None
+
+
+def open_reader() -> bool:
+    """Open the MMDB reader eagerly.  Call at application startup."""
+    return _get_reader() is not None
 
 
 def close_reader() -> None:
     """Close the MMDB reader.  Call at application shutdown."""
     global _reader
-    if _reader:
-        _reader.close()
-        _reader = None
-        logger.info("MMDB reader closed")
+    with _reader_lock:
+        if _reader:
+            _reader.close()
+            _reader = None
+            _resolve_memo.clear()
+            _asn_risk_memo.clear()
+            logger.info("MMDB reader closed")
 
 
 # ══════════════════════════════════════════════════════════════
 # Step 1 — IPv4 constraint
 # ══════════════════════════════════════════════════════════════
 
+# First octets that contain private / loopback / reserved / link-local /
+# documentation ranges.  Only these need the full ``ipaddress`` check.
+_SPECIAL_FIRST_OCTETS: frozenset = frozenset(
+    {0, 10, 100, 127, 169, 172, 192, 198, 203} | set(range(224, 256))
+)
+
+
 def _is_valid_public_ipv4(ip_str: str) -> bool:
     """Return True only for public, routable IPv4 addresses."""
+    # Fast path: strict dotted-quad parse without building an ip_address
+    # object (rejects IPv6 and malformed input outright).
+    parts = ip_str.split(".")
+    if len(parts) != 4:
+        return False
+    for p in parts:
+        if not (0 < len(p) <= 3 and p.isascii() and p.isdigit()) \
+                or (len(p) > 1 and p[0] == "0") or int(p) > 255:
+            return False
+    if int(parts[0]) not in _SPECIAL_FIRST_OCTETS:
+        return True
+
+    # Slow path for the few first octets hosting special-purpose ranges
     try:
         addr = ipaddress.ip_address(ip_str)
     except ValueError:
@@ -231,78 +294,91 @@ def _is_valid_public_ipv4(ip_str: str) -> bool:
 
 def _classify_indian_asn(asn: int, org_name: str) -> str:
     """Classify an Indian ASN using curated maps + keyword fallback."""
-    # Priority:  Mobile > Broadband > Enterprise > Cloud > Hosting
-    if asn in _MOBILE_ISP_ASNS:
-        return "MOBILE_ISP"
-    if asn in _BROADBAND_ASNS:
-        return "BROADBAND"
-    if asn in _ENTERPRISE_ASNS:
-        return "ENTERPRISE"
-    if asn in _INDIAN_CLOUD_ASNS:
-        return "INDIAN_CLOUD"
-    if asn in _HOSTING_ASNS:
-        return "HOSTING"
+    # Curated maps (priority resolved when _ASN_TO_CLASS was built)
+    cls = _ASN_TO_CLASS.get(asn)
+    if cls:
+        return cls
 
     # Keyword fallback on organisation name
-    org_lower = org_name.lower()
-    for keyword, cls in _ORG_KEYWORDS:
-        if keyword in org_lower:
-            return cls
-
-    return "UNKNOWN"
+    best = None
+    for m in _ORG_KEYWORD_RE.finditer(org_name.lower()):
+        hit = _ORG_KEYWORD_RANK[m.group(1)]
+        if best is None or hit < best:
+            best = hit
+    return best[1] if best else "UNKNOWN"
 
 
 # ══════════════════════════════════════════════════════════════
 # Steps 1–4 — Synchronous MMDB resolve
 # ══════════════════════════════════════════════════════════════
 
-_NULL_RESULT: Dict = {
-    "asn": 0,
-    "org_name": "",
-    "country": "",
-    "is_indian": False,
-    "foreign_flag": 0,
-    "asn_class": "UNKNOWN",
-    "asn_base": 0.0,
-    "valid": False,
-}
-
-
-def resolve(ip_address: str) -> Dict:
+@dataclass(frozen=True, slots=True)
+class AsnInfo:
+    """Steps 1–4 result for one IP.  Immutable, so cached instances are shared."""
+    asn: int                # AS number
+    org_name: str           # organisation name
+    country: str            # ISO 3166-1 alpha-2 (org registration country)
+    is_indian: bool         # True if country == "IN"
+    foreign_flag: int       # 0 (Indian) or 1 (foreign)
+    asn_class: str          # classification label
+    asn_base: float         # base risk score for the class
+    valid: bool             # True if lookup succeeded
+
+
+_NULL_RESULT = AsnInfo(
+    asn=0,
+    org_name="",
+    country="",
+    is_indian=False,
+    foreign_flag=0,
+    asn_class="UNKNOWN",
+    asn_base=0.0,
+    valid=False,
+)
+
+
+# Per-IP memo of resolved results.  A plain dict (rather than lru_cache) so
+# the async path can probe it without doing the lookup; oldest entry is
+# evicted once full.  Reads are lock-free, writers serialise on the lock.
+_RESOLVE_CACHE_SIZE = 65536
+_resolve_memo: Dict[str, AsnInfo] = {}
+_resolve_memo_lock = threading.Lock()
+
+
+def _resolve_cached(ip_address: str) -> AsnInfo:
+    """Memoised ``_resolve_uncached``.  Safe to call from worker threads."""
+    info = _resolve_memo.get(ip_address)
+    if info is None:
+        info = _resolve_uncached(ip_address)
+        with _resolve_memo_lock:
+            if len(_resolve_memo) >= _RESOLVE_CACHE_SIZE:
+                del _resolve_memo[next(iter(_resolve_memo))]
+            _resolve_memo[ip_address] = info
+    return info
+
+
+def _resolve_uncached(ip_address: str) -> AsnInfo:
     """
-    Resolve an IP address against the MMDB.
-
-    Returns a dict with:
-        asn          – AS number (int)
-        org_name     – organisation name
-        country      – ISO 3166-1 alpha-2 (org registration country)
-        is_indian    – True if country == "IN"
-        foreign_flag – 0 (Indian) or 1 (foreign)
-        asn_class    – classification label
-        asn_base     – base risk score for the class
-        valid        – True if lookup succeeded
+    Steps 1–4 for one IP.  Only called once the reader is known to be open.
     """
     # Step 1: IPv4 constraint
     if not _is_valid_public_ipv4(ip_address):
-        return dict(_NULL_RESULT)
-
-    reader = _get_reader()
-    if reader is None:
-        return dict(_NULL_RESULT)
+        return _NULL_RESULT
 
     # Step 2: ASN extraction
     try:
-        data = reader.get(ip_address)
+        data = _reader.get(ip_address)
     except Exception:
-        return dict(_NULL_RESULT)
+        return _NULL_RESULT
 
     if not data:
-        return dict(_NULL_RESULT)
+        return _NULL_RESULT
 
     asn_number: int = data.get("asn", 0) or 0
     org = data.get("organization", {}) or {}
-    org_name: str = org.get("name", "") or ""
-    country: str = (org.get("country", "") or "").upper()
+    # Interned: thousands of memoised IPs share a handful of orgs/countries
+    org_name: str = sys.intern(org.get("name", "") or "")
+    country: str = sys.intern((org.get("country", "") or "").upper())
 
     # Step 3: Indian ASN filtering
     is_indian = country == "IN"
@@ -316,109 +392,168 @@ def resolve(ip_address: str) -> Dict:
 
     asn_base = _CLASS_BASE_SCORES.get(asn_class, 0.5)
 
-    return {
-        "asn": asn_number,
-        "org_name": org_name,
-        "country": country,
-        "is_indian": is_indian,
-        "foreign_flag": foreign_flag,
-        "asn_class": asn_class,
-        "asn_base": round(asn_base, 3),
-        "valid": True,
-    }
+    return AsnInfo(
+        asn=asn_number,
+        org_name=org_name,
+        country=country,
+        is_indian=is_indian,
+        foreign_flag=foreign_flag,
+        asn_class=asn_class,
+        asn_base=asn_base,
+        valid=True,
+    )
+
+
+def resolve(ip_address: str) -> AsnInfo:
+    """
+    Resolve an IP address against the MMDB.
+
+    Returns an ``AsnInfo``; repeat IPs are served from ``_resolve_memo``.
+    Use ``dataclasses.asdict`` where a dict is needed (API boundary).
+    """
+    # No reader → don't pin null results in the cache
+    if _get_reader() is None:
+        return _NULL_RESULT
+    return _resolve_cached(ip_address)
+
+
+async def resolve_async(ip_address: str) -> AsnInfo:
+    """
+    ``resolve`` for coroutines: cache hits are answered on the loop, misses
+    run the MMDB lookup in a worker thread so a cold mmap page fault can't
+    stall other coroutines.
+    """
+    if _get_reader() is None:
+        return _NULL_RESULT
+
+    info = _resolve_memo.get(ip_address)
+    if info is None:
+        info = await asyncio.to_thread(_resolve_cached, ip_address)
+    return info
 
 
 # ══════════════════════════════════════════════════════════════
 # Steps 5–8 — Full ASN risk computation (async, needs Neo4j)
 # ══════════════════════════════════════════════════════════════
 
-async def compute_asn_risk(
-    sender_id: str,
-    ip_address: str,
-    neo4j,  # Neo4jManager
-) -> Dict:
-    """
-    Compute the complete 8-step ASN risk score for a transaction.
+# Step 8 normalisers:  log(1+N)/log(1+1000) and H/2.5, as multiplications
+_DENSITY_NORM_RECIP = 1.0 / math.log1p(1000)
+_ENTROPY_NORM_RECIP = 1.0 / 2.5
+# Below this many distinct ASNs the Python loop beats NumPy's setup cost
+_NP_ENTROPY_MIN_ASNS = 8
+
+_NULL_ASN_RISK: Dict = {
+    "asn": 0, "org_name": "", "country": "", "asn_class": "UNKNOWN",
+    "foreign_flag": 0, "asn_base": 0.0,
+    "asn_density": 0.0, "asn_density_norm": 0.0,
+    "asn_drift": 0, "asn_entropy": 0.0, "asn_entropy_norm": 0.0,
+    "asn_risk": 0.0, "asn_risk_scaled": 0.0,
+}
 
-    ASN_risk = 0.4·ASN_base
-             + 0.3·ASN_density_norm
-             + 0.2·ASN_drift
-             + 0.2·ForeignFlag
-             + 0.1·ASN_entropy_norm
-    Normalised to [0, 1].
 
-    Returns a dict with all intermediate features plus:
-        asn_risk         – final normalised score [0, 1]
-        asn_risk_scaled  – scaled to 0–20 for behavioural fusion
+# Per-cycle snapshots loaded by refresh_asn_stats(); compute_asn_risk reads
+# these first and only queries Neo4j for ASNs / users they don't cover.
+_asn_density_cache: Dict[int, int] = {}
+_asn_history_cache: Dict[str, List[Dict]] = {}
+
+# compute_asn_risk results: sender_id → {ip → (expires_at, result)}, LRU over
+# senders.  A new IP for a sender changes their ASN histogram (drift /
+# entropy), so it drops that sender's other entries.
+_ASN_RISK_MEMO_USERS = 100_000
+_asn_risk_memo: OrderedDict[str, Dict[str, Tuple[float, Dict]]] = OrderedDict()
+
+
+async def refresh_asn_stats(neo4j) -> Dict[str, int]:
     """
-    from app.utils.cypher_queries import QUERY_ASN_DENSITY, QUERY_USER_ASN_HISTORY
+    Reload the ASN density map and the ASN histories of recently active
+    senders.  Called once per graph-analytics cycle.
+    """
+    global _asn_density_cache, _asn_history_cache
+    from app.utils.cypher_queries import (
+        QUERY_ASN_DENSITY_ALL,
+        QUERY_ACTIVE_USER_ASN_HISTORY,
+    )
 
-    # Steps 1–4: MMDB resolve + classify
-    info = resolve(ip_address)
-
-    if not info["valid"]:
-        return {
-            "asn": 0, "org_name": "", "country": "", "asn_class": "UNKNOWN",
-            "foreign_flag": 0, "asn_base": 0.0,
-            "asn_density": 0.0, "asn_density_norm": 0.0,
-            "asn_drift": 0, "asn_entropy": 0.0, "asn_entropy_norm": 0.0,
-            "asn_risk": 0.0, "asn_risk_scaled": 0.0,
+    density_rows, history_rows = await asyncio.gather(
+        neo4j.read_async(QUERY_ASN_DENSITY_ALL),
+        neo4j.read_async(
+            QUERY_ACTIVE_USER_ASN_HISTORY,
+            {
+                "window_sec": settings.ASN_CACHE_ACTIVE_WINDOW_SEC,
+                "max_users": settings.ASN_CACHE_MAX_USERS,
+            },
+        ),
+        return_exceptions=True,
+    )
+
+    if isinstance(density_rows, Exception):
+        logger.warning("ASN density snapshot failed: %s", density_rows)
+    else:
+        _asn_density_cache = {
+            r["asn"]: r.get("account_count", 0) or 0 for r in density_rows
         }
 
-    asn_number = info["asn"]
-    foreign_flag = info["foreign_flag"]
-    asn_base = info["asn_base"]
+    if isinstance(history_rows, Exception):
+        logger.warning("ASN history snapshot failed: %s", history_rows)
+    else:
+        history: Dict[str, List[Dict]] = {}
+        for r in history_rows:
+            history.setdefault(r["user_id"], []).append(r)
+        _asn_history_cache = history
+
+    return {
+        "asns": len(_asn_density_cache),
+        "users": len(_asn_history_cache),
+    }
+
+
+def _score_asn(info: AsnInfo, account_count: int, history_rows: List[Dict]) -> Dict:
+    """Steps 5–8 for one resolved IP, given its density and user history."""
+    asn_number = info.asn
+    foreign_flag = info.foreign_flag
+    asn_base = info.asn_base
 
     # ── Step 5: ASN density — log(1 + Accounts_in_ASN) ──────
-    asn_density = 0.0
-    if asn_number > 0:
-        try:
-            rows = await neo4j.read_async(
-                QUERY_ASN_DENSITY, {"asn_number": asn_number},
-            )
-            if rows:
-                account_count = rows[0].get("account_count", 0) or 0
-                asn_density = math.log1p(account_count)
-        except Exception as exc:
-            logger.debug("ASN density query failed: %s", exc)
+    asn_density = math.log1p(account_count) if asn_number > 0 else 0.0
 
     # ── Step 6 + 7: ASN drift + switching entropy ───────────
     asn_drift = 0
     asn_entropy = 0.0
-    try:
-        history_rows = await neo4j.read_async(
-            QUERY_USER_ASN_HISTORY, {"user_id": sender_id},
-        )
-        if history_rows:
-            asn_counts: Dict[int, int] = {}
-            total = 0
-            for row in history_rows:
-                a = row.get("asn", 0) or 0
-                c = row.get("usage_count", 1) or 1
-                if a > 0:
-                    asn_counts[a] = c
-                    total += c
-
-            if asn_counts:
-                # Step 6: drift — is current ASN ≠ mode?
-                mode_asn = max(asn_counts, key=asn_counts.get)
-                asn_drift = 0 if asn_number == mode_asn else 1
-
-                # Step 7: switching entropy  −Σ p_i·log(p_i)
-                if total > 0:
+    if history_rows:
+        asn_counts: Dict[int, int] = {}
+        total = 0
+        for row in history_rows:
+            a = row.get("asn", 0) or 0
+            c = row.get("usage_count", 1) or 1
+            if a > 0:
+                asn_counts[a] = c
+                total += c
+
+        if asn_counts:
+            # Step 6: drift — is current ASN ≠ mode?
+            mode_asn = max(asn_counts, key=asn_counts.get)
+            asn_drift = 0 if asn_number == mode_asn else 1
+
+            # Step 7: switching entropy  −Σ p_i·log(p_i)
+            #   = log(T) − Σ c_i·log(c_i) / T   (one log per ASN, one divide)
+            if total > 0:
+                if len(asn_counts) >= _NP_ENTROPY_MIN_ASNS:
+                    counts = np.fromiter(
+                        asn_counts.values(), dtype=np.float64, count=len(asn_counts),
+                    )
+                    c_log_c = float(np.dot(counts, np.log(counts)))
+                else:
+                    c_log_c = 0.0
                     for count_val in asn_counts.values():
-                        p = count_val / total
-                        if p > 0:
-                            asn_entropy -= p * math.log(p)
-    except Exception as exc:
-        logger.debug("ASN history query failed: %s", exc)
+                        c_log_c += count_val * math.log(count_val)
+                asn_entropy = max(math.log(total) - c_log_c / total, 0.0)
 
     # ── Step 8: Final ASN risk ───────────────────────────────
     #   0.4·base + 0.3·density_norm + 0.2·drift + 0.2·foreign + 0.1·entropy_norm
     #   Normalise density:  log(1+N) / log(1+1000)  ≈ [0, 1]
     #   Normalise entropy:  H / 2.5                  ≈ [0, 1]  (cap ~ ln(12))
-    density_norm = min(asn_density / math.log1p(1000), 1.0)
-    entropy_norm = min(asn_entropy / 2.5, 1.0)
+    density_norm = min(asn_density * _DENSITY_NORM_RECIP, 1.0)
+    entropy_norm = min(asn_entropy * _ENTROPY_NORM_RECIP, 1.0)
 
     raw_risk = (
         0.4 * asn_base
@@ -434,16 +569,138 @@ async def compute_asn_risk(
 
     return {
         "asn": asn_number,
-        "org_name": info["org_name"],
-        "country": info["country"],
-        "asn_class": info["asn_class"],
+        "org_name": info.org_name,
+        "country": info.country,
+        "asn_class": info.asn_class,
         "foreign_flag": foreign_flag,
-        "asn_base": round(asn_base, 3),
-        "asn_density": round(asn_density, 4),
-        "asn_density_norm": round(density_norm, 4),
+        "asn_base": asn_base,
+        "asn_density": asn_density,
+        "asn_density_norm": density_norm,
         "asn_drift": asn_drift,
-        "asn_entropy": round(asn_entropy, 4),
-        "asn_entropy_norm": round(entropy_norm, 4),
-        "asn_risk": round(asn_risk, 4),
-        "asn_risk_scaled": round(asn_risk_scaled, 2),
+        "asn_entropy": asn_entropy,
+        "asn_entropy_norm": entropy_norm,
+        "asn_risk": asn_risk,
+        "asn_risk_scaled": asn_risk_scaled,
     }
+
+
+async def compute_asn_risk_batch(
+    pairs: List[Tuple[str, str]],
+    neo4j,  # Neo4jManager
+) -> List[Dict]:
+    """
+    Batched ``compute_asn_risk`` for ``(sender_id, ip_address)`` pairs.
+
+    Resolves every IP locally, serves densities and sender histories from
+    the per-cycle snapshot where possible, fetches the rest with one UNWIND
+    query each (run concurrently), and fans the rows back out.  Results
+    are in input order.
+    """
+    from app.utils.cypher_queries import (
+        QUERY_ASN_DENSITY_BATCH,
+        QUERY_USER_ASN_HISTORY_BATCH,
+    )
+
+    # Steps 1–4: MMDB resolve + classify
+    infos = await asyncio.gather(*(resolve_async(ip) for _, ip in pairs))
+
+    # Snapshot hits first; only cold ASNs / users go to Neo4j
+    density_snap = _asn_density_cache
+    history_snap = _asn_history_cache
+    asns = list({
+        i.asn for i in infos
+        if i.valid and i.asn > 0 and i.asn not in density_snap
+    })
+    user_ids = list({
+        sid for (sid, _), i in zip(pairs, infos)
+        if i.valid and sid not in history_snap
+    })
+
+    async def _no_rows() -> List[Dict]:
+        return []
+
+    density_rows, history_rows = await asyncio.gather(
+        neo4j.read_async(QUERY_ASN_DENSITY_BATCH, {"asns": asns}) if asns else _no_rows(),
+        neo4j.read_async(QUERY_USER_ASN_HISTORY_BATCH, {"user_ids": user_ids})
+        if user_ids else _no_rows(),
+        return_exceptions=True,
+    )
+    if isinstance(density_rows, Exception):
+        logger.debug("ASN density query failed: %s", density_rows)
+        density_rows = []
+    if isinstance(history_rows, Exception):
+        logger.debug("ASN history query failed: %s", history_rows)
+        history_rows = []
+
+    density: Dict[int, int] = {
+        r["asn"]: r.get("account_count", 0) or 0 for r in density_rows
+    }
+    history: Dict[str, List[Dict]] = {}
+    for r in history_rows:
+        history.setdefault(r["user_id"], []).append(r)
+
+    results: List[Dict] = []
+    for (sender_id, _), info in zip(pairs, infos):
+        if not info.valid:
+            results.append(dict(_NULL_ASN_RISK))
+            continue
+        account_count = density_snap.get(info.asn)
+        if account_count is None:
+            account_count = density.get(info.asn, 0)
+        user_history = history_snap.get(sender_id)
+        if user_history is None:
+            user_history = history.get(sender_id, [])
+        results.append(_score_asn(info, account_count, user_history))
+    return results
+
+
+async def compute_asn_risk(
+    sender_id: str,
+    ip_address: str,
+    neo4j,  # Neo4jManager
+) -> Dict:
+    """
+    Compute the complete 8-step ASN risk score for a transaction.
+
+    ASN_risk = 0.4·ASN_base
+             + 0.3·ASN_density_norm
+             + 0.2·ASN_drift
+             + 0.2·ForeignFlag
+             + 0.1·ASN_entropy_norm
+    Normalised to [0, 1].
+
+    Returns a dict with all intermediate features plus:
+        asn_risk         – final normalised score [0, 1]
+        asn_risk_scaled  – scaled to 0–20 for behavioural fusion
+    Values are full precision; rounding is left to the output boundary.
+    Results are memoised per (sender, IP) for ``ASN_RISK_CACHE_TTL_SEC``.
+    """
+    now = time.monotonic()
+    by_ip = _asn_risk_memo.get(sender_id)
+    if by_ip is not None:
+        hit = by_ip.get(ip_address)
+        if hit is not None and hit[0] > now:
+            _asn_risk_memo.move_to_end(sender_id)
+            return dict(hit[1])
+
+    results = await compute_asn_risk_batch([(sender_id, ip_address)], neo4j)
+    result = results[0]
+
+    by_ip = _asn_risk_memo.get(sender_id)
+    if by_ip is None or ip_address not in by_ip:
+        # first sighting of this IP for the sender – older entries are stale
+        by_ip = {}
+        _asn_risk_memo[sender_id] = by_ip
+    by_ip[ip_address] = (now + settings.ASN_RISK_CACHE_TTL_SEC, result)
+    _asn_risk_memo.move_to_end(sender_id)
+    if len(_asn_risk_memo) > _ASN_RISK_MEMO_USERS:
+        _asn_risk_memo.popitem(last=False)
+    return dict(result)
+
+
+def invalidate_asn_risk(sender_id: Optional[str] = None) -> None:
+    """Drop memoised ASN risk for one sender, or for everyone."""
+    if sender_id is None:
+        _asn_risk_memo.clear()
+    else:
+        _asn_risk_memo.pop(sender_id, None)
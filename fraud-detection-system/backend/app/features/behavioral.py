@@ -27,46 +27,109 @@ Discarded signals
 
 from __future__ import annotations
 
+import asyncio
 import math
 import logging
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 import numpy as np
+from neo4j.exceptions import ClientError
 
 from app.neo4j_manager import Neo4jManager
 from app.utils.cypher_queries import (
+    QUERY_BEHAVIORAL_BUNDLE,
+    QUERY_BEHAVIORAL_BUNDLE_LEAN,
+    QUERY_BEHAVIORAL_BUNDLE_BATCH,
     QUERY_USER_TX_HISTORY,
     QUERY_USER_PROFILE,
     QUERY_IP_ROTATION,
-    QUERY_RECENT_AMOUNTS,
-    QUERY_USER_HOUR_DISTRIBUTION,
     QUERY_IDENTICAL_TX_RECEIVER,
 )
 from app.features.asn_intelligence import compute_asn_risk
-from app.detection.anomaly_detection import iqr_outlier
+from app.features.user_baseline import UserBaseline, UserBaselineCache
+from app.models.transaction import TransactionInput
 from app.config import settings
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+# Per-tx thresholds, bound once (settings are fixed after startup)
+_BEHAVIORAL_HISTORY_COUNT = settings.BEHAVIORAL_HISTORY_COUNT
+_TX_IDENTICALITY_WINDOW_HOURS = settings.TX_IDENTICALITY_WINDOW_HOURS
+_VELOCITY_WINDOW_SEC = settings.VELOCITY_WINDOW_SEC
+_BURST_TX_THRESHOLD = settings.BURST_TX_THRESHOLD
+_IMPOSSIBLE_TRAVEL_KMH = settings.IMPOSSIBLE_TRAVEL_KMH
+_IP_ROTATION_MAX_UNIQUE = settings.IP_ROTATION_MAX_UNIQUE
+_IP_ROTATION_WINDOW_HOURS = settings.IP_ROTATION_WINDOW_HOURS
+_FIXED_AMOUNT_TOLERANCE = settings.FIXED_AMOUNT_TOLERANCE
+_FIXED_AMOUNT_MIN_COUNT = settings.FIXED_AMOUNT_MIN_COUNT
+_CIRCADIAN_NEW_DEVICE_PENALTY = settings.CIRCADIAN_NEW_DEVICE_PENALTY
+_CIRCADIAN_ANOMALY_PENALTY = settings.CIRCADIAN_ANOMALY_PENALTY
+_TX_IDENTICALITY_MIN_COUNT = settings.TX_IDENTICALITY_MIN_COUNT
+_IP_ROTATION_PENALTY = settings.IP_ROTATION_PENALTY
+_FIXED_AMOUNT_PENALTY = settings.FIXED_AMOUNT_PENALTY
+_TX_IDENTICALITY_PENALTY = settings.TX_IDENTICALITY_PENALTY
+
+# columns compute_many() reads (TransactionInput attribute names)
+_REPLAY_COLUMNS = frozenset({
+    "sender_id", "receiver_id", "amount", "timestamp",
+    "sender_lat", "sender_lon", "ip_address",
+})
+
 
 # ── helpers ──────────────────────────────────────────────────
 
+# bit h set ⇔ hour h is night-time (window wraps midnight)
+_NIGHT_HOUR_MASK = sum(
+    1 << h for h in range(24)
+    if h >= settings.NIGHT_START_HOUR or h <= settings.NIGHT_END_HOUR
+)
+
+# Below this many elements a plain loop beats numpy's array setup +
+# dispatch; history windows (25) and recent amounts (20) sit under it.
+_NP_MIN_N = 32
+
+_DEG2RAD = math.pi / 180.0
+_EARTH_DIAMETER_KM = 2 * 6371.0  # 2 × Earth radius km
+
+
 def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """Great-circle distance between two points on Earth."""
-    R = 6371.0  # Earth radius km
-    φ1, φ2 = math.radians(lat1), math.radians(lat2)
-    Δφ = math.radians(lat2 - lat1)
-    Δλ = math.radians(lon2 - lon1)
-    a = math.sin(Δφ / 2) ** 2 + math.cos(φ1) * math.cos(φ2) * math.sin(Δλ / 2) ** 2
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    # Scalar on purpose (math beats numpy for one point); constants folded,
+    # squares as multiplies, asin(√a) instead of atan2(√a, √(1−a)).
+    φ1 = lat1 * _DEG2RAD
+    φ2 = lat2 * _DEG2RAD
+    s_dφ = math.sin((φ2 - φ1) * 0.5)
+    s_dλ = math.sin((lon2 - lon1) * (_DEG2RAD * 0.5))
+    a = s_dφ * s_dφ + math.cos(φ1) * math.cos(φ2) * s_dλ * s_dλ
+    return _EARTH_DIAMETER_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def _haversine_km_vec(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray,
+) -> np.ndarray:
+    """Element-wise ``_haversine_km`` over float64 arrays (batch paths only)."""
+    φ1 = np.radians(lat1)
+    φ2 = np.radians(lat2)
+    s_dφ = np.sin((φ2 - φ1) * 0.5)
+    s_dλ = np.sin(np.radians(lon2 - lon1) * 0.5)
+    a = s_dφ * s_dφ + np.cos(φ1) * np.cos(φ2) * s_dλ * s_dλ
+    return _EARTH_DIAMETER_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
 
 
 def _detect_fixed_amount_pattern(amounts: List[float], current: float, tolerance: float, min_count: int) -> bool:
     """Check if current amount matches a repeated fixed-amount pattern."""
     if len(amounts) < min_count:
         return False
-    count = sum(1 for a in amounts if abs(a - current) / max(current, 1) <= tolerance)
+    tol = tolerance * max(current, 1)
+    if len(amounts) < _NP_MIN_N:
+        count = sum(1 for a in amounts if abs(a - current) <= tol)
+    else:
+        amts = np.asarray(amounts, dtype=np.float64)
+        count = int((np.abs(amts - current) <= tol).sum())
     return count >= min_count
 
 
@@ -75,8 +138,99 @@ def _detect_fixed_amount_pattern(amounts: List[float], current: float, tolerance
 class BehavioralFeatureExtractor:
     """Extract behavioural anomaly features for a single transaction."""
 
-    def __init__(self, neo4j: Neo4jManager) -> None:
+    def __init__(
+        self, neo4j: Neo4jManager, baselines: Optional[UserBaselineCache] = None,
+    ) -> None:
         self.neo4j = neo4j
+        # profile + tx window per sender (shared with DeadAccountDetector)
+        self.baselines = baselines if baselines is not None else UserBaselineCache()
+        # cleared if the server rejects QUERY_BEHAVIORAL_BUNDLE
+        self._use_bundle = True
+        # cleared if the server rejects QUERY_BEHAVIORAL_BUNDLE_BATCH
+        self._use_batch_bundle = True
+
+    async def _fetch_bundle(
+        self, sender_id: str, receiver_id: Optional[str], amount: float,
+        with_baseline: bool = True,
+    ) -> Dict:
+        """
+        All behavioural Neo4j inputs in one round trip.  If the bundled
+        query fails, fall back to the individual queries run concurrently
+        in a TaskGroup, at most NEO4J_MAX_CONCURRENT_READS sessions at once
+        (history / profile errors cancel the rest and propagate, the others
+        default to empty).  ``with_baseline=False`` skips history and profile.
+        """
+        if self._use_bundle:
+            try:
+                rows = await self.neo4j.read_async(
+                    QUERY_BEHAVIORAL_BUNDLE if with_baseline else QUERY_BEHAVIORAL_BUNDLE_LEAN,
+                    {
+                        "user_id": sender_id,
+                        "receiver_id": receiver_id,
+                        "amount": amount,
+                        "history_limit": _BEHAVIORAL_HISTORY_COUNT,
+                        "tx_identicality_window": _TX_IDENTICALITY_WINDOW_HOURS,
+                    },
+                )
+                return rows[0] if rows else {}
+            except ClientError as exc:
+                logger.warning("Behavioural bundle query rejected – using per-query reads: %s", exc)
+                self._use_bundle = False
+            except Exception as exc:  # noqa: BLE001
+                # transient (pool timeout, leader switch): this call only
+                logger.warning("Behavioural bundle query failed – per-query reads for this call: %s", exc)
+
+        sem = asyncio.Semaphore(settings.NEO4J_MAX_CONCURRENT_READS)
+
+        async def _read(query: str, params: Dict) -> List[Dict]:
+            async with sem:
+                return await self.neo4j.read_async(query, params)
+
+        async def _read_optional(query: str, params: Dict) -> List[Dict]:
+            try:
+                return await _read(query, params)
+            except Exception as exc:  # noqa: BLE001
+                logger.debug("Optional behavioural read failed: %s", exc)
+                return []
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                history_t = profile_t = ident_t = None
+                if with_baseline:
+                    history_t = tg.create_task(_read(
+                        QUERY_USER_TX_HISTORY,
+                        {"user_id": sender_id, "limit": _BEHAVIORAL_HISTORY_COUNT},
+                    ))
+                    profile_t = tg.create_task(
+                        _read(QUERY_USER_PROFILE, {"user_id": sender_id})
+                    )
+                ip_t = tg.create_task(
+                    _read_optional(QUERY_IP_ROTATION, {"user_id": sender_id})
+                )
+                if receiver_id:
+                    ident_t = tg.create_task(_read_optional(
+                        QUERY_IDENTICAL_TX_RECEIVER,
+                        {
+                            "sender_id": sender_id,
+                            "receiver_id": receiver_id,
+                            "amount": amount,
+                            "window_hours": _TX_IDENTICALITY_WINDOW_HOURS,
+                        },
+                    ))
+        except ExceptionGroup as eg:
+            # surface the first driver error, as gather() used to
+            raise eg.exceptions[0] from None
+
+        history = history_t.result() if history_t else []
+        profile_rows = profile_t.result() if profile_t else []
+        ip_rows = ip_t.result()
+        ident_rows = ident_t.result() if ident_t else []
+        return {
+            "history": history,
+            "profile": profile_rows[0] if profile_rows else None,
+            "unique_ip_count": ip_rows[0].get("unique_ip_count", 0) if ip_rows else 0,
+            "identical_count": ident_rows[0].get("identical_count", 0) if ident_rows else 0,
+        }
 
     async def compute(
         self,
@@ -91,26 +245,285 @@ class BehavioralFeatureExtractor:
     ) -> Dict:
         """Return a dict of feature values + a fused behavioural risk 0–100."""
 
-        # Fetch recent history + profile in parallel-ish (same event loop)
-        history = await self.neo4j.read_async(
-            QUERY_USER_TX_HISTORY,
-            {"user_id": sender_id, "limit": settings.BEHAVIORAL_HISTORY_COUNT},
+        # History + profile (incl. hour histogram) come from the baseline cache when warm
+        baseline = self.baselines.get(sender_id)
+
+        # Stable low-risk sender on a known device + same IP: local checks
+        # only (no IP-rotation / identicality read; ASN risk is memoised)
+        if (baseline is not None and baseline.is_low_risk
+                and not is_new_device and ip_address == baseline.last_ip):
+            asn_result = (
+                await compute_asn_risk(sender_id, ip_address, self.neo4j)
+                if ip_address else {}
+            )
+            return self._score(
+                {}, baseline, asn_result,
+                amount, timestamp, sender_lat, sender_lon, receiver_id, is_new_device,
+            )
+
+        fetch = self._fetch_bundle(
+            sender_id, receiver_id, amount, with_baseline=baseline is None,
+        )
+
+        # Behavioural inputs and ASN risk are independent – fetch together.
+        # TaskGroup: a failure or cancellation tears down the sibling read
+        # instead of leaving it holding a session.
+        if ip_address:
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    bundle_t = tg.create_task(fetch)
+                    asn_t = tg.create_task(compute_asn_risk(sender_id, ip_address, self.neo4j))
+            except ExceptionGroup as eg:
+                raise eg.exceptions[0] from None
+            bundle, asn_result = bundle_t.result(), asn_t.result()
+        else:
+            bundle = await fetch
+            asn_result = {}
+
+        if baseline is None:
+            baseline = self.baselines.put(
+                sender_id,
+                bundle.get("profile"),
+                bundle.get("history") or [],
+            )
+        baseline.last_ip = ip_address
+
+        return self._score(
+            bundle, baseline, asn_result,
+            amount, timestamp, sender_lat, sender_lon, receiver_id, is_new_device,
         )
-        profile_rows = await self.neo4j.read_async(
-            QUERY_USER_PROFILE, {"user_id": sender_id}
+
+    async def _fetch_bundle_batch(
+        self, txs: List[TransactionInput], with_baseline: List[bool],
+    ) -> List[Dict]:
+        """
+        ``_fetch_bundle`` for a micro-batch in one UNWIND round trip.  If the
+        batched query fails, fall back to per-tx bundles run concurrently.
+        """
+        if self._use_batch_bundle:
+            try:
+                rows = await self.neo4j.read_async(
+                    QUERY_BEHAVIORAL_BUNDLE_BATCH,
+                    {
+                        "items": [
+                            {
+                                "ix": i,
+                                "user_id": tx.sender_id,
+                                "receiver_id": tx.receiver_id,
+                                "amount": tx.amount,
+                                "with_baseline": wb,
+                            }
+                            for i, (tx, wb) in enumerate(zip(txs, with_baseline))
+                        ],
+                        "history_limit": _BEHAVIORAL_HISTORY_COUNT,
+                        "tx_identicality_window": _TX_IDENTICALITY_WINDOW_HOURS,
+                    },
+                )
+                bundles: List[Dict] = [{} for _ in txs]
+                for r in rows:
+                    bundles[r["ix"]] = r
+                return bundles
+            except ClientError as exc:
+                logger.warning("Behavioural batch query rejected – using per-tx bundles: %s", exc)
+                self._use_batch_bundle = False
+            except Exception as exc:  # noqa: BLE001
+                # transient (pool timeout, leader switch): this batch only
+                logger.warning("Behavioural batch query failed – per-tx bundles for this batch: %s", exc)
+
+        return list(await asyncio.gather(*(
+            self._fetch_bundle(tx.sender_id, tx.receiver_id, tx.amount, with_baseline=wb)
+            for tx, wb in zip(txs, with_baseline)
+        )))
+
+    async def compute_batch(
+        self,
+        txs: List[TransactionInput],
+        geo_distance: Optional[List[Optional[float]]] = None,
+        geo_time_delta: Optional[List[Optional[float]]] = None,
+        baseline_cache: Optional[UserBaselineCache] = None,
+    ) -> List[Dict]:
+        """
+        ``compute`` for a micro-batch: one Neo4j round trip for all
+        behavioural inputs, ASN risk gathered alongside, geo distance
+        vectorised across the batch.  *geo_distance* entries that are not
+        None override the distance from the cached last fix; with a
+        matching *geo_time_delta* (seconds to the same anchor) the travel
+        speed is taken from that pair too.  Baselines come from / are seeded
+        into *baseline_cache* (default: the live cache).  Results are in
+        input order.
+        """
+        if not txs:
+            return []
+
+        cache = baseline_cache if baseline_cache is not None else self.baselines
+        baselines: List[Optional[UserBaseline]] = [
+            cache.get(tx.sender_id) for tx in txs
+        ]
+
+        async def _no_asn() -> Dict:
+            return {}
+
+        bundles, asn_results = await asyncio.gather(
+            self._fetch_bundle_batch(txs, [b is None for b in baselines]),
+            asyncio.gather(*(
+                compute_asn_risk(tx.sender_id, tx.ip_address, self.neo4j)
+                if tx.ip_address else _no_asn()
+                for tx in txs
+            )),
         )
-        profile = profile_rows[0] if profile_rows else {}
 
-        amounts: List[float] = [r["amount"] for r in history if r.get("amount")]
-        timestamps: List[datetime] = [r["timestamp"] for r in history if r.get("timestamp")]
+        # Seed cold baselines (once per sender, even if it repeats in the batch)
+        seeded: Dict[str, UserBaseline] = {}
+        for i, tx in enumerate(txs):
+            if baselines[i] is not None:
+                continue
+            b = seeded.get(tx.sender_id)
+            if b is None:
+                bundle = bundles[i]
+                b = cache.put(
+                    tx.sender_id,
+                    bundle.get("profile"),
+                    bundle.get("history") or [],
+                )
+                seeded[tx.sender_id] = b
+            baselines[i] = b
+
+        # Geo distance for every tx with both fixes, in one vector pass
+        geo: List[float] = [0.0] * len(txs)
+        geo_ix = [
+            i for i, tx in enumerate(txs)
+            if tx.sender_lat and tx.sender_lon
+            and baselines[i].profile.get("last_lat") and baselines[i].profile.get("last_lon")
+            and (geo_distance is None or geo_distance[i] is None)
+        ]
+        if geo_ix:
+            dist = _haversine_km_vec(
+                np.array([baselines[i].profile["last_lat"] for i in geo_ix], dtype=np.float64),
+                np.array([baselines[i].profile["last_lon"] for i in geo_ix], dtype=np.float64),
+                np.array([txs[i].sender_lat for i in geo_ix], dtype=np.float64),
+                np.array([txs[i].sender_lon for i in geo_ix], dtype=np.float64),
+            )
+            for i, d in zip(geo_ix, dist.tolist()):
+                geo[i] = d
+        if geo_distance is not None:
+            for i, d in enumerate(geo_distance):
+                if d is not None:
+                    geo[i] = d
+
+        return [
+            self._score(
+                bundles[i], baselines[i], asn_results[i],
+                tx.amount, tx.timestamp, tx.sender_lat, tx.sender_lon, tx.receiver_id,
+                False, geo_distance=geo[i],
+                geo_time_delta=(
+                    geo_time_delta[i]
+                    if geo_time_delta is not None and geo_distance is not None
+                    and geo_distance[i] is not None
+                    else None
+                ),
+            )
+            for i, tx in enumerate(txs)
+        ]
+
+    async def compute_many(self, df: "pd.DataFrame", chunk_size: int = 500) -> List[Dict]:
+        """
+        Offline / replay scoring of a DataFrame with the ``_REPLAY_COLUMNS``.
+        geo_distance and the elapsed time are both taken from each row to
+        the sender's previous row in *df* (time order), the distance in a
+        single ``_haversine_km_vec`` pass over all rows; a sender's first
+        row falls back to the cached last fix.  Rows are then scored
+        ``chunk_size`` at a time via ``compute_batch`` against a private
+        baseline cache, so a replay never fills or evicts the live one.
+        Results are in row order.
+        """
+        import pandas as pd  # replay-only; kept off the worker import path
+
+        missing = _REPLAY_COLUMNS.difference(df.columns)
+        if missing:
+            raise ValueError(f"compute_many: missing columns {sorted(missing)}")
+        if df.empty:
+            return []
+
+        frame = df[list(_REPLAY_COLUMNS)].reset_index(drop=True)
+
+        # Previous fix per sender, in time order → one vector haversine, and
+        # the time since that same row (naive timestamps are UTC, as in _score)
+        ordered = frame.sort_values("timestamp", kind="stable")
+        ordered = ordered.assign(
+            _epoch=(
+                pd.to_datetime(ordered["timestamp"], utc=True) - pd.Timestamp(0, tz="UTC")
+            ).dt.total_seconds()
+        )
+        prev = ordered.groupby("sender_id", sort=False)[
+            ["sender_lat", "sender_lon", "_epoch"]
+        ].shift(1)
+        dist = _haversine_km_vec(
+            prev["sender_lat"].to_numpy(dtype=np.float64, na_value=np.nan),
+            prev["sender_lon"].to_numpy(dtype=np.float64, na_value=np.nan),
+            ordered["sender_lat"].to_numpy(dtype=np.float64, na_value=np.nan),
+            ordered["sender_lon"].to_numpy(dtype=np.float64, na_value=np.nan),
+        )
+        elapsed = (ordered["_epoch"] - prev["_epoch"]).to_numpy(dtype=np.float64, na_value=np.nan)
+        row_ix = ordered.index.to_numpy()
+        geo = np.full(len(frame), np.nan)
+        geo[row_ix] = dist
+        dt = np.full(len(frame), np.nan)
+        dt[row_ix] = elapsed
+        geo_list: List[Optional[float]] = [None if d != d else d for d in geo.tolist()]
+        dt_list: List[Optional[float]] = [None if d != d else d for d in dt.tolist()]
+
+        # NaN → None so optional fields keep compute()'s truthiness checks
+        rows = list(
+            frame.astype(object).where(frame.notna(), None).itertuples(index=False)
+        )
+
+        replay_cache = UserBaselineCache(window_size=self.baselines.window_size)
+        out: List[Dict] = []
+        for start in range(0, len(rows), chunk_size):
+            end = start + chunk_size
+            out.extend(await self.compute_batch(
+                rows[start:end],
+                geo_distance=geo_list[start:end],
+                geo_time_delta=dt_list[start:end],
+                baseline_cache=replay_cache,
+            ))
+        return out
+
+    def _score(
+        self,
+        bundle: Dict,
+        baseline: UserBaseline,
+        asn_result: Dict,
+        amount: float,
+        timestamp: datetime,
+        sender_lat: Optional[float],
+        sender_lon: Optional[float],
+        receiver_id: Optional[str],
+        is_new_device: bool,
+        geo_distance: Optional[float] = None,
+        geo_time_delta: Optional[float] = None,
+    ) -> Dict:
+        """
+        Features + fused risk from fetched inputs (no I/O).  A *geo_distance*
+        given together with *geo_time_delta* (seconds, same anchor) is used
+        as-is for the travel speed; otherwise both are measured against the
+        baseline's last fix / newest window entry.
+        """
+        asn_risk_scaled = asn_result.get("asn_risk_scaled", 0.0)
+        profile = baseline.profile
+        stats = baseline.stats
+
+        # window is oldest-first; epochs newest-first like the history query
+        ts_epoch: List[float] = [ts for _, ts in reversed(baseline.window) if ts is not None]
 
         # ── amount features (3σ rule for spike detection) ────
         profile_mean = profile.get("avg_tx_amount") or 0.0
         profile_std = profile.get("std_tx_amount") or 0.0
 
-        if len(amounts) >= 2:
-            mean_a = float(np.mean(amounts))
-            std_a = float(np.std(amounts)) or 1.0
+        # mean / σ maintained incrementally (Welford) – no pass over history
+        if stats.n >= 2:
+            mean_a = stats.mean
+            std_a = stats.std or 1.0
             amount_zscore = (amount - mean_a) / std_a
             rolling_mean = mean_a
             rolling_std = std_a
@@ -132,121 +545,89 @@ class BehavioralFeatureExtractor:
         is_dormant = profile.get("is_dormant", False)
         dormant_burst = is_dormant and profile_mean > 0 and amount > profile_mean
 
-        # ── ASN intelligence (MMDB-based Indian IPv4 classification) ──
-        asn_result: Dict = {}
-        asn_risk_scaled = 0.0
-        if ip_address:
-            asn_result = await compute_asn_risk(sender_id, ip_address, self.neo4j)
-            asn_risk_scaled = asn_result.get("asn_risk_scaled", 0.0)
-
         # ── temporal features ────────────────────────────────
-        if timestamps:
-            last_ts = timestamps[0]
-            if isinstance(last_ts, datetime):
-                time_since_last = max((timestamp - last_ts).total_seconds(), 0)
-            else:
-                time_since_last = 0.0
-        else:
-            time_since_last = 0.0
+        # window holds UTC epoch seconds (see UserBaseline) – no timedeltas
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        now_epoch = timestamp.timestamp()
+        time_since_last = max(now_epoch - ts_epoch[0], 0.0) if ts_epoch else 0.0
 
         # velocity = tx in last 60 s
-        recent_count = sum(
-            1
-            for ts in timestamps
-            if isinstance(ts, datetime)
-            and (timestamp - ts).total_seconds() <= settings.VELOCITY_WINDOW_SEC
-        )
-        velocity_score = min(recent_count / max(settings.BURST_TX_THRESHOLD, 1), 1.0)
+        window_sec = _VELOCITY_WINDOW_SEC
+        if len(ts_epoch) < _NP_MIN_N:
+            recent_count = sum(1 for t in ts_epoch if now_epoch - t <= window_sec)
+        else:
+            age_sec = now_epoch - np.asarray(ts_epoch, dtype=np.float64)
+            recent_count = int((age_sec <= window_sec).sum())
+        velocity_score = min(recent_count / max(_BURST_TX_THRESHOLD, 1), 1.0)
 
         # night-time flag
         hour = timestamp.hour
-        night_flag = hour >= settings.NIGHT_START_HOUR or hour <= settings.NIGHT_END_HOUR
+        night_flag = bool((_NIGHT_HOUR_MASK >> hour) & 1)
 
         # ── geo features ─────────────────────────────────────
-        geo_distance = 0.0
         impossible_travel = False
         last_lat = profile.get("last_lat")
         last_lon = profile.get("last_lon")
-        if sender_lat and sender_lon and last_lat and last_lon:
-            geo_distance = _haversine_km(last_lat, last_lon, sender_lat, sender_lon)
+        if geo_distance is not None and geo_time_delta is not None:
+            # replay: distance and time both to the sender's previous row
+            if geo_time_delta > 0:
+                speed_kmh = geo_distance / (geo_time_delta / 3600)
+                impossible_travel = speed_kmh > _IMPOSSIBLE_TRAVEL_KMH
+        elif not (sender_lat and sender_lon and last_lat and last_lon):
+            geo_distance = 0.0
+        else:
+            if geo_distance is None:
+                geo_distance = _haversine_km(last_lat, last_lon, sender_lat, sender_lon)
             if time_since_last > 0:
                 speed_kmh = geo_distance / (time_since_last / 3600)
-                impossible_travel = speed_kmh > settings.IMPOSSIBLE_TRAVEL_KMH
+                impossible_travel = speed_kmh > _IMPOSSIBLE_TRAVEL_KMH
 
         # ── IQR outlier detection (replaces Mahalanobis) ─────
         iqr_outlier_flag = False
-        if len(amounts) >= 4:
-            iqr_outlier_flag = iqr_outlier(amount, amounts)
+        if stats.n >= 4:
+            q1, q3 = baseline.quartiles()
+            iqr = q3 - q1
+            iqr_outlier_flag = amount < q1 - 1.5 * iqr or amount > q3 + 1.5 * iqr
 
         # ── NEW: IP rotation (unique IPs in 24h window) ──────
         ip_rotation_count = 0
         ip_rotation_flag = False
-        try:
-            ip_rows = await self.neo4j.read_async(
-                QUERY_IP_ROTATION, {"user_id": sender_id}
-            )
-            if ip_rows:
-                ip_rotation_count = ip_rows[0].get("unique_ip_count", 0) or 0
-                ip_rotation_flag = ip_rotation_count >= settings.IP_ROTATION_MAX_UNIQUE
-        except Exception:  # noqa: BLE001
-            pass
+        ip_rotation_count = bundle.get("unique_ip_count", 0) or 0
+        ip_rotation_flag = ip_rotation_count >= _IP_ROTATION_MAX_UNIQUE
 
         # ── NEW: Fixed-amount pattern detection ──────────────
-        fixed_amount_flag = False
-        try:
-            recent_amt_rows = await self.neo4j.read_async(
-                QUERY_RECENT_AMOUNTS,
-                {"user_id": sender_id, "window_hours": settings.IP_ROTATION_WINDOW_HOURS},
+        # Repeats of the same amount are the pattern itself, so the verdict
+        # is memoised per amount until the sender's window moves.
+        fixed_amount_flag = baseline.fixed_amount_memo.get(amount)
+        if fixed_amount_flag is None:
+            recent_amts = baseline.recent_amounts(
+                now_epoch, _IP_ROTATION_WINDOW_HOURS * 3600,
             )
-            recent_amts = [r["amount"] for r in recent_amt_rows if r.get("amount")]
             fixed_amount_flag = _detect_fixed_amount_pattern(
                 recent_amts, amount,
-                settings.FIXED_AMOUNT_TOLERANCE,
-                settings.FIXED_AMOUNT_MIN_COUNT,
+                _FIXED_AMOUNT_TOLERANCE,
+                _FIXED_AMOUNT_MIN_COUNT,
             )
-        except Exception:  # noqa: BLE001
-            pass
+            baseline.fixed_amount_memo[amount] = fixed_amount_flag
 
         # ── NEW: Circadian anomaly (unusual hour for user) ───
         circadian_anomaly = False
         circadian_score = 0.0
-        try:
-            hour_rows = await self.neo4j.read_async(
-                QUERY_USER_HOUR_DISTRIBUTION, {"user_id": sender_id}
+        # If this hour has <2% of user's total transactions, it's unusual
+        if (baseline.rare_hour_mask() >> hour) & 1:
+            circadian_anomaly = True
+            circadian_score = (
+                _CIRCADIAN_NEW_DEVICE_PENALTY if is_new_device
+                else _CIRCADIAN_ANOMALY_PENALTY
             )
-            if hour_rows and len(hour_rows) >= 3:
-                hour_counts = {r["hour"]: r["cnt"] for r in hour_rows}
-                total_tx = sum(hour_counts.values())
-                current_hour_count = hour_counts.get(hour, 0)
-                # If this hour has <2% of user's total transactions, it's unusual
-                if total_tx >= 10 and current_hour_count / total_tx < 0.02:
-                    circadian_anomaly = True
-                    circadian_score = (
-                        settings.CIRCADIAN_NEW_DEVICE_PENALTY if is_new_device
-                        else settings.CIRCADIAN_ANOMALY_PENALTY
-                    )
-        except Exception:  # noqa: BLE001
-            pass
 
         # ── NEW: Transaction identicality index ───────────
         tx_identicality_flag = False
         tx_identicality_count = 0
         if receiver_id:
-            try:
-                ident_rows = await self.neo4j.read_async(
-                    QUERY_IDENTICAL_TX_RECEIVER,
-                    {
-                        "sender_id": sender_id,
-                        "receiver_id": receiver_id,
-                        "amount": amount,
-                        "window_hours": settings.TX_IDENTICALITY_WINDOW_HOURS,
-                    },
-                )
-                if ident_rows:
-                    tx_identicality_count = ident_rows[0].get("identical_count", 0) or 0
-                    tx_identicality_flag = tx_identicality_count >= settings.TX_IDENTICALITY_MIN_COUNT
-            except Exception:  # noqa: BLE001
-                pass
+            tx_identicality_count = bundle.get("identical_count", 0) or 0
+            tx_identicality_flag = tx_identicality_count >= _TX_IDENTICALITY_MIN_COUNT
 
         # ── fuse into 0–100 risk ─────────────────────────────
         risk = 0.0
@@ -258,10 +639,10 @@ class BehavioralFeatureExtractor:
         risk += (1.0 if spike else 0.0) * 10               # 0 or 10
         risk += (1.0 if dormant_burst else 0.0) * 15       # 0 or 15
         risk += asn_risk_scaled                             # 0–20
-        risk += (settings.IP_ROTATION_PENALTY if ip_rotation_flag else 0.0)  # 0 or 15
-        risk += (settings.FIXED_AMOUNT_PENALTY if fixed_amount_flag else 0.0)  # 0 or 10
+        risk += (_IP_ROTATION_PENALTY if ip_rotation_flag else 0.0)  # 0 or 15
+        risk += (_FIXED_AMOUNT_PENALTY if fixed_amount_flag else 0.0)  # 0 or 10
         risk += circadian_score                             # 0 or 20/35
-        risk += (settings.TX_IDENTICALITY_PENALTY if tx_identicality_flag else 0.0)  # 0 or 30
+        risk += (_TX_IDENTICALITY_PENALTY if tx_identicality_flag else 0.0)  # 0 or 30
         risk = min(risk, 100.0)
 
         flags = []
@@ -288,24 +669,26 @@ class BehavioralFeatureExtractor:
         if tx_identicality_flag:
             flags.append(
                 f"TX Identicality: {tx_identicality_count} identical amount "
-                f"transfers to same receiver in {settings.TX_IDENTICALITY_WINDOW_HOURS}h"
+                f"transfers to same receiver in {_TX_IDENTICALITY_WINDOW_HOURS}h"
             )
 
+        # Full precision on purpose: this dict stays inside the engine and the
+        # RiskResponse / breakdown round at the output boundary.
         features = {
-            "amount_zscore": round(amount_zscore, 4),
-            "rolling_mean": round(rolling_mean, 2),
-            "rolling_std": round(rolling_std, 2),
-            "time_since_last_tx": round(time_since_last, 2),
-            "velocity_score": round(velocity_score, 4),
-            "geo_distance_km": round(geo_distance, 2),
+            "amount_zscore": amount_zscore,
+            "rolling_mean": rolling_mean,
+            "rolling_std": rolling_std,
+            "time_since_last_tx": time_since_last,
+            "velocity_score": velocity_score,
+            "geo_distance_km": geo_distance,
             "impossible_travel": impossible_travel,
             "is_night": night_flag,
             "spike_flag": spike,
             "dormant_burst": dormant_burst,
             "iqr_outlier_flag": iqr_outlier_flag,
-            "ip_risk_score": round(asn_risk_scaled, 2),
+            "ip_risk_score": asn_risk_scaled,
             "asn_risk": asn_result.get("asn_risk", 0.0),
-            "asn_risk_scaled": round(asn_risk_scaled, 2),
+            "asn_risk_scaled": asn_risk_scaled,
             "asn_class": asn_result.get("asn_class", "UNKNOWN"),
             "asn_country": asn_result.get("country", ""),
             "foreign_flag": asn_result.get("foreign_flag", 0),
@@ -317,10 +700,10 @@ class BehavioralFeatureExtractor:
             "ip_rotation_flag": ip_rotation_flag,
             "fixed_amount_flag": fixed_amount_flag,
             "circadian_anomaly": circadian_anomaly,
-            "circadian_score": round(circadian_score, 2),
+            "circadian_score": circadian_score,
             "tx_identicality_flag": tx_identicality_flag,
             "tx_identicality_count": tx_identicality_count,
-            "risk": round(risk, 2),
+            "risk": risk,
             "flags": flags,
         }
         return features
@@ -8,7 +8,9 @@ and rapidly passes them through, it's a classic mule-activation pattern.
 Optimisations:
   • "First Strike" detection via QUERY_DORMANT_WAKEUP – single round-trip
     captures days_slept, recent_volume, is_first_strike, is_volume_spike
-  • Falls back to standard two-query path if wakeup query returns nothing
+  • Falls back to the legacy path if wakeup query returns nothing; that
+    path is one round-trip too (QUERY_DORMANT_BUNDLE), or only the flow
+    read when the sender's profile is in the baseline cache
 
 Risk sub-score  S_dead  ∈ [0, 100]
 """
@@ -17,14 +19,18 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, Optional, Tuple
+
+from neo4j.exceptions import ClientError
 
 from app.neo4j_manager import Neo4jManager
 from app.utils.cypher_queries import (
+    QUERY_DORMANT_BUNDLE,
     QUERY_DORMANT_STATUS,
     QUERY_DORMANT_WAKEUP,
     QUERY_RECENT_INFLOW_OUTFLOW,
 )
+from app.features.user_baseline import UserBaselineCache
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -33,8 +39,14 @@ logger = logging.getLogger(__name__)
 class DeadAccountDetector:
     """Evaluate dormant-account activation risk for a given user."""
 
-    def __init__(self, neo4j: Neo4jManager) -> None:
+    def __init__(
+        self, neo4j: Neo4jManager, baselines: Optional[UserBaselineCache] = None,
+    ) -> None:
         self.neo4j = neo4j
+        # shared with BehavioralFeatureExtractor; saves QUERY_DORMANT_STATUS when warm
+        self.baselines = baselines
+        # cleared if the server rejects QUERY_DORMANT_BUNDLE
+        self._use_bundle = True
 
     async def compute(self, user_id: str, tx_amount: float) -> Dict:
         """Return feature dict + fused dead-account risk 0–100."""
@@ -126,30 +138,70 @@ class DeadAccountDetector:
         return {
             "is_dormant": is_dormant,
             "is_first_strike": is_first_strike,
-            "days_inactive": round(days_slept, 1),
-            "days_slept": round(days_slept, 1),
-            "inactivity_score": round(inactivity_score, 2),
-            "spike_score": round(spike_score, 2),
-            "first_strike_bonus": round(first_strike_bonus, 2),
+            "days_inactive": days_slept,
+            "days_slept": days_slept,
+            "inactivity_score": inactivity_score,
+            "spike_score": spike_score,
+            "first_strike_bonus": first_strike_bonus,
             "pass_through_ratio": 0.0,
             "pass_through_score": 0.0,
             "tx_count": tx_count,
             "sleep_flash_flag": sleep_flash_flag,
-            "sleep_flash_ratio": round(sleep_flash_ratio, 2),
-            "risk": round(risk, 2),
+            "sleep_flash_ratio": sleep_flash_ratio,
+            "risk": risk,
             "flags": flags,
         }
 
-    # ── legacy two-query path ────────────────────────────────
+    # ── legacy path (status + flow) ──────────────────────────
+
+    async def _read_flow(self, user_id: str) -> Optional[Dict]:
+        rows = await self.neo4j.read_async(
+            QUERY_RECENT_INFLOW_OUTFLOW,
+            {"user_id": user_id, "window": settings.VELOCITY_WINDOW_SEC * 10},
+        )
+        return rows[0] if rows else None
+
+    async def _fetch_status_and_flow(
+        self, user_id: str,
+    ) -> Optional[Tuple[Dict, Optional[Dict]]]:
+        """
+        Dormant status + recent flow in one round trip; the two original
+        queries in sequence if the bundle is rejected.  None if no user.
+        """
+        if self._use_bundle:
+            try:
+                rows = await self.neo4j.read_async(
+                    QUERY_DORMANT_BUNDLE,
+                    {"user_id": user_id, "window": settings.VELOCITY_WINDOW_SEC * 10},
+                )
+                if not rows:
+                    return None
+                return rows[0].get("profile") or {}, rows[0].get("flow")
+            except ClientError as exc:
+                logger.warning("Dormant bundle query rejected – using per-query reads: %s", exc)
+                self._use_bundle = False
+            except Exception as exc:  # noqa: BLE001
+                # transient (pool timeout, leader switch): this call only
+                logger.warning("Dormant bundle query failed – per-query reads for this call: %s", exc)
 
-    async def _score_legacy(self, user_id: str, tx_amount: float) -> Dict:
         rows = await self.neo4j.read_async(
             QUERY_DORMANT_STATUS, {"user_id": user_id}
         )
         if not rows:
-            return {"is_dormant": False, "risk": 0.0, "flags": []}
+            return None
+        return rows[0], await self._read_flow(user_id)
+
+    async def _score_legacy(self, user_id: str, tx_amount: float) -> Dict:
+        baseline = self.baselines.get(user_id) if self.baselines else None
+        if baseline is not None and baseline.profile:
+            profile = baseline.profile
+            flow = await self._read_flow(user_id)
+        else:
+            fetched = await self._fetch_status_and_flow(user_id)
+            if fetched is None:
+                return {"is_dormant": False, "risk": 0.0, "flags": []}
+            profile, flow = fetched
 
-        profile = rows[0]
         is_dormant: bool = profile.get("is_dormant", False)
         last_active = profile.get("last_active")  # datetime | None
         tx_count: int = profile.get("tx_count", 0) or 0
@@ -171,14 +223,10 @@ class DeadAccountDetector:
             spike_score = 25.0
 
         # ── pass-through ratio (recent window) ───────────────
-        flow_rows = await self.neo4j.read_async(
-            QUERY_RECENT_INFLOW_OUTFLOW,
-            {"user_id": user_id, "window": settings.VELOCITY_WINDOW_SEC * 10},
-        )
         pass_through_ratio = 0.0
         pass_through_score = 0.0
-        if flow_rows:
-            f = flow_rows[0]
+        if flow:
+            f = flow
             inflow = f.get("recent_inflow", 0) or 0
             outflow = f.get("recent_outflow", 0) or 0
             if inflow > 0:
@@ -210,12 +258,12 @@ class DeadAccountDetector:
         return {
             "is_dormant": is_dormant,
             "is_first_strike": False,
-            "days_inactive": round(days_inactive, 1),
-            "inactivity_score": round(inactivity_score, 2),
-            "spike_score": round(spike_score, 2),
-            "pass_through_ratio": round(pass_through_ratio, 4),
-            "pass_through_score": round(pass_through_score, 2),
+            "days_inactive": days_inactive,
+            "inactivity_score": inactivity_score,
+            "spike_score": spike_score,
+            "pass_through_ratio": pass_through_ratio,
+            "pass_through_score": pass_through_score,
             "tx_count": tx_count,
-            "risk": round(risk, 2),
+            "risk": risk,
             "flags": flags,
         }
@@ -24,37 +24,226 @@ Risk sub-score  S_device  ∈ [0, 100]
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Dict, List, Optional
+import time
+from collections import OrderedDict
+from enum import IntFlag
+from typing import Dict, List, Optional, Tuple
+
+from neo4j.exceptions import ClientError
 
 from app.neo4j_manager import Neo4jManager
+from app.features._scoring_kernels import device_score
+from app.utils.micro_batch import MicroBatcher
+from app.utils.redis_cache import RedisEntityCache
 from app.utils.cypher_queries import (
+    QUERY_DEVICE_BUNDLE,
+    QUERY_DEVICE_BUNDLE_BATCH,
     QUERY_DEVICE_INFO,
     QUERY_DEVICE_RISK_PROPAGATION,
-    QUERY_USER_DEVICE_HISTORY,
     QUERY_DEVICE_USERS_24H,
 )
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
-
-def _hamming_distance(a: Optional[str], b: Optional[str]) -> int:
-    """Count bit differences between two binary mask strings."""
-    if not a or not b:
-        return 0
-    # Pad to equal length
-    max_len = max(len(a), len(b))
-    a = a.zfill(max_len)
-    b = b.zfill(max_len)
-    return sum(c1 != c2 for c1, c2 in zip(a, b))
+# Per-tx thresholds, bound once (settings are fixed after startup)
+_DEVICE_ACCOUNT_THRESHOLD = settings.DEVICE_ACCOUNT_THRESHOLD
+_DEVICE_MULTI_USER_THRESHOLD = settings.DEVICE_MULTI_USER_THRESHOLD
+_DEVICE_MULTI_USER_PENALTY = settings.DEVICE_MULTI_USER_PENALTY
+_CAPABILITY_MASK_CHANGE_WEIGHT = settings.CAPABILITY_MASK_CHANGE_WEIGHT
+_NEW_DEVICE_PENALTY = settings.NEW_DEVICE_PENALTY
+_NEW_DEVICE_HIGH_AMOUNT_THRESHOLD = settings.NEW_DEVICE_HIGH_AMOUNT_THRESHOLD
+_DEVICE_INFO_CACHE_TTL_SEC = settings.DEVICE_INFO_CACHE_TTL_SEC
+_DEVICE_INFO_MEMO_TTL_SEC = settings.DEVICE_INFO_MEMO_TTL_SEC
+_DEVICE_INFO_MEMO_MAX = settings.DEVICE_INFO_MEMO_MAX
+
+
+def _mask_int(mask: Optional[str]) -> Optional[int]:
+    """Parse a binary mask string; only for devices ingested before
+    capability_mask_int was stored (or a non-binary legacy mask → None)."""
+    if not mask:
+        return None
+    try:
+        return int(mask, 2)
+    except ValueError:
+        return None
+
+
+class DeviceFlag(IntFlag):
+    """Device-risk flags; carried as ``flag_bits`` and rendered by ``device_flag_strings``."""
+    SHARED_DEVICE = 1
+    HIGH_RISK_USER = 2
+    UNSUPPORTED_OS = 4
+    NEW_DEVICE = 8
+    CAP_MASK_CHANGED = 16
+    NEW_HIGH_MPIN = 32
+    SIM_SWAP = 64
+    OS_FAMILY_CHANGED = 128
+    FIRST_APPEARANCE = 256
+
+
+def device_flag_strings(device: Dict) -> List[str]:
+    """
+    Human-readable flags for a ``DeviceRiskExtractor.compute`` result –
+    called once per tx at the response boundary; the interpolated values
+    come from the result's own fields.
+    """
+    bits = device.get("flag_bits", 0)
+    if not bits:
+        return []
+    out: List[str] = []
+    if bits & DeviceFlag.FIRST_APPEARANCE:
+        out.append("New Device (First Appearance)")
+    if bits & DeviceFlag.SHARED_DEVICE:
+        out.append(f"Shared Device: {device['account_count']} accounts")
+    if bits & DeviceFlag.HIGH_RISK_USER:
+        out.append("Device Linked to High-Risk User")
+    if bits & DeviceFlag.UNSUPPORTED_OS:
+        out.append(f"Unsupported Device OS: {device['device_os']}")
+    if bits & DeviceFlag.NEW_DEVICE:
+        out.append("New Device for User")
+    if bits & DeviceFlag.CAP_MASK_CHANGED:
+        out.append(f"Capability Mask Changed (Hamming={device['cap_mask_anomaly']})")
+    if bits & DeviceFlag.NEW_HIGH_MPIN:
+        out.append("New Device + High Amount + MPIN")
+    if bits & DeviceFlag.SIM_SWAP:
+        out.append(f"SIM-Swap: {device['device_multi_user_count']} users on device in 24h")
+    if bits & DeviceFlag.OS_FAMILY_CHANGED:
+        out.append(f"OS family changed: {device['stored_os']} → {device['device_os']}")
+    if bits & DeviceFlag.CAP_MASK_CHANGED:
+        out.append(
+            f"Capability mask changed: {device['stored_capability_mask']} → "
+            f"{device['capability_mask']} (Hamming={device['cap_mask_anomaly']})"
+        )
+    return out
 
 
 class DeviceRiskExtractor:
     """Evaluate device-level fraud risk with v3 signals."""
 
-    def __init__(self, neo4j: Neo4jManager) -> None:
+    def __init__(
+        self, neo4j: Neo4jManager, cache: Optional[RedisEntityCache] = None,
+    ) -> None:
         self.neo4j = neo4j
+        # dev:{device_id} cache-aside (None = always read Neo4j)
+        self.cache = cache
+        # cleared if the server rejects QUERY_DEVICE_BUNDLE
+        self._use_bundle = True
+        # concurrent lookups coalesced into QUERY_DEVICE_BUNDLE_BATCH;
+        # cleared if the server rejects that query
+        self._batcher = MicroBatcher(
+            self._fetch_bundle_many, settings.BATCH_WINDOW_MS, settings.BATCH_MAX_SIZE,
+        )
+        self._use_batch = settings.EXTRACTOR_MICRO_BATCH
+        # in-process device_id → (expires_at, bundle) memo in front of Redis;
+        # LRU-capped, so a hot device skips Redis and Neo4j entirely
+        self._memo: OrderedDict[str, Tuple[float, Dict]] = OrderedDict()
+        self.memo_hits = 0
+
+    async def _fetch_bundle_many(self, device_ids: List[str]) -> Dict[str, Dict]:
+        rows = await self.neo4j.read_async(
+            QUERY_DEVICE_BUNDLE_BATCH, {"device_ids": device_ids}
+        )
+        return {r["device_id"]: r for r in rows}
+
+    async def _device_info(
+        self, device_id: str, sender_id: str,
+    ) -> Tuple[Optional[Dict], bool]:
+        """
+        ``(device bundle, sender already linked)`` via the in-process memo,
+        then the ``dev:`` cache.  A cached entry that does not list
+        *sender_id* among its users is re-read, so a new device pairing is
+        never judged from a stale entry; the membership test is done once
+        and reused by ``compute``.  Only the device bundle is memoised –
+        amount-dependent terms are always rescored.
+        """
+        now = time.monotonic()
+        hit = self._memo.get(device_id)
+        if hit is not None and hit[0] > now and sender_id in hit[1]["linked_users"]:
+            self._memo.move_to_end(device_id)
+            self.memo_hits += 1
+            return hit[1], True
+
+        info = None
+        if self.cache is not None:
+            cached = await self.cache.get("dev", device_id)
+            if cached is not None and sender_id in (cached.get("linked_users") or ()):
+                info = cached
+        if info is None:
+            info = await self._fetch_bundle(device_id)
+            if info is None:
+                return None, False
+            if self.cache is not None:
+                await self.cache.set("dev", device_id, info, _DEVICE_INFO_CACHE_TTL_SEC)
+
+        info["linked_users"] = info.get("linked_users") or []
+        self._memo[device_id] = (now + _DEVICE_INFO_MEMO_TTL_SEC, info)
+        self._memo.move_to_end(device_id)
+        if len(self._memo) > _DEVICE_INFO_MEMO_MAX:
+            self._memo.popitem(last=False)
+        return info, sender_id in info["linked_users"]
+
+    def invalidate(self, device_id: Optional[str] = None) -> None:
+        """Drop the in-process memo for one device, or for every device."""
+        if device_id is None:
+            self._memo.clear()
+        else:
+            self._memo.pop(device_id, None)
+
+    async def _fetch_bundle(self, device_id: str) -> Optional[Dict]:
+        """
+        All device-risk Neo4j inputs in one round trip, or None when the
+        device is not in the graph.  If the bundled query fails, fall back
+        to the individual queries run concurrently.
+        """
+        if self._use_batch:
+            try:
+                return await self._batcher.load(device_id)
+            except ClientError as exc:
+                logger.warning("Device batch query rejected – using per-tx bundles: %s", exc)
+                self._use_batch = False
+            except Exception as exc:  # noqa: BLE001
+                # transient (pool timeout, leader switch): this call only
+                logger.warning("Device batch query failed – per-tx bundles for this call: %s", exc)
+
+        if self._use_bundle:
+            try:
+                rows = await self.neo4j.read_async(
+                    QUERY_DEVICE_BUNDLE, {"device_id": device_id}
+                )
+                return rows[0] if rows else None
+            except ClientError as exc:
+                logger.warning("Device bundle query rejected – using per-query reads: %s", exc)
+                self._use_bundle = False
+            except Exception as exc:  # noqa: BLE001
+                # transient (pool timeout, leader switch): this call only
+                logger.warning("Device bundle query failed – per-query reads for this call: %s", exc)
+
+        info_rows, prop_rows, multi_user_rows = await asyncio.gather(
+            self.neo4j.read_async(QUERY_DEVICE_INFO, {"device_id": device_id}),
+            self.neo4j.read_async(QUERY_DEVICE_RISK_PROPAGATION, {"device_id": device_id}),
+            self.neo4j.read_async(QUERY_DEVICE_USERS_24H, {"device_id": device_id}),
+        )
+        if not info_rows:
+            return None
+
+        info = info_rows[0]
+        prop = prop_rows[0] if prop_rows else {}
+        return {
+            "device_id": device_id,
+            "os": info.get("os"),
+            "capability_mask": info.get("capability_mask"),
+            "account_count": info.get("account_count"),
+            "linked_users": info.get("linked_users") or [],
+            "avg_user_risk": prop.get("avg_user_risk"),
+            "max_user_risk": prop.get("max_user_risk"),
+            "unique_users_24h": (
+                multi_user_rows[0].get("unique_users_24h", 0) if multi_user_rows else 0
+            ),
+            "device_risk_score": prop.get("device_risk_score", 0),
+        }
 
     async def compute(
         self,
@@ -66,167 +255,124 @@ class DeviceRiskExtractor:
         device_os: Optional[str] = None,
         credential_type: Optional[str] = None,
         credential_sub_type: Optional[str] = None,
+        capability_mask_int: Optional[int] = None,
     ) -> Dict:
-        """Return feature dict + fused device risk 0–100."""
-
-        # ── basic device info ────────────────────────────────
-        info_rows = await self.neo4j.read_async(
-            QUERY_DEVICE_INFO, {"device_id": device_id}
-        )
-        if not info_rows:
+        """
+        Return feature dict + fused device risk 0–100.  *capability_mask_int*
+        is the mask parsed at the API boundary; the string is display-only.
+        """
+
+        # ── device info, linked users, propagation, 24h users (cached / one trip) ──
+        info, is_known_device = await self._device_info(device_id, sender_id)
+        if info is None:
             # Brand new device — never seen at all
             return self._score_new_device(
                 device_id, sender_id, amount, app_version,
                 capability_mask, device_os, credential_type, credential_sub_type,
             )
 
-        info = info_rows[0]
         account_count: int = info.get("account_count", 1) or 1
         stored_os = (info.get("os") or "").strip()
         stored_mask = info.get("capability_mask")
+        stored_mask_int = info.get("capability_mask_int")
+        if stored_mask_int is None:
+            stored_mask_int = _mask_int(stored_mask)
+        if capability_mask_int is None:
+            capability_mask_int = _mask_int(capability_mask)
 
         # ── device history for this user (drift detection) ───
-        history_rows = await self.neo4j.read_async(
-            QUERY_USER_DEVICE_HISTORY, {"user_id": sender_id}
-        )
-        known_device_ids = [r["device_id"] for r in history_rows] if history_rows else []
-        is_new_device = device_id not in known_device_ids
+        is_new_device = not is_known_device
 
         # ── risk propagation from linked users ───────────────
-        prop_rows = await self.neo4j.read_async(
-            QUERY_DEVICE_RISK_PROPAGATION, {"device_id": device_id}
-        )
-        prop = prop_rows[0] if prop_rows else {}
-        device_risk_score: float = prop.get("device_risk_score", 0)
-        avg_user_risk: float = prop.get("avg_user_risk", 0) or 0
-        max_user_risk: float = prop.get("max_user_risk", 0) or 0
+        device_risk_score: float = info.get("device_risk_score", 0) or 0
+        avg_user_risk: float = info.get("avg_user_risk", 0) or 0
+        max_user_risk: float = info.get("max_user_risk", 0) or 0
 
         # ── SIM-swap: multi-user device in 24h ───────────
-        multi_user_rows = await self.neo4j.read_async(
-            QUERY_DEVICE_USERS_24H, {"device_id": device_id}
-        )
-        device_multi_user_count = 0
-        device_multi_user_flag = False
-        if multi_user_rows:
-            device_multi_user_count = multi_user_rows[0].get("unique_users_24h", 0) or 0
-            device_multi_user_flag = device_multi_user_count > settings.DEVICE_MULTI_USER_THRESHOLD
+        device_multi_user_count: int = info.get("unique_users_24h", 0) or 0
+        device_multi_user_flag = device_multi_user_count > _DEVICE_MULTI_USER_THRESHOLD
 
         # ══════════════════════════════════════════════════════
         # Scoring components
         # ══════════════════════════════════════════════════════
 
-        # 1. Multi-account penalty (up to 40)
-        multi_account_score = 0.0
-        if account_count >= settings.DEVICE_ACCOUNT_THRESHOLD:
-            multi_account_score = 40.0
-        elif account_count >= 3:
-            multi_account_score = 25.0
-        elif account_count >= 2:
-            multi_account_score = 10.0
-
-        # 2. Risk propagation (up to 25)
-        propagation_score = min(device_risk_score / 100.0, 1.0) * 25
-
-        # 3. Neighbour high-risk bonus (up to 10)
-        high_risk_bonus = 10.0 if max_user_risk > 80 else 0.0
-
-        # 4. OS anomaly / non-standard (up to 10)
-        os_anomaly_score = 0.0
+        # String work stays here; the arithmetic runs in device_score()
         effective_os = device_os or stored_os
+        os_anomaly = False
         if effective_os:
             os_lc = effective_os.lower()
-            if not (os_lc.startswith("android") or os_lc.startswith("ios")):
-                os_anomaly_score = 10.0
+            os_anomaly = not (os_lc.startswith("android") or os_lc.startswith("ios"))
 
-        # 5. Device drift score (up to 15)
-        device_drift_score = 0.0
-        drift_flags: List[str] = []
-
-        # 5a. OS change (device reports different OS family)
+        # OS change (device reports different OS family)
+        os_family_changed = False
         if stored_os and device_os:
             stored_family = stored_os.lower().split()[0] if stored_os else ""
             current_family = device_os.lower().split()[0] if device_os else ""
             if stored_family and current_family and stored_family != current_family:
-                device_drift_score += 5.0
-                drift_flags.append(f"OS family changed: {stored_os} → {device_os}")
+                os_family_changed = True
 
-        # 5b. Capability mask change (Hamming distance)
+        # Capability mask change (Hamming distance)
         cap_mask_anomaly = 0
-        if capability_mask and stored_mask and capability_mask != stored_mask:
-            cap_mask_anomaly = _hamming_distance(capability_mask, stored_mask)
-            cap_mask_penalty = min(cap_mask_anomaly * settings.CAPABILITY_MASK_CHANGE_WEIGHT * 0.3, 5.0)
-            device_drift_score += cap_mask_penalty
-            drift_flags.append(
-                f"Capability mask changed: {stored_mask} → {capability_mask} "
-                f"(Hamming={cap_mask_anomaly})"
-            )
-
-        device_drift_score = min(device_drift_score, 15.0)
-
-        # 6. New device penalty (up to 12)
-        new_device_score = settings.NEW_DEVICE_PENALTY if is_new_device else 0.0
-
-        # 7. SIM-swap multi-user device penalty (up to 25)
-        sim_swap_score = settings.DEVICE_MULTI_USER_PENALTY if device_multi_user_flag else 0.0
-
-        # 8. New device + high amount + MPIN (compound signal, up to 15)
-        new_device_high_mpin_score = 0.0
-        if (is_new_device
-                and amount >= settings.NEW_DEVICE_HIGH_AMOUNT_THRESHOLD
-                and credential_sub_type and credential_sub_type.upper() == "MPIN"):
-            new_device_high_mpin_score = 15.0
-
-        # ── fuse ─────────────────────────────────────────────
-        risk = (
-            multi_account_score
-            + propagation_score
-            + high_risk_bonus
-            + os_anomaly_score
-            + device_drift_score
-            + new_device_score
-            + sim_swap_score
-            + new_device_high_mpin_score
+        if (capability_mask_int is not None and stored_mask_int is not None
+                and capability_mask_int != stored_mask_int):
+            cap_mask_anomaly = (capability_mask_int ^ stored_mask_int).bit_count()
+
+        (risk, multi_account_score, propagation_score, high_risk_bonus,
+         os_anomaly_score, device_drift_score, new_device_score, sim_swap_score,
+         new_device_high_mpin_score) = device_score(
+            account_count, _DEVICE_ACCOUNT_THRESHOLD,
+            float(device_risk_score), float(max_user_risk),
+            os_anomaly, os_family_changed,
+            cap_mask_anomaly, _CAPABILITY_MASK_CHANGE_WEIGHT,
+            is_new_device, _NEW_DEVICE_PENALTY,
+            device_multi_user_flag, _DEVICE_MULTI_USER_PENALTY,
+            float(amount), _NEW_DEVICE_HIGH_AMOUNT_THRESHOLD,
+            bool(credential_sub_type and credential_sub_type.upper() == "MPIN"),
         )
-        risk = min(risk, 100.0)
 
-        flags: List[str] = []
-        if account_count >= settings.DEVICE_ACCOUNT_THRESHOLD:
-            flags.append(f"Shared Device: {account_count} accounts")
+        # flag bits only; strings are rendered by device_flag_strings()
+        flag_bits = 0
+        if account_count >= _DEVICE_ACCOUNT_THRESHOLD:
+            flag_bits |= DeviceFlag.SHARED_DEVICE
         if max_user_risk > 80:
-            flags.append("Device Linked to High-Risk User")
+            flag_bits |= DeviceFlag.HIGH_RISK_USER
         if os_anomaly_score > 0:
-            flags.append(f"Unsupported Device OS: {effective_os}")
+            flag_bits |= DeviceFlag.UNSUPPORTED_OS
         if is_new_device:
-            flags.append("New Device for User")
+            flag_bits |= DeviceFlag.NEW_DEVICE
         if cap_mask_anomaly > 0:
-            flags.append(f"Capability Mask Changed (Hamming={cap_mask_anomaly})")
+            flag_bits |= DeviceFlag.CAP_MASK_CHANGED
         if new_device_high_mpin_score > 0:
-            flags.append("New Device + High Amount + MPIN")
+            flag_bits |= DeviceFlag.NEW_HIGH_MPIN
         if device_multi_user_flag:
-            flags.append(f"SIM-Swap: {device_multi_user_count} users on device in 24h")
-        flags.extend(drift_flags)
+            flag_bits |= DeviceFlag.SIM_SWAP
+        if os_family_changed:
+            flag_bits |= DeviceFlag.OS_FAMILY_CHANGED
 
+        # unrounded: only RiskResponse / RiskBreakdown round (output boundary)
         return {
             "device_id": device_id,
             "account_count": account_count,
             "device_os": effective_os,
             "app_version": app_version,
             "capability_mask": capability_mask,
-            "avg_user_risk": round(avg_user_risk, 2),
-            "max_user_risk": round(max_user_risk, 2),
-            "multi_account_score": round(multi_account_score, 2),
-            "propagation_score": round(propagation_score, 2),
-            "os_anomaly_score": round(os_anomaly_score, 2),
-            "device_drift_score": round(device_drift_score, 2),
+            "avg_user_risk": avg_user_risk,
+            "max_user_risk": max_user_risk,
+            "multi_account_score": multi_account_score,
+            "propagation_score": propagation_score,
+            "os_anomaly_score": os_anomaly_score,
+            "device_drift_score": device_drift_score,
             "new_device_flag": is_new_device,
-            "new_device_score": round(new_device_score, 2),
+            "new_device_score": new_device_score,
             "cap_mask_anomaly": cap_mask_anomaly,
             "new_device_high_mpin": new_device_high_mpin_score > 0,
             "device_multi_user_flag": device_multi_user_flag,
             "device_multi_user_count": device_multi_user_count,
-            "sim_swap_score": round(sim_swap_score, 2),
-            "risk": round(risk, 2),
-            "flags": flags,
+            "sim_swap_score": sim_swap_score,
+            "risk": risk,
+            "stored_os": stored_os,
+            "stored_capability_mask": stored_mask,
+            "flag_bits": int(flag_bits),
         }
 
     def _score_new_device(
@@ -236,16 +382,16 @@ class DeviceRiskExtractor:
         credential_sub_type: Optional[str],
     ) -> Dict:
         """Score a device never seen in the graph."""
-        risk = settings.NEW_DEVICE_PENALTY  # base new-device penalty
+        risk = _NEW_DEVICE_PENALTY  # base new-device penalty
 
-        flags = ["New Device (First Appearance)"]
+        flag_bits = DeviceFlag.FIRST_APPEARANCE
 
         # Compound: new device + high amount + MPIN
         compound = 0.0
-        if (amount >= settings.NEW_DEVICE_HIGH_AMOUNT_THRESHOLD
+        if (amount >= _NEW_DEVICE_HIGH_AMOUNT_THRESHOLD
                 and credential_sub_type and credential_sub_type.upper() == "MPIN"):
             compound = 15.0
-            flags.append("New Device + High Amount + MPIN")
+            flag_bits |= DeviceFlag.NEW_HIGH_MPIN
 
         risk += compound
         risk = min(risk, 100.0)
@@ -263,12 +409,12 @@ class DeviceRiskExtractor:
             "os_anomaly_score": 0.0,
             "device_drift_score": 0.0,
             "new_device_flag": True,
-            "new_device_score": settings.NEW_DEVICE_PENALTY,
+            "new_device_score": _NEW_DEVICE_PENALTY,
             "cap_mask_anomaly": 0,
             "new_device_high_mpin": compound > 0,
             "device_multi_user_flag": False,
             "device_multi_user_count": 0,
             "sim_swap_score": 0.0,
-            "risk": round(risk, 2),
-            "flags": flags,
+            "risk": risk,
+            "flag_bits": int(flag_bits),
         }
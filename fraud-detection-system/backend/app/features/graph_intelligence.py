@@ -10,41 +10,96 @@ graph risk sub-score  S_graph  ∈ [0, 100].
 from __future__ import annotations
 
 import logging
-from typing import Dict
+from typing import Dict, List, Optional
+
+from neo4j.exceptions import ClientError
 
 from app.neo4j_manager import Neo4jManager
+from app.features._scoring_kernels import graph_score
+from app.utils.micro_batch import MicroBatcher
+from app.utils.redis_cache import RedisEntityCache
 from app.utils.cypher_queries import (
     QUERY_USER_GRAPH_FEATURES,
+    QUERY_USER_GRAPH_FEATURES_BATCH,
     QUERY_COMMUNITY_STATS,
 )
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Per-tx thresholds, bound once (settings are fixed after startup)
+_COMMUNITY_STATS_CACHE_TTL_SEC = settings.COMMUNITY_STATS_CACHE_TTL_SEC
+
 
 class GraphIntelligenceExtractor:
     """Per-transaction graph risk scoring (fast-path reads)."""
 
-    def __init__(self, neo4j: Neo4jManager) -> None:
+    def __init__(
+        self, neo4j: Neo4jManager, cache: Optional[RedisEntityCache] = None,
+    ) -> None:
         self.neo4j = neo4j
+        # community:{id} cache-aside, invalidated by GraphAnalyzer
+        self.cache = cache
+        # concurrent lookups coalesced into QUERY_USER_GRAPH_FEATURES_BATCH;
+        # cleared if the server rejects that query
+        self._batcher = MicroBatcher(
+            self._features_many, settings.BATCH_WINDOW_MS, settings.BATCH_MAX_SIZE,
+        )
+        self._use_batch = settings.EXTRACTOR_MICRO_BATCH
 
-    async def compute(self, user_id: str) -> Dict:
-        """Return feature dict + fused graph risk 0–100."""
+    async def _features_many(self, user_ids: List[str]) -> Dict[str, Dict]:
+        rows = await self.neo4j.read_async(
+            QUERY_USER_GRAPH_FEATURES_BATCH, {"user_ids": user_ids}
+        )
+        return {r["user_id"]: r for r in rows}
 
+    async def _features(self, user_id: str) -> Optional[Dict]:
+        if self._use_batch:
+            try:
+                return await self._batcher.load(user_id)
+            except ClientError as exc:
+                logger.warning("Graph feature batch query rejected – using per-tx reads: %s", exc)
+                self._use_batch = False
+            except Exception as exc:  # noqa: BLE001
+                # transient (pool timeout, leader switch): this call only
+                logger.warning("Graph feature batch query failed – per-tx reads for this call: %s", exc)
         rows = await self.neo4j.read_async(
             QUERY_USER_GRAPH_FEATURES, {"user_id": user_id}
         )
-        if not rows:
+        return rows[0] if rows else None
+
+    async def _community_stats(self, community_id) -> Optional[Dict]:
+        """QUERY_COMMUNITY_STATS row for *community_id*, via the cache."""
+        if self.cache is not None:
+            cached = await self.cache.get("community", community_id)
+            # rows cached before community_risk was returned are re-read
+            if cached is not None and "community_risk" in cached:
+                return cached
+        rows = await self.neo4j.read_async(
+            QUERY_COMMUNITY_STATS, {"community_id": community_id}
+        )
+        s = rows[0] if rows else None
+        if s is not None and self.cache is not None:
+            await self.cache.set(
+                "community", community_id, s, _COMMUNITY_STATS_CACHE_TTL_SEC,
+            )
+        return s
+
+    async def compute(self, user_id: str) -> Dict:
+        """Return feature dict + fused graph risk 0–100."""
+
+        f = await self._features(user_id)
+        if f is None:
             return {"user_id": user_id, "risk": 0.0, "flags": []}
 
-        f = rows[0]
-        in_degree: int = f.get("in_degree", 0) or 0
-        out_degree: int = f.get("out_degree", 0) or 0
-        betweenness: float = f.get("betweenness") or 0.0
-        pagerank: float = f.get("pagerank") or 0.0
-        clustering_coeff: float = f.get("clustering_coeff") or 0.0
+        # typed, non-null columns (see QUERY_USER_GRAPH_FEATURES)
+        in_degree: int = f["in_degree"]
+        out_degree: int = f["out_degree"]
+        betweenness: float = f["betweenness"]
+        pagerank: float = f["pagerank"]
+        clustering_coeff: float = f["clustering_coeff"]
         community_id = f.get("community_id")
-        avg_neighbor_risk: float = f.get("avg_neighbor_risk", 0) or 0.0
+        avg_neighbor_risk: float = f["avg_neighbor_risk"]
         device_account_count: int = f.get("device_account_count", 0) or 0
 
         # ── community risk ───────────────────────────────────
@@ -53,54 +108,19 @@ class GraphIntelligenceExtractor:
         if community_id is not None:
             cluster_id_str = str(community_id)
             try:
-                stats = await self.neo4j.read_async(
-                    QUERY_COMMUNITY_STATS, {"community_id": community_id}
-                )
-                if stats:
-                    s = stats[0]
-                    member_count = s.get("member_count", 0) or 0
-                    avg_risk = s.get("avg_risk", 0) or 0
-                    high_risk_count = s.get("high_risk_count", 0) or 0
-                    # dense high-risk cluster = suspicious
-                    if member_count >= 3 and avg_risk > 50:
-                        community_risk = min(avg_risk, 100)
-                    elif high_risk_count >= 2:
-                        community_risk = 40.0
+                s = await self._community_stats(community_id)
+                if s:
+                    # scored server-side (see QUERY_COMMUNITY_STATS)
+                    community_risk = s.get("community_risk", 0) or 0.0
             except Exception:  # noqa: BLE001
                 pass
 
-        # ── centrality risk (betweenness) ────────────────────
-        # Normalised: typical betweenness for a 500-node graph peaks ~0.1
-        centrality_score = min(betweenness * 200, 30)  # up to 30
-
-        # ── pagerank risk ────────────────────────────────────
-        # Higher pagerank = more "important" in transfer network → could be router
-        pagerank_score = min(pagerank * 500, 15)  # up to 15
-
-        # ── structural anomaly ───────────────────────────────
-        structural_score = 0.0
-        # Fan-out pattern (distributor)
-        if out_degree >= 5 and in_degree <= 2:
-            structural_score += 15
-        # Fan-in pattern (collector)
-        if in_degree >= 5 and out_degree <= 2:
-            structural_score += 15
-        # High local clustering + high degree = tightly-knit ring
-        if clustering_coeff > 0.5 and (in_degree + out_degree) > 4:
-            structural_score += 10
-
-        # ── neighbour risk contagion ─────────────────────────
-        neighbor_contagion = min(avg_neighbor_risk * 0.3, 15)
-
-        # ── fuse ─────────────────────────────────────────────
-        risk = (
-            community_risk * 0.30
-            + centrality_score
-            + pagerank_score
-            + structural_score
-            + neighbor_contagion
+        # ── centrality / pagerank / structural / contagion + fuse ──
+        (risk, centrality_score, _pagerank_score, structural_score,
+         _neighbor_contagion) = graph_score(
+            float(community_risk), betweenness, pagerank,
+            in_degree, out_degree, clustering_coeff, avg_neighbor_risk,
         )
-        risk = min(risk, 100.0)
 
         flags = []
         if betweenness > 0.05:
@@ -112,18 +132,19 @@ class GraphIntelligenceExtractor:
         if in_degree >= 5 and out_degree <= 2:
             flags.append("Fan-In Hub (Collector)")
 
+        # engine-internal, so kept at full precision
         return {
             "user_id": user_id,
             "in_degree": in_degree,
             "out_degree": out_degree,
-            "betweenness": round(betweenness, 6),
-            "pagerank": round(pagerank, 6),
-            "clustering_coeff": round(clustering_coeff, 4),
+            "betweenness": betweenness,
+            "pagerank": pagerank,
+            "clustering_coeff": clustering_coeff,
             "community_id": cluster_id_str,
-            "community_risk": round(community_risk, 2),
-            "centrality_score": round(centrality_score, 2),
-            "structural_score": round(structural_score, 2),
-            "avg_neighbor_risk": round(avg_neighbor_risk, 2),
-            "risk": round(risk, 2),
+            "community_risk": community_risk,
+            "centrality_score": centrality_score,
+            "structural_score": structural_score,
+            "avg_neighbor_risk": avg_neighbor_risk,
+            "risk": risk,
             "flags": flags,
         }
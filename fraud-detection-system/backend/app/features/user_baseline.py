@@ -0,0 +1,306 @@
+"""
+Per-sender baseline cache.
+
+The user profile (avg / std amount, last location, dormancy, the 24-slot
+hour_hist) and the last-N transaction window move slowly
+or incrementally, yet every transaction used to re-read all three from
+Neo4j.  This keeps them in process for ``USER_BASELINE_TTL_SEC`` and
+patches them at ingest time:
+
+  • window.append((amount, ts)) with O(1) Welford mean / variance update
+  • hour_hist[hour] += 1, total_tx += 1
+  • last_active = tx timestamp, is_dormant = False
+
+which mirrors what INGEST_TRANSACTION does to the graph.  Aggregates that
+only the batch cycle recomputes (avg / std amount, tx_count) simply age
+out with the TTL.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.detection.anomaly_detection import quartiles
+
+# newest window rows considered "recent" (as QUERY_RECENT_AMOUNTS' LIMIT)
+_RECENT_AMOUNTS_LIMIT = 20
+
+# window pushes between (Q1, Q3) recomputes – quartiles of a sliding
+# window drift slowly, so a few-tx lag is harmless
+_QUARTILE_REFRESH_EVERY = 5
+
+
+def _as_epoch(ts: object) -> Optional[float]:
+    """
+    Normalise a history timestamp once, on the way into the window, to
+    epoch seconds: neo4j.time.DateTime → native, naive → UTC, anything
+    else → None.
+    """
+    if hasattr(ts, "to_native"):
+        ts = ts.to_native()
+    if not isinstance(ts, datetime):
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+@dataclass(slots=True)
+class HistoryColumns:
+    """
+    Column (SoA) view of QUERY_USER_TX_HISTORY rows, built once at the
+    driver boundary.  Oldest first; 0.0 / NaN mark a missing amount / ts.
+    """
+
+    amounts: np.ndarray   # float64
+    epochs: np.ndarray    # float64 epoch seconds
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict], limit: Optional[int] = None) -> "HistoryColumns":
+        """*rows* newest first (query order); keeps the newest *limit*."""
+        if limit is not None:
+            rows = rows[:limit]
+        n = len(rows)
+        amounts = np.fromiter(
+            (r.get("amount") or 0.0 for r in reversed(rows)), dtype=np.float64, count=n,
+        )
+        epochs = np.fromiter(
+            (_epoch_or_nan(r.get("timestamp")) for r in reversed(rows)),
+            dtype=np.float64, count=n,
+        )
+        return cls(amounts=amounts, epochs=epochs)
+
+
+def _epoch_or_nan(ts: object) -> float:
+    e = _as_epoch(ts)
+    return math.nan if e is None else e
+
+
+@dataclass(slots=True)
+class BaselineStats:
+    """Welford running mean / M2 over a sliding window of amounts."""
+
+    n: int = 0
+    mean: float = 0.0
+    M2: float = 0.0
+
+    def push(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.M2 += delta * (x - self.mean)
+
+    def pop(self, x: float) -> None:
+        """Remove a value previously pushed (window eviction)."""
+        if self.n <= 1:
+            self.n, self.mean, self.M2 = 0, 0.0, 0.0
+            return
+        n = self.n - 1
+        delta = x - self.mean
+        mean = self.mean - delta / n
+        self.M2 = max(self.M2 - delta * (x - mean), 0.0)
+        self.n, self.mean = n, mean
+
+    @property
+    def std(self) -> float:
+        # population σ (ddof=0) – same as the np.std it replaces
+        return math.sqrt(self.M2 / self.n) if self.n else 0.0
+
+    @classmethod
+    def from_array(cls, values: np.ndarray) -> "BaselineStats":
+        """Seed from a batch in one vector pass (same state as n pushes)."""
+        n = int(values.size)
+        if not n:
+            return cls()
+        mean = float(values.mean())
+        d = values - mean
+        return cls(n=n, mean=mean, M2=float(np.dot(d, d)))
+
+
+@dataclass(slots=True)
+class UserBaseline:
+    """Cached slow-moving baseline for one sender."""
+
+    profile: Dict
+    # tx count per send hour 0–23 (User.hour_hist) and their sum
+    hour_hist: List[int]
+    total_tx: int
+    expires_at: float
+    # last BEHAVIORAL_HISTORY_COUNT transactions as (amount, epoch sec | None),
+    # oldest first
+    window: Deque[Tuple[Optional[float], Optional[float]]] = field(default_factory=deque)
+    # Welford stats over the truthy amounts in ``window``
+    stats: BaselineStats = field(default_factory=BaselineStats)
+    # (Q1, Q3) of the same amounts, recomputed lazily every few pushes
+    _quartiles: Optional[Tuple[float, float]] = None
+    _pushes_since_quartiles: int = 0
+    # bit h set ⇔ hour h holds <2% of the sender's tx; None = recompute
+    _rare_hour_mask: Optional[int] = None
+    # tx amount → fixed-amount verdict; valid until the window moves
+    fixed_amount_memo: Dict[float, bool] = field(default_factory=dict)
+    # consecutive fused scores < LOW_RISK_SCORE_MAX, and the IP last scored
+    low_risk_streak: int = 0
+    last_ip: Optional[str] = None
+
+    @property
+    def is_low_risk(self) -> bool:
+        return self.low_risk_streak >= settings.LOW_RISK_FASTPATH_STREAK
+
+    def push_tx(self, amount: Optional[float], timestamp: object) -> None:
+        if len(self.window) == self.window.maxlen:
+            old_amount, _ = self.window[0]
+            if old_amount:
+                self.stats.pop(old_amount)
+        self.window.append((amount, _as_epoch(timestamp)))
+        if amount:
+            self.stats.push(amount)
+            self._pushes_since_quartiles += 1
+        self.fixed_amount_memo.clear()
+
+    def recent_amounts(self, now_epoch: float, window_sec: float) -> List[float]:
+        """
+        Amounts of the newest ≤20 window tx inside *window_sec* – what
+        QUERY_RECENT_AMOUNTS returns, without the round trip.
+        """
+        cutoff = now_epoch - window_sec
+        out: List[float] = []
+        taken = 0
+        for amount, ts in reversed(self.window):
+            if ts is None or ts <= cutoff:
+                continue
+            taken += 1
+            if amount:
+                out.append(amount)
+            if taken >= _RECENT_AMOUNTS_LIMIT:
+                break
+        return out
+
+    def quartiles(self) -> Tuple[float, float]:
+        """(Q1, Q3) of the window amounts; recomputed every few pushes."""
+        if self._quartiles is None or self._pushes_since_quartiles >= _QUARTILE_REFRESH_EVERY:
+            self._quartiles = quartiles([a for a, _ in self.window if a])
+            self._pushes_since_quartiles = 0
+        return self._quartiles
+
+    def rare_hour_mask(self) -> int:
+        """
+        24-bit mask of hours that are unusual for this sender (<2% of their
+        transactions).  0 until there are ≥3 distinct hours and ≥10 tx.
+        """
+        if self._rare_hour_mask is None:
+            mask = 0
+            total = self.total_tx
+            hist = self.hour_hist
+            if total >= 10 and sum(1 for c in hist if c) >= 3:
+                for h in range(24):
+                    if hist[h] / total < 0.02:
+                        mask |= 1 << h
+            self._rare_hour_mask = mask
+        return self._rare_hour_mask
+
+
+class UserBaselineCache:
+    """In-process TTL cache of ``UserBaseline`` keyed by sender_id (LRU-capped)."""
+
+    def __init__(
+        self,
+        ttl_sec: Optional[float] = None,
+        max_users: Optional[int] = None,
+        window_size: Optional[int] = None,
+    ) -> None:
+        self.ttl_sec = ttl_sec if ttl_sec is not None else settings.USER_BASELINE_TTL_SEC
+        self.max_users = max_users if max_users is not None else settings.USER_BASELINE_MAX_USERS
+        self.window_size = window_size if window_size is not None else settings.BEHAVIORAL_HISTORY_COUNT
+        self._entries: OrderedDict[str, UserBaseline] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[UserBaseline]:
+        """Return the live baseline for *user_id*, or None if absent / expired."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry
+
+    def put(
+        self,
+        user_id: str,
+        profile: Optional[Dict],
+        history: List[Dict],
+    ) -> UserBaseline:
+        """
+        Store a freshly loaded profile (with its hour_hist / hour_total) and
+        tx history (newest first, as QUERY_USER_TX_HISTORY returns it) for
+        *user_id*.
+        """
+        profile = dict(profile) if profile else {}
+        hour_hist = list(profile.get("hour_hist") or ())
+        hour_hist = (hour_hist + [0] * 24)[:24]
+        cols = HistoryColumns.from_rows(history, self.window_size)
+        epochs: List[Optional[float]] = [
+            None if e != e else e for e in cols.epochs.tolist()  # NaN → None
+        ]
+        amounts: List[Optional[float]] = [a or None for a in cols.amounts.tolist()]
+        entry = UserBaseline(
+            profile=profile,
+            hour_hist=hour_hist,
+            total_tx=profile.get("hour_total") or sum(hour_hist),
+            expires_at=time.monotonic() + self.ttl_sec,
+            window=deque(zip(amounts, epochs), maxlen=self.window_size),
+            stats=BaselineStats.from_array(cols.amounts[cols.amounts != 0.0]),
+        )
+        self._entries[user_id] = entry
+        self._entries.move_to_end(user_id)
+        if len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+        return entry
+
+    def record_transaction(self, user_id: str, amount: float, timestamp: datetime) -> None:
+        """
+        Apply a just-ingested transaction to the cached baseline, if any.
+        Call right after the graph write and before scoring: a miss loaded
+        later already sees the transaction in Neo4j.
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return
+        entry.push_tx(amount, timestamp)
+        entry.hour_hist[timestamp.hour] += 1
+        entry.total_tx += 1
+        entry._rare_hour_mask = None
+        entry.profile["last_active"] = timestamp
+        entry.profile["is_dormant"] = False
+
+    def record_score(self, user_id: str, score: float) -> None:
+        """Track the sender's low-risk streak; any higher score resets it."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return
+        if score < settings.LOW_RISK_SCORE_MAX:
+            entry.low_risk_streak += 1
+        else:
+            entry.low_risk_streak = 0
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -10,69 +10,80 @@ Risk sub-score  S_velocity  ∈ [0, 100]
 from __future__ import annotations
 
 import logging
-from typing import Dict
+from typing import Dict, List, Optional
+
+from neo4j.exceptions import ClientError
 
 from app.neo4j_manager import Neo4jManager
-from app.utils.cypher_queries import QUERY_VELOCITY_FEATURES
+from app.features._scoring_kernels import velocity_score
+from app.utils.micro_batch import MicroBatcher
+from app.utils.cypher_queries import QUERY_VELOCITY_FEATURES, QUERY_VELOCITY_FEATURES_BATCH
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Per-tx thresholds, bound once (settings are fixed after startup)
+_BURST_TX_THRESHOLD = settings.BURST_TX_THRESHOLD
+_PASS_THROUGH_RATIO_THRESHOLD = settings.PASS_THROUGH_RATIO_THRESHOLD
+_VELOCITY_WINDOW_SEC = settings.VELOCITY_WINDOW_SEC
+
 
 class VelocityExtractor:
     """Time-windowed velocity and pass-through scoring."""
 
     def __init__(self, neo4j: Neo4jManager) -> None:
         self.neo4j = neo4j
+        # concurrent lookups coalesced into QUERY_VELOCITY_FEATURES_BATCH;
+        # cleared if the server rejects that query
+        self._batcher = MicroBatcher(
+            self._features_many, settings.BATCH_WINDOW_MS, settings.BATCH_MAX_SIZE,
+        )
+        self._use_batch = settings.EXTRACTOR_MICRO_BATCH
 
-    async def compute(self, user_id: str, tx_amount: float) -> Dict:
-        """Return feature dict + fused velocity risk 0–100."""
-
+    async def _features_many(self, user_ids: List[str]) -> Dict[str, Dict]:
+        rows = await self.neo4j.read_async(
+            QUERY_VELOCITY_FEATURES_BATCH,
+            {"user_ids": user_ids, "window": _VELOCITY_WINDOW_SEC},
+        )
+        return {r["user_id"]: r for r in rows}
+
+    async def _features(self, user_id: str) -> Optional[Dict]:
+        if self._use_batch:
+            try:
+                return await self._batcher.load(user_id)
+            except ClientError as exc:
+                logger.warning("Velocity batch query rejected – using per-tx reads: %s", exc)
+                self._use_batch = False
+            except Exception as exc:  # noqa: BLE001
+                # transient (pool timeout, leader switch): this call only
+                logger.warning("Velocity batch query failed – per-tx reads for this call: %s", exc)
         rows = await self.neo4j.read_async(
             QUERY_VELOCITY_FEATURES,
-            {"user_id": user_id, "window": settings.VELOCITY_WINDOW_SEC},
+            {"user_id": user_id, "window": _VELOCITY_WINDOW_SEC},
         )
-        if not rows:
+        return rows[0] if rows else None
+
+    async def compute(self, user_id: str, tx_amount: float) -> Dict:
+        """Return feature dict + fused velocity risk 0–100."""
+
+        f = await self._features(user_id)
+        if f is None:
             return {"user_id": user_id, "risk": 0.0, "flags": []}
 
-        f = rows[0]
-        send_count: int = f.get("send_count", 0) or 0
-        receive_count: int = f.get("receive_count", 0) or 0
-        total_sent: float = f.get("total_sent_window", 0) or 0
-        total_received: float = f.get("total_received_window", 0) or 0
-        outflow_inflow_ratio: float = f.get("outflow_inflow_ratio", 0) or 0
-        total_activity: int = f.get("total_activity", 0) or 0
-
-        # ── burst detection ──────────────────────────────────
-        burst_score = 0.0
-        if total_activity >= settings.BURST_TX_THRESHOLD:
-            burst_score = 30.0
-        elif total_activity >= settings.BURST_TX_THRESHOLD // 2:
-            burst_score = 15.0
-
-        # ── pass-through (high turnover) ─────────────────────
-        pass_through_score = 0.0
-        if total_received > 0:
-            ratio = total_sent / total_received
-            if ratio > settings.PASS_THROUGH_RATIO_THRESHOLD:
-                pass_through_score = min(ratio / 1.5, 1.0) * 35  # up to 35
-            elif ratio > 0.5:
-                pass_through_score = 10.0
-
-        # ── velocity (tx per minute) ─────────────────────────
-        tx_per_min = total_activity / max(settings.VELOCITY_WINDOW_SEC / 60, 1)
-        velocity_component = min(tx_per_min / 10, 1.0) * 20  # up to 20
-
-        # ── high single-tx to window ratio ───────────────────
-        single_tx_ratio_score = 0.0
-        if total_sent > 0:
-            ratio = tx_amount / total_sent
-            if ratio > 0.8:
-                single_tx_ratio_score = 15.0
-
-        # ── fuse ─────────────────────────────────────────────
-        risk = burst_score + pass_through_score + velocity_component + single_tx_ratio_score
-        risk = min(risk, 100.0)
+        # typed, non-null columns (see QUERY_VELOCITY_FEATURES)
+        send_count: int = f["send_count"]
+        receive_count: int = f["receive_count"]
+        total_sent: float = f["total_sent_window"]
+        total_received: float = f["total_received_window"]
+        outflow_inflow_ratio: float = f["outflow_inflow_ratio"]
+        total_activity: int = f["total_activity"]
+
+        (risk, burst_score, pass_through_score, velocity_component,
+         tx_per_min, _single_tx_ratio_score) = velocity_score(
+            total_activity, total_sent, total_received, float(tx_amount),
+            _BURST_TX_THRESHOLD, _PASS_THROUGH_RATIO_THRESHOLD,
+            float(_VELOCITY_WINDOW_SEC),
+        )
 
         flags = []
         if burst_score >= 30:
@@ -82,17 +93,18 @@ class VelocityExtractor:
         if tx_per_min > 5:
             flags.append(f"High Velocity: {tx_per_min:.1f} tx/min")
 
+        # engine-internal, so kept at full precision
         return {
             "user_id": user_id,
             "send_count": send_count,
             "receive_count": receive_count,
-            "total_sent_window": round(total_sent, 2),
-            "total_received_window": round(total_received, 2),
-            "outflow_inflow_ratio": round(outflow_inflow_ratio, 4),
-            "burst_score": round(burst_score, 2),
-            "pass_through_score": round(pass_through_score, 2),
-            "velocity_component": round(velocity_component, 2),
-            "tx_per_min": round(tx_per_min, 2),
-            "risk": round(risk, 2),
+            "total_sent_window": total_sent,
+            "total_received_window": total_received,
+            "outflow_inflow_ratio": outflow_inflow_ratio,
+            "burst_score": burst_score,
+            "pass_through_score": pass_through_score,
+            "velocity_component": velocity_component,
+            "tx_per_min": tx_per_min,
+            "risk": risk,
             "flags": flags,
         }
@@ -13,11 +13,16 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.config import settings
 from app.neo4j_manager import Neo4jManager
-from app.streaming.redis_stream import get_redis_client
+from app.streaming.redis_stream import close_redis_client, get_redis_client
 from app.core.risk_engine import RiskEngine
+from app.features.device_risk import DeviceRiskExtractor
+from app.features.graph_intelligence import GraphIntelligenceExtractor
+from app.features.velocity import VelocityExtractor
+from app.utils.redis_cache import RedisEntityCache
 from app.core.graph_analyzer import GraphAnalyzer
 from app.core.worker_pool import WorkerPool
 from app.streaming.stream_adapter import StreamAdapter
@@ -26,7 +31,12 @@ from app.api.routes import router as api_router, init_routes
 from app.api.frontend_routes import frontend_router, init_frontend_routes
 from app.api.upi_adapter import upi_adapter_router, init_upi_adapter
 from app.api.websocket import websocket_endpoint, alert_callback
-from app.utils.cypher_queries import SCHEMA_CONSTRAINTS, SCHEMA_INDEXES
+from app.utils.cypher_queries import (
+    SCHEMA_CONSTRAINTS,
+    SCHEMA_INDEXES,
+    HOT_PATH_QUERIES,
+    HOT_PATH_WARMUP_PARAMS,
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -44,7 +54,13 @@ async def lifespan(app: FastAPI):
     # ── Neo4j ────────────────────────────────────────────────
     neo4j = Neo4jManager.get_instance()
     await neo4j.connect()
-    neo4j.setup_schema(SCHEMA_CONSTRAINTS, SCHEMA_INDEXES)
+    await neo4j.setup_schema(SCHEMA_CONSTRAINTS, SCHEMA_INDEXES)
+    if settings.STARTUP_WARMUP:
+        neo4j.warm_query_plans(HOT_PATH_QUERIES, HOT_PATH_WARMUP_PARAMS)
+
+    # ── MMDB (ASN intelligence) ──────────────────────────────
+    from app.features.asn_intelligence import open_reader as open_mmdb
+    open_mmdb()
 
     # ── Redis ────────────────────────────────────────────────
     redis_client = await get_redis_client()
@@ -53,11 +69,30 @@ async def lifespan(app: FastAPI):
     collusive = CollusiveFraudDetector(neo4j)
 
     # ── Risk engine ──────────────────────────────────────────
-    risk_engine = RiskEngine(neo4j)
+    if settings.STARTUP_WARMUP:
+        from app.features._scoring_kernels import warm_kernels
+        warm_kernels()
+    # Extractors are built once here and shared for the app's lifetime
+    entity_cache = RedisEntityCache(redis_client)
+    device_risk = DeviceRiskExtractor(neo4j, entity_cache)
+    graph_intel = GraphIntelligenceExtractor(neo4j, entity_cache)
+    velocity = VelocityExtractor(neo4j)
+    risk_engine = RiskEngine(
+        neo4j, redis_client,
+        entity_cache=entity_cache,
+        device_risk=device_risk,
+        graph_intel=graph_intel,
+        velocity=velocity,
+    )
     risk_engine.set_collusive_detector(collusive)
+    if settings.STARTUP_WARMUP:
+        try:
+            await risk_engine.warm_up()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("⚠️  Extractor warm-up failed: %s", exc)
 
     # ── Graph analyzer (batch loop) ──────────────────────────
-    graph_analyzer = GraphAnalyzer(neo4j, collusive)
+    graph_analyzer = GraphAnalyzer(neo4j, collusive, entity_cache)
     await graph_analyzer.start()
 
     # ── Stream adapter (upi_raw → fraud_queue) ───────────────
@@ -82,6 +117,9 @@ async def lifespan(app: FastAPI):
     app.state.neo4j = neo4j
     app.state.redis = redis_client
     app.state.risk_engine = risk_engine
+    app.state.device_risk = device_risk
+    app.state.graph_intel = graph_intel
+    app.state.velocity = velocity
     app.state.worker_pool = worker_pool
     app.state.stream_adapter = stream_adapter
     app.state.graph_analyzer = graph_analyzer
@@ -98,7 +136,7 @@ async def lifespan(app: FastAPI):
     from app.features.asn_intelligence import close_reader as close_mmdb
     close_mmdb()
     await neo4j.close()
-    await redis_client.close()
+    await close_redis_client()
     logger.info("👋 Shutdown complete")
 
 
@@ -108,6 +146,9 @@ app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     lifespan=lifespan,
+    # dict / model returns are rendered by orjson instead of json.dumps;
+    # the graph endpoints return pre-serialised bytes and skip this entirely
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -134,3 +175,14 @@ async def root():
         "version": settings.APP_VERSION,
         "docs": "/docs",
     }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop" if settings.USE_UVLOOP else "asyncio",
+    )
@@ -7,26 +7,37 @@ defined in the frontend (src/lib/mock-data.ts).
 
 from __future__ import annotations
 
+import sys
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, List, Optional
 from enum import Enum
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AfterValidator, AliasGenerator, BaseModel, ConfigDict, Field
 from pydantic.alias_generators import to_camel
 
+# Small fixed-vocabulary strings (status / severity / node type): interned
+# so every instance shares one object per value instead of a fresh str
+InternedStr = Annotated[str, AfterValidator(sys.intern)]
 
-class _CamelModel(BaseModel):
-    """Base model with camelCase JSON aliases for all fields."""
+
+class _CamelOut(BaseModel):
+    """
+    Base for response DTOs: camelCase aliases on the way out only.
+
+    These models are only ever built from Python with field names, so the
+    aliases are serialization-only and validation matches on the field
+    name alone (no alias-then-name probing per field).  Field / alias
+    metadata is compiled into the validator and serializer once per class;
+    nothing validates them from ORM objects, so no from_attributes path.
+    """
     model_config = ConfigDict(
-        alias_generator=to_camel,
-        populate_by_name=True,
-        from_attributes=True,
+        alias_generator=AliasGenerator(serialization_alias=to_camel),
     )
 
 
 # ═══ Feature Scores ═══════════════════════════════════════════
 
-class FeatureScoresOut(_CamelModel):
+class FeatureScoresOut(_CamelOut):
     graph: float = 0
     behavioral: float = 0
     device: float = 0
@@ -36,8 +47,8 @@ class FeatureScoresOut(_CamelModel):
 
 # ═══ Triggered Rule ═══════════════════════════════════════════
 
-class TriggeredRuleOut(_CamelModel):
-    severity: str = "INFO"       # "CRITICAL" | "WARNING" | "INFO"
+class TriggeredRuleOut(_CamelOut):
+    severity: InternedStr = "INFO"       # "CRITICAL" | "WARNING" | "INFO"
     rule: str = ""
     detail: str = ""
     score_impact: float = 0
@@ -45,13 +56,13 @@ class TriggeredRuleOut(_CamelModel):
 
 # ═══ Geo Evidence ═════════════════════════════════════════════
 
-class GeoPointOut(_CamelModel):
+class GeoPointOut(_CamelOut):
     city: str = ""
     lat: float = 0
     lng: float = 0
 
 
-class GeoEvidenceOut(_CamelModel):
+class GeoEvidenceOut(_CamelOut):
     device_geo: GeoPointOut = Field(default_factory=GeoPointOut)
     ip_geo: GeoPointOut = Field(default_factory=GeoPointOut)
     distance_km: float = 0
@@ -62,7 +73,7 @@ class GeoEvidenceOut(_CamelModel):
 
 # ═══ Behavioral Signature ═════════════════════════════════════
 
-class BehavioralSignatureOut(_CamelModel):
+class BehavioralSignatureOut(_CamelOut):
     amount_entropy: float = 50
     fan_in_ratio: float = 25
     temporal_alignment: float = 80
@@ -75,7 +86,7 @@ class BehavioralSignatureOut(_CamelModel):
 
 # ═══ Probability Matrix Row ═══════════════════════════════════
 
-class ProbabilityMatrixRowOut(_CamelModel):
+class ProbabilityMatrixRowOut(_CamelOut):
     category: str = ""
     raw_value: str = "0"
     weight: float = 0
@@ -85,19 +96,19 @@ class ProbabilityMatrixRowOut(_CamelModel):
 
 # ═══ Transaction (full frontend shape) ════════════════════════
 
-class TransactionOut(_CamelModel):
+class TransactionOut(_CamelOut):
     id: str
     timestamp: datetime
     sender_name: str = ""
-    sender_upi: str = Field(default="", alias="senderUPI")
+    sender_upi: str = Field(default="", serialization_alias="senderUPI")
     receiver_name: str = ""
-    receiver_upi: str = Field(default="", alias="receiverUPI")
+    receiver_upi: str = Field(default="", serialization_alias="receiverUPI")
     amount: float = 0
-    status: str = "SUCCESS"        # "SUCCESS" | "FAILED" | "BLOCKED"
+    status: InternedStr = "SUCCESS"        # "SUCCESS" | "FAILED" | "BLOCKED"
     risk_score: float = 0
     latency_ms: float = 0
-    sender_ip: str = Field(default="", alias="senderIP")
-    device_id: str = Field(default="", alias="deviceId")
+    sender_ip: str = Field(default="", serialization_alias="senderIP")
+    device_id: str = Field(default="", serialization_alias="deviceId")
     city: str = ""
     features: FeatureScoresOut = Field(default_factory=FeatureScoresOut)
     triggered_rules: List[TriggeredRuleOut] = Field(default_factory=list)
@@ -109,7 +120,7 @@ class TransactionOut(_CamelModel):
 
 # ═══ System Health ════════════════════════════════════════════
 
-class Neo4jHealthOut(_CamelModel):
+class Neo4jHealthOut(_CamelOut):
     active_connections: int = 0
     idle_connections: int = 0
     avg_query_ms: float = 0
@@ -117,14 +128,14 @@ class Neo4jHealthOut(_CamelModel):
     rels_count: int = 0
 
 
-class RedisHealthOut(_CamelModel):
+class RedisHealthOut(_CamelOut):
     stream_depth: int = 0
     lag_ms: float = 0
-    memory_used_mb: float = Field(default=0, alias="memoryUsedMB")
+    memory_used_mb: float = Field(default=0, serialization_alias="memoryUsedMB")
     pending_messages: int = 0
 
 
-class WorkersHealthOut(_CamelModel):
+class WorkersHealthOut(_CamelOut):
     active: int = 0
     total: int = 8
     cpu_percent: float = 0
@@ -133,19 +144,19 @@ class WorkersHealthOut(_CamelModel):
     ws_connections: int = 0
 
 
-class GraphAnalyticsHealthOut(_CamelModel):
+class GraphAnalyticsHealthOut(_CamelOut):
     modularity: float = 0
     clusters: int = 0
     bfs_latency_ms: float = 0
 
 
-class RedisWindowOut(_CamelModel):
+class RedisWindowOut(_CamelOut):
     window_sec: int = 60
     events_in_window: int = 0
 
 
-class SystemHealthOut(_CamelModel):
-    neo4j: Neo4jHealthOut = Field(default_factory=Neo4jHealthOut, alias="neo4j")
+class SystemHealthOut(_CamelOut):
+    neo4j: Neo4jHealthOut = Field(default_factory=Neo4jHealthOut, serialization_alias="neo4j")
     redis: RedisHealthOut = Field(default_factory=RedisHealthOut)
     workers: WorkersHealthOut = Field(default_factory=WorkersHealthOut)
     tps: float = 0
@@ -157,11 +168,11 @@ class SystemHealthOut(_CamelModel):
 
 # ═══ Graph Node ═══════════════════════════════════════════════
 
-class GraphNodeOut(_CamelModel):
+class GraphNodeOut(_CamelOut):
     id: str
     name: str = ""
     upi: str = ""
-    type: str = "user"             # "user" | "mule" | "aggregator"
+    type: InternedStr = "user"             # "user" | "mule" | "aggregator"
     risk_score: float = 0
     fan_in: int = 0
     fan_out: int = 0
@@ -179,7 +190,7 @@ class GraphNodeOut(_CamelModel):
 
 # ═══ Graph Edge ═══════════════════════════════════════════════
 
-class GraphEdgeOut(_CamelModel):
+class GraphEdgeOut(_CamelOut):
     source: str
     target: str
     amount: float = 0
@@ -190,19 +201,19 @@ class GraphEdgeOut(_CamelModel):
 
 # ═══ Graph Network Response ═══════════════════════════════════
 
-class GraphNetworkOut(_CamelModel):
+class GraphNetworkOut(_CamelOut):
     nodes: List[GraphNodeOut] = Field(default_factory=list)
     edges: List[GraphEdgeOut] = Field(default_factory=list)
 
 
 # ═══ Subgraph (3-hop) ════════════════════════════════════════
 
-class SubgraphNodeOut(_CamelModel):
+class SubgraphNodeOut(_CamelOut):
     id: str
     name: str = ""
     upi: str = ""
     level: int = 0                 # 0 | 1 | 2 | 3
-    type: str = "user"             # "user" | "mule" | "aggregator"
+    type: InternedStr = "user"             # "user" | "mule" | "aggregator"
     risk_score: float = 0
     city: str = ""
     device_count: int = 1
@@ -210,7 +221,7 @@ class SubgraphNodeOut(_CamelModel):
     fan_out: int = 0
 
 
-class SubgraphEdgeOut(_CamelModel):
+class SubgraphEdgeOut(_CamelOut):
     source: str
     target: str
     amount: float = 0
@@ -219,7 +230,7 @@ class SubgraphEdgeOut(_CamelModel):
     velocity: float = 0
 
 
-class RealtimeSubgraphOut(_CamelModel):
+class RealtimeSubgraphOut(_CamelOut):
     tx_id: str = ""
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     nodes: List[SubgraphNodeOut] = Field(default_factory=list)
@@ -237,7 +248,7 @@ class RealtimeSubgraphOut(_CamelModel):
 
 # ═══ Aggregator Node ══════════════════════════════════════════
 
-class AggregatorNodeOut(_CamelModel):
+class AggregatorNodeOut(_CamelOut):
     id: str
     name: str = ""
     upi: str = ""
@@ -254,7 +265,7 @@ class AggregatorNodeOut(_CamelModel):
 
 # ═══ ASN Entry ════════════════════════════════════════════════
 
-class ASNEntryOut(_CamelModel):
+class ASNEntryOut(_CamelOut):
     asn: str = ""
     provider: str = ""
     tx_count: int = 0
@@ -265,7 +276,7 @@ class ASNEntryOut(_CamelModel):
 
 # ═══ Device Cluster ═══════════════════════════════════════════
 
-class DeviceClusterOut(_CamelModel):
+class DeviceClusterOut(_CamelOut):
     device_id: str
     user_count: int = 0
     users: List[str] = Field(default_factory=list)
@@ -276,13 +287,13 @@ class DeviceClusterOut(_CamelModel):
 
 # ═══ AI Analysis ══════════════════════════════════════════════
 
-class AIIssueOut(_CamelModel):
-    severity: str = "info"         # "critical" | "warning" | "info"
+class AIIssueOut(_CamelOut):
+    severity: InternedStr = "info"         # "critical" | "warning" | "info"
     title: str = ""
     explanation: str = ""
 
 
-class AIAnalysisResultOut(_CamelModel):
+class AIAnalysisResultOut(_CamelOut):
     summary: str = ""
     risk_verdict: str = ""
     issues: List[AIIssueOut] = Field(default_factory=list)
@@ -292,7 +303,7 @@ class AIAnalysisResultOut(_CamelModel):
 
 # ═══ Latency Bucket ═══════════════════════════════════════════
 
-class LatencyBucketOut(_CamelModel):
+class LatencyBucketOut(_CamelOut):
     index: int = 0
     latency_ms: float = 0
     timestamp: datetime = Field(default_factory=datetime.utcnow)
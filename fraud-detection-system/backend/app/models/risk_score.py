@@ -4,6 +4,7 @@ Used by the risk fusion engine and the API layer.
 """
 
 from pydantic import BaseModel, Field
+from pydantic.dataclasses import dataclass
 from typing import List, Optional, Dict
 from datetime import datetime
 from enum import Enum
@@ -16,8 +17,12 @@ class RiskLevel(str, Enum):
     CRITICAL = "CRITICAL"
 
 
-class RiskBreakdown(BaseModel):
-    """Weighted sub-score breakdown (each 0-100)."""
+@dataclass(slots=True, frozen=True)
+class RiskBreakdown:
+    """
+    Weighted sub-score breakdown (each 0-100).  One per transaction, so a
+    slotted, frozen pydantic dataclass (five floats, no instance dict).
+    """
     graph: float = Field(0.0, ge=0, le=100)
     behavioral: float = Field(0.0, ge=0, le=100)
     device: float = Field(0.0, ge=0, le=100)
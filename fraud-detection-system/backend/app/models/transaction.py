@@ -5,6 +5,7 @@ Shared across the entire backend.
 Schema v2 — nested structure matching real UPI gateway payloads.
 """
 
+from functools import cached_property
 from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 from datetime import datetime
@@ -159,99 +160,148 @@ class TransactionInput(BaseModel):
     credential: Optional[Credential] = None
     receiver: Receiver
 
+    @model_validator(mode="after")
+    def _flatten_sender(self) -> "TransactionInput":
+        """
+        Resolve the sender / device / network / geo scalars in one walk at
+        validation time, straight into the instance dict the cached
+        accessors below read from.  The nested sub-models stay (dumps and
+        re-publishing keep the wire schema); hot-path reads never touch them.
+        """
+        s = self.sender
+        dev, net, geo = s.device, s.network, s.geo
+        d = self.__dict__
+        d["sender_id"] = s.sender_id
+        d["upi_id_sender"] = s.upi_id
+        if dev is not None:
+            d["device_id"] = dev.device_id
+            d["device_os"] = dev.device_os
+            d["device_type"] = dev.device_type
+            d["app_version"] = dev.app_version
+            d["capability_mask"] = dev.capability_mask
+        else:
+            d["device_id"] = "UNKNOWN_DEVICE"
+            d["device_os"] = None
+            d["device_type"] = DeviceType.UNKNOWN
+            d["app_version"] = None
+            d["capability_mask"] = None
+        d["ip_address"] = net.ip_address if net is not None else None
+        if geo is not None:
+            d["sender_lat"] = geo.lat
+            d["sender_lon"] = geo.lon
+        else:
+            d["sender_lat"] = None
+            d["sender_lon"] = None
+        return self
+
     # ── Convenience accessors (flatten for downstream code) ──
+    # cached_property: the sender group is pre-filled by _flatten_sender;
+    # the rest (and model_construct instances) resolve on first access,
+    # later reads are plain instance-dict hits (pydantic keeps them out of dumps)
 
-    @property
+    @cached_property
     def sender_id(self) -> str:
         return self.sender.sender_id
 
-    @property
+    @cached_property
     def receiver_id(self) -> str:
         return self.receiver.receiver_id
 
-    @property
+    @cached_property
     def device_id(self) -> str:
         """Stable device UUID — primary device key (replaces device_hash)."""
         if self.sender.device:
             return self.sender.device.device_id
         return "UNKNOWN_DEVICE"
 
-    @property
+    @cached_property
     def device_hash(self) -> str:
         """Alias for device_id for backward compatibility."""
         return self.device_id
 
-    @property
+    @cached_property
     def device_os(self) -> Optional[str]:
         if self.sender.device:
             return self.sender.device.device_os
         return None
 
-    @property
+    @cached_property
     def device_type(self) -> DeviceType:
         if self.sender.device:
             return self.sender.device.device_type
         return DeviceType.UNKNOWN
 
-    @property
+    @cached_property
     def app_version(self) -> Optional[str]:
         if self.sender.device:
             return self.sender.device.app_version
         return None
 
-    @property
+    @cached_property
     def capability_mask(self) -> Optional[str]:
         if self.sender.device:
             return self.sender.device.capability_mask
         return None
 
-    @property
+    @cached_property
+    def capability_mask_int(self) -> Optional[int]:
+        """capability_mask parsed once; None if absent, non-binary or >63 bits."""
+        mask = self.capability_mask
+        if not mask:
+            return None
+        try:
+            value = int(mask, 2)
+        except ValueError:
+            return None
+        return value if value.bit_length() <= 63 else None
+
+    @cached_property
     def ip_address(self) -> Optional[str]:
         if self.sender.network:
             return self.sender.network.ip_address
         return None
 
-    @property
+    @cached_property
     def sender_lat(self) -> Optional[float]:
         if self.sender.geo:
             return self.sender.geo.lat
         return None
 
-    @property
+    @cached_property
     def sender_lon(self) -> Optional[float]:
         if self.sender.geo:
             return self.sender.geo.lon
         return None
 
-    @property
+    @cached_property
     def upi_id_sender(self) -> Optional[str]:
         return self.sender.upi_id
 
-    @property
+    @cached_property
     def upi_id_receiver(self) -> Optional[str]:
         return self.receiver.upi_id
 
-    @property
+    @cached_property
     def receiver_type(self) -> ReceiverType:
         return self.receiver.receiver_type
 
-    @property
+    @cached_property
     def mcc_code(self) -> Optional[str]:
         return self.receiver.mcc_code
 
-    @property
+    @cached_property
     def credential_type(self) -> Optional[CredentialType]:
         if self.credential:
             return self.credential.type
         return None
 
-    @property
+    @cached_property
     def credential_sub_type(self) -> Optional[CredentialSubType]:
         if self.credential:
             return self.credential.sub_type
         return None
 
-    @property
+    @cached_property
     def channel(self) -> TransactionChannel:
         """UPI transactions are always UPI channel."""
         return TransactionChannel.UPI
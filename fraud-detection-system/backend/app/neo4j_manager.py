@@ -5,13 +5,16 @@ Provides both sync (setup / batch) and async (runtime) query execution
 with connection pooling and health-check support.
 """
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
-from neo4j import GraphDatabase, AsyncGraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase, READ_ACCESS, WRITE_ACCESS, Record
 from neo4j.exceptions import ServiceUnavailable, AuthError
 
 from app.config import settings
+from app.utils.cypher_queries import MAINT_COUNT_NODES
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +27,18 @@ class Neo4jManager:
     def __init__(self) -> None:
         self._driver = None
         self._async_driver = None
+        self._health: Optional[Dict] = None
+        self._health_expires = 0.0
+        # Session config bound once: explicit database (no home-db lookup)
+        # and access mode (routes reads straight to readers in a cluster).
+        self._read_session_kw: Dict[str, Any] = {
+            "database": settings.NEO4J_DATABASE,
+            "default_access_mode": READ_ACCESS,
+        }
+        self._write_session_kw: Dict[str, Any] = {
+            "database": settings.NEO4J_DATABASE,
+            "default_access_mode": WRITE_ACCESS,
+        }
 
     # ── singleton ────────────────────────────────────────────
 
@@ -43,13 +58,25 @@ class Neo4jManager:
                 auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
                 max_connection_pool_size=settings.NEO4J_MAX_POOL_SIZE,
             )
+            # Extractors fan out up to NEO4J_MAX_CONCURRENT_READS reads per
+            # tx – keep at least that many sessions per worker so fan-out
+            # never queues on the pool; a short acquisition timeout makes
+            # real exhaustion surface as an error instead of a latency tail
+            async_pool_size = max(
+                settings.NEO4J_MAX_POOL_SIZE,
+                settings.NEO4J_MAX_CONCURRENT_READS * settings.WORKER_COUNT,
+            )
             self._async_driver = AsyncGraphDatabase.driver(
                 settings.NEO4J_URI,
                 auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
-                max_connection_pool_size=settings.NEO4J_MAX_POOL_SIZE,
+                max_connection_pool_size=async_pool_size,
+                connection_acquisition_timeout=settings.NEO4J_POOL_ACQUIRE_TIMEOUT_SEC,
             )
             self._driver.verify_connectivity()
-            logger.info("✅ Neo4j connected at %s", settings.NEO4J_URI)
+            logger.info(
+                "✅ Neo4j connected at %s (async pool %d)",
+                settings.NEO4J_URI, async_pool_size,
+            )
         except (ServiceUnavailable, AuthError) as exc:
             logger.error("❌ Neo4j connection failed: %s", exc)
             raise
@@ -65,8 +92,7 @@ class Neo4jManager:
 
     def run_sync(self, query: str, params: Dict[str, Any] | None = None) -> List[Dict]:
         with self._driver.session(database=settings.NEO4J_DATABASE) as session:
-            result = session.run(query, params or {})
-            return [record.data() for record in result]
+            return session.run(query, params or {}).data()
 
     def write_sync(self, query: str, params: Dict[str, Any] | None = None) -> List[Dict]:
         with self._driver.session(database=settings.NEO4J_DATABASE) as session:
@@ -80,34 +106,119 @@ class Neo4jManager:
     async def run_async(self, query: str, params: Dict[str, Any] | None = None) -> List[Dict]:
         async with self._async_driver.session(database=settings.NEO4J_DATABASE) as session:
             result = await session.run(query, params or {})
-            return [record.data() async for record in result]
+            return await result.data()
 
     async def write_async(self, query: str, params: Dict[str, Any] | None = None) -> List[Dict]:
-        async with self._async_driver.session(database=settings.NEO4J_DATABASE) as session:
+        async with self._async_driver.session(**self._write_session_kw) as session:
             # execute_write expects a coroutine that takes an AsyncManagedTransaction
             async def _work(tx):
                 res = await tx.run(query, params or {})
-                return [record.data() async for record in res]
+                return await res.data()
+            return await session.execute_write(_work)
+
+    async def write_many_async(
+        self, stmts: Sequence[Tuple[str, Dict[str, Any] | None]]
+    ) -> List[List[Dict]]:
+        """
+        Run *stmts* in order inside one managed write transaction – a single
+        commit round trip for the lot, all-or-nothing.  Returns each
+        statement's rows.  For many rows of the same shape, one
+        ``UNWIND $rows AS row ...`` query is still cheaper than this.
+        """
+        async with self._async_driver.session(**self._write_session_kw) as session:
+            async def _work(tx):
+                out = []
+                for query, params in stmts:
+                    res = await tx.run(query, params or {})
+                    out.append(await res.data())
+                return out
             return await session.execute_write(_work)
 
     async def read_async(self, query: str, params: Dict[str, Any] | None = None) -> List[Dict]:
-        async with self._async_driver.session(database=settings.NEO4J_DATABASE) as session:
+        async with self._async_driver.session(**self._read_session_kw) as session:
             async def _work(tx):
                 res = await tx.run(query, params or {})
-                return [record.data() async for record in res]
+                return await res.data()
             return await session.execute_read(_work)
 
+    async def stream_async(
+        self, query: str, params: Dict[str, Any] | None = None
+    ) -> AsyncIterator[Record]:
+        """
+        Yield raw records from a read session as they arrive.
+
+        For large results where the caller only pulls a few fields:
+        no per-row dict and no full list held in memory.  Auto-commit
+        (no retry), so it suits idempotent dashboard reads only.
+        """
+        async with self._async_driver.session(**self._read_session_kw) as session:
+            result = await session.run(query, params or {})
+            async for record in result:
+                yield record
+
     # ── schema management ────────────────────────────────────
 
-    def setup_schema(self, constraints: List[str], indexes: List[str]) -> None:
+    async def setup_schema(self, constraints: List[str], indexes: List[str]) -> None:
+        """
+        Issue every constraint / index concurrently, one session each.  The
+        statements touch disjoint label/property pairs; execute_write
+        retries the transient schema-lock conflicts parallel DDL can hit.
+        """
+        stmts = constraints + indexes
+        results = await asyncio.gather(
+            *(self.write_async(stmt) for stmt in stmts), return_exceptions=True,
+        )
+        for stmt, res in zip(stmts, results):
+            if isinstance(res, Exception):
+                logger.warning("  ⚠ %s – %s", stmt[:50], res)
+            else:
+                logger.info("  ✔ %s", stmt[:70])
+        logger.info("✅ Schema setup complete")
+
+    def warm_query_plans(
+        self, queries: Dict[str, str], params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, bool]:
+        """
+        EXPLAIN each query once, warn if a plan falls back to a label / all-
+        nodes scan instead of an index seek or the server raises a warning
+        notification (e.g. type mismatch), then – with *params* – run it
+        once in a read session so its exact text is in the plan cache before
+        the first transaction.  Returns name → seek-only and warning-free.
+        """
+        def _scans(plan: Dict) -> List[str]:
+            op = plan.get("operatorType", "")
+            found = [op] if ("LabelScan" in op or "AllNodesScan" in op) else []
+            for child in plan.get("children", []):
+                found.extend(_scans(child))
+            return found
+
+        ok: Dict[str, bool] = {}
         with self._driver.session(database=settings.NEO4J_DATABASE) as session:
-            for stmt in constraints + indexes:
+            for name, query in queries.items():
                 try:
-                    session.run(stmt)
-                    logger.info("  ✔ %s", stmt[:70])
+                    summary = session.run("EXPLAIN " + query, params or {}).consume()
+                    scans = _scans(summary.plan or {})
+                    warnings = [
+                        n.get("code", "?") for n in (summary.notifications or [])
+                        if n.get("severity") == "WARNING"
+                    ]
+                    ok[name] = not scans and not warnings
+                    if scans:
+                        logger.warning("  ⚠ %s plan scans: %s", name, ", ".join(scans))
+                    if warnings:
+                        logger.warning("  ⚠ %s plan warnings: %s", name, ", ".join(warnings))
                 except Exception as exc:          # noqa: BLE001
-                    logger.warning("  ⚠ %s – %s", stmt[:50], exc)
-        logger.info("✅ Schema setup complete")
+                    ok[name] = False
+                    logger.warning("  ⚠ EXPLAIN %s failed – %s", name, exc)
+        if params is not None:
+            with self._driver.session(**self._read_session_kw) as session:
+                for name, query in queries.items():
+                    try:
+                        session.execute_read(lambda tx, q=query: tx.run(q, params).consume())
+                    except Exception as exc:      # noqa: BLE001
+                        logger.warning("  ⚠ warm-up run %s failed – %s", name, exc)
+        logger.info("✅ Query plans warmed (%d/%d index-seek)", sum(ok.values()), len(ok))
+        return ok
 
     def clear_database(self) -> None:
         with self._driver.session(database=settings.NEO4J_DATABASE) as session:
@@ -117,14 +228,18 @@ class Neo4jManager:
     # ── health check ─────────────────────────────────────────
 
     async def health_check(self) -> Dict:
+        """Liveness + per-label counts (count store), reused for a few seconds."""
+        now = time.monotonic()
+        if self._health is not None and now < self._health_expires:
+            return self._health
         try:
-            await self.run_async("RETURN 1 AS ok")
-            counts = await self.run_async(
-                "MATCH (n) RETURN labels(n)[0] AS label, count(n) AS cnt"
-            )
-            return {
+            counts = await self.read_async(MAINT_COUNT_NODES)
+            health = {
                 "status": "healthy",
-                "nodes": {r["label"]: r["cnt"] for r in counts if r["label"]},
+                "nodes": {r["label"]: r["count"] for r in counts},
             }
         except Exception as exc:  # noqa: BLE001
-            return {"status": "unhealthy", "error": str(exc)}
+            health = {"status": "unhealthy", "error": str(exc)}
+        self._health = health
+        self._health_expires = now + settings.NEO4J_HEALTH_CACHE_TTL_SEC
+        return health
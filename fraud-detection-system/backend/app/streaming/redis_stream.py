@@ -12,49 +12,225 @@ Two-stream architecture
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
-from typing import Any, Dict
+import weakref
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import orjson
 import redis.asyncio as aioredis
+from pydantic import BaseModel
 
 from app.config import settings
 
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # lz4 is optional – stream payloads go out uncompressed
+    lz4_frame = None
+
 logger = logging.getLogger(__name__)
 
+# Producers hand over naive-UTC datetimes (upi_adapter, simulator) and the
+# odd numpy scalar; both are encoded natively instead of via default=str
+_PAYLOAD_OPTS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+Payload = Union[BaseModel, Dict[str, Any]]
+
+
+def _encode(data: Payload) -> bytes:
+    """JSON bytes for a stream / channel payload; models serialise in Rust."""
+    if isinstance(data, BaseModel):
+        return data.model_dump_json(by_alias=True).encode()
+    return orjson.dumps(data, default=str, option=_PAYLOAD_OPTS)
+
+
+_COMPRESS_MIN_BYTES = settings.STREAM_PAYLOAD_COMPRESS_MIN_BYTES
+
+
+def _payload_fields(data: Payload) -> Dict[str, bytes]:
+    """
+    Stream entry fields for *data*.  Payloads above the size threshold are
+    lz4-framed (when lz4 is installed) and tagged ``enc=lz4``; small ones,
+    or ones that don't shrink, stay plain JSON with no tag.
+    """
+    raw = _encode(data)
+    if lz4_frame is not None and _COMPRESS_MIN_BYTES and len(raw) > _COMPRESS_MIN_BYTES:
+        packed = lz4_frame.compress(raw)
+        if len(packed) < len(raw):
+            return {"payload": packed, "enc": b"lz4"}
+    return {"payload": raw}
+
+
+def stream_payload(data: Dict[Any, bytes]) -> Optional[bytes]:
+    """JSON payload bytes of a stream entry (None if absent), un-lz4'd if tagged."""
+    raw = data.get(b"payload", data.get("payload"))
+    if raw is not None and data.get(b"enc", data.get("enc")) == b"lz4":
+        if lz4_frame is None:
+            raise RuntimeError("lz4-compressed stream entry but lz4 is not installed")
+        raw = lz4_frame.decompress(raw)
+    return raw
+
+
+# ── XADD pipelining ─────────────────────────────────────────
+
+class StreamBatcher:
+    """
+    Group-commit XADDs to one stream through a non-transactional pipeline.
+
+    The first ``submit`` is flushed on the next event-loop tick; publishes
+    arriving while that pipeline is in flight queue up and go out together
+    when it returns (or as soon as ``max_batch`` are pending).  A lone
+    sequential producer therefore pays no extra wait, while bursts collapse
+    into one round trip per batch.  Payloads are encoded before queueing, so
+    the flush is I/O only.
+    """
+
+    def __init__(
+        self, client: aioredis.Redis, stream: str, max_batch: int, maxlen: int | None = None,
+    ) -> None:
+        self._client = client
+        self._stream = stream
+        self._max_batch = max(max_batch, 1)
+        self._maxlen = maxlen
+        self._pending: List[Tuple[Dict[str, bytes], asyncio.Future]] = []
+        self._scheduled = False
+        self._inflight: set = set()
+        self.batches = 0
+        self.messages = 0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.messages / self.batches if self.batches else 0.0
+
+    async def submit(self, fields: Dict[str, bytes]) -> bytes:
+        """XADD *fields*; returns the raw stream message ID."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((fields, fut))
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif not self._scheduled and not self._inflight:
+            self._scheduled = True
+            loop.call_soon(self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        self._scheduled = False
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._inflight.discard(task)
+        # whatever queued up behind the last round trip goes out now
+        if self._pending and not self._scheduled:
+            self._flush()
+
+    async def _run(self, batch: List[Tuple[Dict[str, bytes], asyncio.Future]]) -> None:
+        self.batches += 1
+        self.messages += len(batch)
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for fields, _ in batch:
+                    pipe.xadd(self._stream, fields, maxlen=self._maxlen, approximate=True)
+                results = await pipe.execute(raise_on_error=False)
+        except Exception as exc:  # noqa: BLE001
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        for (_, fut), res in zip(batch, results):
+            if fut.done():
+                continue
+            if isinstance(res, Exception):
+                fut.set_exception(res)
+            else:
+                fut.set_result(res)
+
+
+_batchers: "weakref.WeakKeyDictionary[aioredis.Redis, Dict[str, StreamBatcher]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def stream_batcher(redis_client: aioredis.Redis, stream: str) -> StreamBatcher:
+    """The shared StreamBatcher for *stream* on *redis_client*."""
+    per_client = _batchers.setdefault(redis_client, {})
+    batcher = per_client.get(stream)
+    if batcher is None:
+        batcher = per_client[stream] = StreamBatcher(
+            redis_client, stream, settings.STREAM_PUBLISH_BATCH_MAX, _MAXLEN
+        )
+    return batcher
+
+
+# XADD MAXLEN ~ N: Redis trims whole radix-tree nodes on insert (cheap);
+# None (REDIS_STREAM_MAXLEN=0) leaves the streams unbounded
+_MAXLEN = settings.REDIS_STREAM_MAXLEN or None
+
+
+async def _xadd(redis_client: aioredis.Redis, stream: str, fields: Dict[str, bytes]) -> bytes:
+    if settings.STREAM_PUBLISH_PIPELINE:
+        return await stream_batcher(redis_client, stream).submit(fields)
+    return await redis_client.xadd(stream, fields, maxlen=_MAXLEN, approximate=True)
+
 
 # ── Connection ───────────────────────────────────────────────
 
+_client: aioredis.Redis | None = None
+_client_lock = asyncio.Lock()
+
+
 async def get_redis_client() -> aioredis.Redis:
-    """Create and return an async Redis client."""
-    client = aioredis.Redis(
-        host=settings.REDIS_HOST,
-        port=settings.REDIS_PORT,
-        db=settings.REDIS_DB,
-        decode_responses=False,
-    )
-    await client.ping()
-    logger.info("✅ Redis connected at %s:%d", settings.REDIS_HOST, settings.REDIS_PORT)
-    return client
+    """
+    The process-wide async Redis client, created (and PINGed) on first use.
+    Every caller shares its connection pool.
+    """
+    global _client
+    if _client is None:
+        async with _client_lock:
+            if _client is None:
+                # Blocking pool: past max_connections callers wait for a free
+                # connection instead of failing with "Too many connections"
+                pool = aioredis.BlockingConnectionPool(
+                    host=settings.REDIS_HOST,
+                    port=settings.REDIS_PORT,
+                    db=settings.REDIS_DB,
+                    decode_responses=False,
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    timeout=settings.REDIS_POOL_TIMEOUT_SEC,
+                )
+                client = aioredis.Redis(connection_pool=pool)
+                await client.ping()
+                _client = client
+                logger.info("✅ Redis connected at %s:%d", settings.REDIS_HOST, settings.REDIS_PORT)
+    return _client
+
+
+async def close_redis_client() -> None:
+    """Close the shared client; the next get_redis_client() reconnects."""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.close()
+        await client.connection_pool.disconnect()
 
 
 # ── Inbound stream  (upi_raw) ───────────────────────────────
 
 async def publish_upi_raw(
     redis_client: aioredis.Redis,
-    tx_data: Dict[str, Any],
-) -> str:
+    tx_data: Payload,
+) -> bytes:
     """
     Push a raw UPI transaction onto the *inbound* stream (upi_raw).
     The StreamAdapter will pick it up, validate, and forward to fraud_queue.
-    Returns the stream message ID.
+    Returns the stream message ID as raw bytes (decode only for display).
     """
-    payload = json.dumps(tx_data, default=str)
-    msg_id = await redis_client.xadd(
-        settings.REDIS_UPI_STREAM_KEY,
-        {"payload": payload},
-    )
-    return msg_id.decode() if isinstance(msg_id, bytes) else str(msg_id)
+    return await _xadd(redis_client, settings.REDIS_UPI_STREAM_KEY, _payload_fields(tx_data))
 
 
 # Legacy alias – simulator & upi_adapter use this name
@@ -65,32 +241,33 @@ publish_transaction = publish_upi_raw
 
 async def publish_to_fraud_queue(
     redis_client: aioredis.Redis,
-    tx_data: Dict[str, Any],
-) -> str:
+    tx_data: Payload,
+    meta: Dict[str, Any] | None = None,
+) -> bytes:
     """
     Push a validated transaction onto the *processing* stream (fraud_queue).
-    The WorkerPool consumers drain this stream.
-    Returns the stream message ID.
+    The WorkerPool consumers drain this stream.  Adapter metadata travels
+    in its own ``meta`` field so ``payload`` is exactly a TransactionInput
+    (validated from bytes by the worker).
+    Returns the raw stream message ID.
     """
-    payload = json.dumps(tx_data, default=str)
-    msg_id = await redis_client.xadd(
-        settings.REDIS_STREAM_KEY,
-        {"payload": payload},
-    )
-    return msg_id.decode() if isinstance(msg_id, bytes) else str(msg_id)
+    fields = _payload_fields(tx_data)
+    if meta:
+        fields["meta"] = orjson.dumps(meta, default=str)
+    return await _xadd(redis_client, settings.REDIS_STREAM_KEY, fields)
 
 
 # ── Alerts (pub/sub) ────────────────────────────────────────
 
 async def publish_alert(
     redis_client: aioredis.Redis,
-    alert_data: Dict[str, Any],
+    alert_data: Payload,
 ) -> int:
     """
     Publish a fraud alert on the pub/sub channel.
     Returns the number of subscribers that received the message.
     """
-    payload = json.dumps(alert_data, default=str)
+    payload = _encode(alert_data)
     return await redis_client.publish(settings.REDIS_ALERTS_CHANNEL, payload)
 
 
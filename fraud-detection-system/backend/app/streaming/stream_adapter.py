@@ -25,16 +25,16 @@ XREADGROUP with a dedicated consumer name so messages are load-balanced.
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import time
 from typing import Any, Dict, List, Optional
 
+import orjson
 import redis.asyncio as aioredis
 
 from app.config import settings
 from app.models.transaction import TransactionInput
-from app.streaming.redis_stream import publish_to_fraud_queue
+from app.streaming.redis_stream import publish_to_fraud_queue, stream_payload
 
 logger = logging.getLogger(__name__)
 
@@ -148,13 +148,14 @@ class StreamAdapter:
                     consumername=name,
                     streams={stream: ">"},
                     count=settings.WORKER_BATCH_SIZE,
-                    block=1000,
+                    block=settings.WORKER_BLOCK_MS,
                 )
 
                 if not messages:
                     _idle += 1
-                    if _idle % 30 == 0:
-                        logger.debug("%s idle %ds, waiting on '%s'…", name, _idle, stream)
+                    if _idle % 6 == 0:
+                        logger.debug("%s idle %ds, waiting on '%s'…",
+                                     name, _idle * settings.WORKER_BLOCK_MS // 1000, stream)
                     continue
 
                 _idle = 0
@@ -185,24 +186,23 @@ class StreamAdapter:
         group = settings.REDIS_UPI_CONSUMER_GROUP
 
         try:
-            # 1. Decode raw Redis hash
-            decoded: Dict[str, str] = {
-                (k.decode() if isinstance(k, bytes) else k):
-                (v.decode() if isinstance(v, bytes) else v)
-                for k, v in data.items()
-            }
-
-            if "payload" in decoded:
-                tx_data: Dict[str, Any] = json.loads(decoded["payload"])
+            # 1. Decode raw Redis hash (orjson parses the payload bytes as-is)
+            raw = stream_payload(data)
+            if raw is not None:
+                tx_data: Dict[str, Any] = orjson.loads(raw)
             else:
-                tx_data = decoded
+                tx_data = {
+                    (k.decode() if isinstance(k, bytes) else k):
+                    (v.decode() if isinstance(v, bytes) else v)
+                    for k, v in data.items()
+                }
 
             # 2. Pull out adapter-level metadata (not part of TransactionInput)
             meta = tx_data.pop("_meta", {}) if isinstance(tx_data, dict) else {}
 
             # 3. Validate against TransactionInput schema
             try:
-                tx = TransactionInput(**tx_data)
+                tx = TransactionInput.model_validate(tx_data)
             except Exception as val_err:
                 self.validation_errors += 1
                 logger.warning(
@@ -213,14 +213,9 @@ class StreamAdapter:
                 await self.redis.xack(stream, group, msg_id)
                 return
 
-            # 4. Re-serialise the validated payload (round-trip through model)
-            #    This ensures the fraud_queue always has a clean, canonical shape.
-            clean_data = tx_data  # keep original dict (already validated)
-            if meta:
-                clean_data["_meta"] = meta  # carry metadata forward
-
-            # 5. Publish to fraud_queue
-            await publish_to_fraud_queue(self.redis, clean_data)
+            # 4. Publish the validated dict to fraud_queue; metadata goes in
+            #    its own stream field, not inside the payload
+            await publish_to_fraud_queue(self.redis, tx_data, meta)
 
             # 6. ACK on upi_raw
             await self.redis.xack(stream, group, msg_id)
@@ -35,6 +35,7 @@ SCHEMA_INDEXES: list[str] = [
     "CREATE INDEX idx_user_risk      IF NOT EXISTS FOR (u:User)        ON (u.risk_score)",
     "CREATE INDEX idx_user_dormant   IF NOT EXISTS FOR (u:User)        ON (u.is_dormant)",
     "CREATE INDEX idx_user_active    IF NOT EXISTS FOR (u:User)        ON (u.last_active)",
+    "CREATE INDEX idx_user_community IF NOT EXISTS FOR (u:User)        ON (u.community_id)",
     "CREATE INDEX idx_tx_ts          IF NOT EXISTS FOR (t:Transaction) ON (t.timestamp)",
     "CREATE INDEX idx_tx_risk        IF NOT EXISTS FOR (t:Transaction) ON (t.risk_score)",
     "CREATE INDEX idx_device_score   IF NOT EXISTS FOR (d:Device)      ON (d.device_score)",
@@ -60,11 +61,13 @@ MERGE (d:Device {device_id: $device_id})
                 d.device_type     = $device_type,
                 d.app_version     = $app_version,
                 d.capability_mask = $capability_mask,
+                d.capability_mask_int = $capability_mask_int,
                 d.created_at      = datetime()
   ON MATCH SET  d.os              = coalesce($device_os, d.os),
                 d.device_type     = coalesce($device_type, d.device_type),
                 d.app_version     = coalesce($app_version, d.app_version),
-                d.capability_mask = coalesce($capability_mask, d.capability_mask)
+                d.capability_mask = coalesce($capability_mask, d.capability_mask),
+                d.capability_mask_int = coalesce($capability_mask_int, d.capability_mask_int)
 
 MERGE (tx:Transaction {tx_id: $tx_id})
   ON CREATE SET tx.amount          = $amount,
@@ -91,10 +94,14 @@ MERGE  (s)-[edge:TRANSFERRED_TO]->(r)
                 edge.tx_count     = edge.tx_count + 1,
                 edge.last_tx      = datetime($timestamp)
 
-// Only touch last_active — no aggregation math in hot path
+// Only touch last_active + the O(1) hour histogram — no aggregation math in hot path
 SET s.last_active = datetime($timestamp),
     s.is_dormant  = false,
-    s.upi_id      = coalesce($sender_upi_id, s.upi_id)
+    s.upi_id      = coalesce($sender_upi_id, s.upi_id),
+    s.hour_hist   = [h IN range(0, 23) |
+                     coalesce(s.hour_hist[h], 0)
+                     + CASE WHEN h = datetime($timestamp).hour THEN 1 ELSE 0 END],
+    s.hour_total  = coalesce(s.hour_total, 0) + 1
 SET r.upi_id      = coalesce($receiver_upi_id, r.upi_id)
 
 RETURN tx.tx_id AS tx_id
@@ -135,11 +142,13 @@ MERGE (d:Device {device_id: $device_id})
                 d.device_type     = $device_type,
                 d.app_version     = $app_version,
                 d.capability_mask = $capability_mask,
+                d.capability_mask_int = $capability_mask_int,
                 d.created_at      = datetime()
   ON MATCH SET  d.os              = coalesce($device_os, d.os),
                 d.device_type     = coalesce($device_type, d.device_type),
                 d.app_version     = coalesce($app_version, d.app_version),
-                d.capability_mask = coalesce($capability_mask, d.capability_mask)
+                d.capability_mask = coalesce($capability_mask, d.capability_mask),
+                d.capability_mask_int = coalesce($capability_mask_int, d.capability_mask_int)
 
 MERGE (tx:Transaction {tx_id: $tx_id})
   ON CREATE SET tx.amount          = $amount,
@@ -166,6 +175,11 @@ MERGE  (s)-[edge:TRANSFERRED_TO]->(r)
                 edge.tx_count     = edge.tx_count + 1,
                 edge.last_tx      = datetime($timestamp)
 
+SET s.hour_hist  = [h IN range(0, 23) |
+                    coalesce(s.hour_hist[h], 0)
+                    + CASE WHEN h = datetime($timestamp).hour THEN 1 ELSE 0 END],
+    s.hour_total = coalesce(s.hour_total, 0) + 1
+
 RETURN tx.tx_id AS tx_id
 """
 
@@ -211,6 +225,7 @@ RETURN u.user_id AS user_id
 
 QUERY_USER_TX_HISTORY = """
 MATCH (u:User {user_id: $user_id})-[:SENT]->(tx:Transaction)
+USING INDEX u:User(user_id)
 RETURN tx.amount    AS amount,
        tx.timestamp AS timestamp
 ORDER BY tx.timestamp DESC
@@ -228,7 +243,9 @@ RETURN u.user_id        AS user_id,
        u.is_dormant     AS is_dormant,
        u.risk_score     AS risk_score,
        u.last_lat       AS last_lat,
-       u.last_lon       AS last_lon
+       u.last_lon       AS last_lon,
+       u.hour_hist      AS hour_hist,
+       u.hour_total     AS hour_total
 """
 
 QUERY_UPDATE_USER_STATS = """
@@ -286,6 +303,28 @@ RETURN u.user_id             AS user_id,
        count(to)             AS outflow_count
 """
 
+# ── Dormant-status + recent flow in one trip (legacy dead-account path) ──
+QUERY_DORMANT_BUNDLE = """
+MATCH (u:User {user_id: $user_id})
+USING INDEX u:User(user_id)
+CALL {
+  WITH u
+  OPTIONAL MATCH (u)<-[:RECEIVED_BY]-(ti:Transaction)
+    WHERE ti.timestamp > datetime() - duration({seconds: $window})
+  RETURN coalesce(sum(ti.amount), 0) AS recent_inflow, count(ti) AS inflow_count
+}
+CALL {
+  WITH u
+  OPTIONAL MATCH (u)-[:SENT]->(to:Transaction)
+    WHERE to.timestamp > datetime() - duration({seconds: $window})
+  RETURN coalesce(sum(to.amount), 0) AS recent_outflow, count(to) AS outflow_count
+}
+RETURN u {.user_id, .is_dormant, .last_active, .tx_count,
+          .avg_tx_amount, .std_tx_amount} AS profile,
+       {recent_inflow: recent_inflow, recent_outflow: recent_outflow,
+        inflow_count: inflow_count, outflow_count: outflow_count} AS flow
+"""
+
 # ==============================================================
 # QUERY – IP intelligence reads
 # ==============================================================
@@ -318,9 +357,44 @@ RETURN i.asn AS asn, count(i) AS usage_count
 ORDER BY usage_count DESC
 """
 
+# Batched variants – one round trip for a whole scoring batch.
+# ASNs with no accounts are omitted; callers default them to 0.
+QUERY_ASN_DENSITY_BATCH = """
+UNWIND $asns AS asn_number
+MATCH (u:User)-[:ACCESSED_FROM]->(i:IP)
+WHERE i.asn = asn_number
+RETURN asn_number AS asn, count(DISTINCT u) AS account_count
+"""
+
+QUERY_USER_ASN_HISTORY_BATCH = """
+UNWIND $user_ids AS uid
+MATCH (u:User {user_id: uid})-[:ACCESSED_FROM]->(i:IP)
+WHERE i.asn IS NOT NULL AND i.asn > 0
+RETURN uid AS user_id, i.asn AS asn, count(i) AS usage_count
+ORDER BY usage_count DESC
+"""
+
+# Snapshot variants – loaded once per graph-analytics cycle
+QUERY_ASN_DENSITY_ALL = """
+MATCH (u:User)-[:ACCESSED_FROM]->(i:IP)
+WHERE i.asn IS NOT NULL AND i.asn > 0
+RETURN i.asn AS asn, count(DISTINCT u) AS account_count
+"""
+
+QUERY_ACTIVE_USER_ASN_HISTORY = """
+MATCH (u:User)-[:SENT]->(tx:Transaction)
+WHERE tx.timestamp > datetime() - duration({seconds: $window_sec})
+WITH DISTINCT u LIMIT $max_users
+MATCH (u)-[:ACCESSED_FROM]->(i:IP)
+WHERE i.asn IS NOT NULL AND i.asn > 0
+RETURN u.user_id AS user_id, i.asn AS asn, count(i) AS usage_count
+ORDER BY usage_count DESC
+"""
+
 # ── First-strike dormant wakeup detection ────────────────────
 QUERY_DORMANT_WAKEUP = """
 MATCH (u:User {user_id: $user_id})
+USING INDEX u:User(user_id)
 WITH u,
      duration.between(u.last_active, datetime()).days AS days_slept
 OPTIONAL MATCH (u)-[:SENT]->(tx:Transaction)
@@ -360,6 +434,7 @@ RETURN d.device_id        AS device_id,
        d.device_type      AS device_type,
        d.app_version      AS app_version,
        d.capability_mask  AS capability_mask,
+       d.capability_mask_int AS capability_mask_int,
        d.device_score     AS device_score,
        acc_cnt            AS account_count,
        linked_users
@@ -418,6 +493,7 @@ ORDER BY d.created_at DESC
 
 QUERY_IP_ROTATION = """
 MATCH (u:User {user_id: $user_id})-[:ACCESSED_FROM]->(i:IP)
+USING INDEX u:User(user_id)
 RETURN count(DISTINCT i.ip_address) AS unique_ip_count,
        collect(DISTINCT i.ip_address) AS ip_list
 """
@@ -426,6 +502,7 @@ RETURN count(DISTINCT i.ip_address) AS unique_ip_count,
 
 QUERY_RECENT_AMOUNTS = """
 MATCH (u:User {user_id: $user_id})-[:SENT]->(tx:Transaction)
+USING INDEX u:User(user_id)
 WHERE tx.timestamp > datetime() - duration({hours: $window_hours})
 RETURN tx.amount AS amount
 ORDER BY tx.timestamp DESC
@@ -439,24 +516,183 @@ RETURN count(DISTINCT u.user_id) AS unique_users_24h,
        collect(DISTINCT u.user_id) AS user_list
 """
 
+# ── Device bundle: the per-tx device-risk reads in one trip ──
+# Same semantics as QUERY_DEVICE_INFO, QUERY_DEVICE_RISK_PROPAGATION and
+# QUERY_DEVICE_USERS_24H; QUERY_USER_DEVICE_HISTORY's known-device test is
+# `sender IN linked_users`.  Device-level only (cacheable); no row when
+# the device is unknown.
+QUERY_DEVICE_BUNDLE = """
+MATCH (d:Device {device_id: $device_id})
+CALL {
+  WITH d
+  OPTIONAL MATCH (d)<-[:USES_DEVICE]-(u:User)
+  RETURN count(u)          AS account_count,
+         collect(u.user_id) AS linked_users,
+         avg(u.risk_score) AS avg_user_risk,
+         max(u.risk_score) AS max_user_risk,
+         count(DISTINCT CASE WHEN u.last_active > datetime() - duration({hours: 24})
+                             THEN u.user_id END) AS unique_users_24h
+}
+RETURN d.device_id        AS device_id,
+       d.os               AS os,
+       d.capability_mask  AS capability_mask,
+       d.capability_mask_int AS capability_mask_int,
+       account_count,
+       linked_users,
+       avg_user_risk,
+       max_user_risk,
+       unique_users_24h,
+       CASE
+         WHEN account_count >= 5           THEN 100.0
+         WHEN account_count >= 3           THEN 70.0
+         WHEN max_user_risk > 80           THEN 60.0
+         ELSE coalesce(avg_user_risk * 0.5, 0)
+       END AS device_risk_score
+"""
+
+# Micro-batch form (MicroBatcher): one row per known id in $device_ids
+QUERY_DEVICE_BUNDLE_BATCH = """
+UNWIND $device_ids AS did
+MATCH (d:Device {device_id: did})
+CALL {
+  WITH d
+  OPTIONAL MATCH (d)<-[:USES_DEVICE]-(u:User)
+  RETURN count(u)          AS account_count,
+         collect(u.user_id) AS linked_users,
+         avg(u.risk_score) AS avg_user_risk,
+         max(u.risk_score) AS max_user_risk,
+         count(DISTINCT CASE WHEN u.last_active > datetime() - duration({hours: 24})
+                             THEN u.user_id END) AS unique_users_24h
+}
+RETURN d.device_id        AS device_id,
+       d.os               AS os,
+       d.capability_mask  AS capability_mask,
+       d.capability_mask_int AS capability_mask_int,
+       account_count,
+       linked_users,
+       avg_user_risk,
+       max_user_risk,
+       unique_users_24h,
+       CASE
+         WHEN account_count >= 5           THEN 100.0
+         WHEN account_count >= 3           THEN 70.0
+         WHEN max_user_risk > 80           THEN 60.0
+         ELSE coalesce(avg_user_risk * 0.5, 0)
+       END AS device_risk_score
+"""
+
+# 24-slot send-hour histogram maintained by INGEST_TRANSACTION(_SAFE);
+# a property read, no aggregation over :SENT
 QUERY_USER_HOUR_DISTRIBUTION = """
-MATCH (u:User {user_id: $user_id})-[:SENT]->(tx:Transaction)
-RETURN tx.timestamp.hour AS hour, count(tx) AS cnt
-ORDER BY hour
+MATCH (u:User {user_id: $user_id})
+RETURN coalesce(u.hour_hist, [h IN range(0, 23) | 0]) AS hist,
+       coalesce(u.hour_total, 0)                      AS total
 """
 
 QUERY_IDENTICAL_TX_RECEIVER = """
 MATCH (u:User {user_id: $sender_id})-[:SENT]->(tx:Transaction)
       -[:RECEIVED_BY]->(r:User {user_id: $receiver_id})
+USING INDEX u:User(user_id)
 WHERE tx.timestamp > datetime() - duration({hours: $window_hours})
   AND abs(tx.amount - $amount) < 1.0
 RETURN count(tx) AS identical_count
 """
 
+# ── Behavioural bundle: the per-tx behavioural reads in one trip ──
+# Same semantics as QUERY_USER_TX_HISTORY, QUERY_USER_PROFILE,
+# QUERY_IP_ROTATION and QUERY_IDENTICAL_TX_RECEIVER; always returns
+# exactly one row.  The hour histogram rides on the profile map
+# (u.hour_hist / u.hour_total) and recent amounts (QUERY_RECENT_AMOUNTS)
+# are derived from the cached tx window.
+QUERY_BEHAVIORAL_BUNDLE = """
+CALL {
+  MATCH (u:User {user_id: $user_id})-[:SENT]->(tx:Transaction)
+  USING INDEX u:User(user_id)
+  WITH tx ORDER BY tx.timestamp DESC LIMIT $history_limit
+  RETURN collect({amount: tx.amount, timestamp: tx.timestamp}) AS history
+}
+CALL {
+  OPTIONAL MATCH (u:User {user_id: $user_id})
+  USING INDEX u:User(user_id)
+  RETURN u {.user_id, .avg_tx_amount, .std_tx_amount, .tx_count,
+            .total_outflow, .last_active, .is_dormant, .risk_score,
+            .last_lat, .last_lon, .hour_hist, .hour_total} AS profile
+}
+CALL {
+  MATCH (u:User {user_id: $user_id})-[:ACCESSED_FROM]->(i:IP)
+  USING INDEX u:User(user_id)
+  RETURN count(DISTINCT i.ip_address) AS unique_ip_count
+}
+CALL {
+  MATCH (u:User {user_id: $user_id})-[:SENT]->(tx:Transaction)
+        -[:RECEIVED_BY]->(r:User {user_id: $receiver_id})
+  USING INDEX u:User(user_id)
+  WHERE tx.timestamp > datetime() - duration({hours: $tx_identicality_window})
+    AND abs(tx.amount - $amount) < 1.0
+  RETURN count(tx) AS identical_count
+}
+RETURN history, profile, unique_ip_count, identical_count
+"""
+
+# Same bundle minus history / profile (served by UserBaselineCache)
+QUERY_BEHAVIORAL_BUNDLE_LEAN = """
+CALL {
+  MATCH (u:User {user_id: $user_id})-[:ACCESSED_FROM]->(i:IP)
+  USING INDEX u:User(user_id)
+  RETURN count(DISTINCT i.ip_address) AS unique_ip_count
+}
+CALL {
+  MATCH (u:User {user_id: $user_id})-[:SENT]->(tx:Transaction)
+        -[:RECEIVED_BY]->(r:User {user_id: $receiver_id})
+  USING INDEX u:User(user_id)
+  WHERE tx.timestamp > datetime() - duration({hours: $tx_identicality_window})
+    AND abs(tx.amount - $amount) < 1.0
+  RETURN count(tx) AS identical_count
+}
+RETURN unique_ip_count, identical_count
+"""
+
+# Micro-batch form: one row per $items entry {ix, user_id, receiver_id,
+# amount, with_baseline}; history / profile only where with_baseline
+QUERY_BEHAVIORAL_BUNDLE_BATCH = """
+UNWIND $items AS item
+CALL {
+  WITH item
+  WITH item WHERE item.with_baseline
+  MATCH (u:User {user_id: item.user_id})-[:SENT]->(tx:Transaction)
+  WITH tx ORDER BY tx.timestamp DESC LIMIT $history_limit
+  RETURN collect({amount: tx.amount, timestamp: tx.timestamp}) AS history
+}
+CALL {
+  WITH item
+  OPTIONAL MATCH (u:User {user_id: item.user_id})
+  WHERE item.with_baseline
+  RETURN u {.user_id, .avg_tx_amount, .std_tx_amount, .tx_count,
+            .total_outflow, .last_active, .is_dormant, .risk_score,
+            .last_lat, .last_lon, .hour_hist, .hour_total} AS profile
+}
+CALL {
+  WITH item
+  MATCH (u:User {user_id: item.user_id})-[:ACCESSED_FROM]->(i:IP)
+  RETURN count(DISTINCT i.ip_address) AS unique_ip_count
+}
+CALL {
+  WITH item
+  MATCH (u:User {user_id: item.user_id})-[:SENT]->(tx:Transaction)
+        -[:RECEIVED_BY]->(r:User {user_id: item.receiver_id})
+  WHERE tx.timestamp > datetime() - duration({hours: $tx_identicality_window})
+    AND abs(tx.amount - item.amount) < 1.0
+  RETURN count(tx) AS identical_count
+}
+RETURN item.ix AS ix, history, profile, unique_ip_count, identical_count
+"""
+
 # ==============================================================
 # QUERY – graph-intelligence (per-user, fast-path)
 # ==============================================================
 
+# Numeric columns are never null (coalesced / toFloat here), so the
+# extractor indexes rows directly.
 QUERY_USER_GRAPH_FEATURES = """
 MATCH (u:User {user_id: $user_id})
 OPTIONAL MATCH (u)-[:TRANSFERRED_TO]->(out_n:User)
@@ -472,34 +708,75 @@ RETURN u.user_id          AS user_id,
        in_degree,
        out_degree,
        u.community_id     AS community_id,
-       u.betweenness       AS betweenness,
-       u.clustering_coeff  AS clustering_coeff,
-       u.pagerank          AS pagerank,
-       CASE WHEN size(out_risks) > 0
-            THEN reduce(s=0.0, r IN out_risks | s+r)/size(out_risks)
-            ELSE 0.0 END   AS avg_neighbor_risk,
+       toFloat(coalesce(u.betweenness, 0.0))      AS betweenness,
+       toFloat(coalesce(u.clustering_coeff, 0.0)) AS clustering_coeff,
+       toFloat(coalesce(u.pagerank, 0.0))         AS pagerank,
+       coalesce(CASE WHEN size(out_risks) > 0
+                     THEN reduce(s=0.0, r IN out_risks | s+r)/size(out_risks)
+                END, 0.0)  AS avg_neighbor_risk,
+       d.device_id         AS device_id,
+       d.account_count     AS device_account_count
+"""
+
+# Micro-batch form: one row per known id in $user_ids (first device only)
+QUERY_USER_GRAPH_FEATURES_BATCH = """
+UNWIND $user_ids AS uid
+MATCH (u:User {user_id: uid})
+CALL {
+  WITH u
+  OPTIONAL MATCH (u)-[:TRANSFERRED_TO]->(out_n:User)
+  RETURN count(DISTINCT out_n)     AS out_degree,
+         collect(out_n.risk_score) AS out_risks
+}
+CALL {
+  WITH u
+  OPTIONAL MATCH (in_n:User)-[:TRANSFERRED_TO]->(u)
+  RETURN count(DISTINCT in_n) AS in_degree
+}
+CALL {
+  WITH u
+  OPTIONAL MATCH (u)-[:USES_DEVICE]->(d:Device)
+  RETURN d LIMIT 1
+}
+RETURN u.user_id          AS user_id,
+       in_degree,
+       out_degree,
+       u.community_id     AS community_id,
+       toFloat(coalesce(u.betweenness, 0.0))      AS betweenness,
+       toFloat(coalesce(u.clustering_coeff, 0.0)) AS clustering_coeff,
+       toFloat(coalesce(u.pagerank, 0.0))         AS pagerank,
+       coalesce(CASE WHEN size(out_risks) > 0
+                     THEN reduce(s=0.0, r IN out_risks | s+r)/size(out_risks)
+                END, 0.0)  AS avg_neighbor_risk,
        d.device_id         AS device_id,
        d.account_count     AS device_account_count
 """
 
+# community_risk is GraphIntelligenceExtractor's community sub-score,
+# derived here so the cached community:{id} row carries it ready-made:
+# dense high-risk cluster → avg risk (≤100), else ≥2 high-risk members → 40
 QUERY_COMMUNITY_STATS = """
 MATCH (u:User)
 WHERE u.community_id = $community_id
-WITH collect(u) AS members, count(u) AS cnt
-WITH members, cnt,
-     [m IN members | m.risk_score]                  AS risks,
-     [m IN members | m.total_inflow + m.total_outflow] AS volumes
-RETURN $community_id AS community_id,
-       cnt           AS member_count,
-       reduce(s=0.0, r IN risks | s+r)/cnt          AS avg_risk,
-       reduce(s=0.0, v IN volumes | s+v)            AS total_volume,
-       size([r IN risks WHERE r > 70])               AS high_risk_count
+WITH count(u)                                        AS cnt,
+     avg(coalesce(u.risk_score, 0.0))                AS avg_risk,
+     count(CASE WHEN u.risk_score > 70 THEN 1 END)   AS high_risk_count
+RETURN $community_id   AS community_id,
+       cnt             AS member_count,
+       avg_risk,
+       high_risk_count,
+       CASE
+         WHEN cnt >= 3 AND avg_risk > 50 THEN CASE WHEN avg_risk < 100 THEN avg_risk ELSE 100.0 END
+         WHEN high_risk_count >= 2       THEN 40.0
+         ELSE 0.0
+       END             AS community_risk
 """
 
 # ==============================================================
 # QUERY – velocity reads
 # ==============================================================
 
+# Every column is non-null: MATCH guarantees ≥1 send, the rest coalesce.
 QUERY_VELOCITY_FEATURES = """
 MATCH (u:User {user_id: $user_id})-[:SENT]->(txo:Transaction)
   WHERE txo.timestamp > datetime() - duration({seconds: $window})
@@ -511,14 +788,43 @@ OPTIONAL MATCH (u)<-[:RECEIVED_BY]-(txi:Transaction)
 RETURN u.user_id       AS user_id,
        send_cnt        AS send_count,
        count(txi)      AS receive_count,
-       total_sent      AS total_sent_window,
-       coalesce(sum(txi.amount), 0) AS total_received_window,
+       toFloat(total_sent) AS total_sent_window,
+       toFloat(coalesce(sum(txi.amount), 0)) AS total_received_window,
        CASE WHEN coalesce(sum(txi.amount), 0) > 0
             THEN total_sent / sum(txi.amount)
             ELSE 0.0 END AS outflow_inflow_ratio,
        send_cnt + count(txi) AS total_activity
 """
 
+# Micro-batch form: one row per id in $user_ids with ≥1 send in the
+# window (QUERY_VELOCITY_FEATURES returns no row otherwise)
+QUERY_VELOCITY_FEATURES_BATCH = """
+UNWIND $user_ids AS uid
+MATCH (u:User {user_id: uid})
+CALL {
+  WITH u
+  MATCH (u)-[:SENT]->(txo:Transaction)
+    WHERE txo.timestamp > datetime() - duration({seconds: $window})
+  RETURN count(txo) AS send_cnt, sum(txo.amount) AS total_sent
+}
+WITH u, send_cnt, total_sent WHERE send_cnt > 0
+CALL {
+  WITH u
+  OPTIONAL MATCH (u)<-[:RECEIVED_BY]-(txi:Transaction)
+    WHERE txi.timestamp > datetime() - duration({seconds: $window})
+  RETURN count(txi) AS receive_cnt, coalesce(sum(txi.amount), 0) AS total_received
+}
+RETURN u.user_id       AS user_id,
+       send_cnt        AS send_count,
+       receive_cnt     AS receive_count,
+       toFloat(total_sent)     AS total_sent_window,
+       toFloat(total_received) AS total_received_window,
+       CASE WHEN total_received > 0
+            THEN total_sent / total_received
+            ELSE 0.0 END AS outflow_inflow_ratio,
+       send_cnt + receive_cnt AS total_activity
+"""
+
 # ==============================================================
 # GDS – batch graph analytics (run every N seconds)
 # ==============================================================
@@ -819,6 +1125,55 @@ ORDER BY flow_ratio DESC
 LIMIT 50
 """
 
+# ── All six collusion detectors in one transaction ───────────
+# Each detector runs as a CALL subquery and is collected into a list of
+# row maps, so refresh() pays for one planning pass and one round trip.
+# Params: union of the six detectors' params.
+DETECT_ALL_COLLUSION = f"""
+CALL {{
+  CALL {{ {DETECT_FRAUD_ISLANDS} }}
+  RETURN collect({{cluster_id: cluster_id, member_count: member_count,
+                  avg_risk: avg_risk, member_ids: member_ids,
+                  high_risk_members: high_risk_members}}) AS fraud_islands
+}}
+CALL {{
+  CALL {{ {DETECT_MONEY_ROUTERS} }}
+  RETURN collect({{user_id: user_id, betweenness: betweenness,
+                  risk_score: risk_score, total_inflow: total_inflow,
+                  total_outflow: total_outflow, community_id: community_id,
+                  tx_count: tx_count}}) AS money_routers
+}}
+CALL {{
+  CALL {{ {DETECT_CIRCULAR_FLOWS} }}
+  RETURN collect({{node_a: node_a, node_b: node_b, node_c: node_c,
+                  flow_ab: flow_ab, flow_bc: flow_bc, flow_ca: flow_ca,
+                  total_circular_flow: total_circular_flow}}) AS circular_flows
+}}
+CALL {{
+  CALL {{ {DETECT_RAPID_CHAINS} }}
+  RETURN collect({{chain_start: chain_start, chain_end: chain_end,
+                  chain_nodes: chain_nodes, depth: depth,
+                  total_flow: total_flow}}) AS rapid_chains
+}}
+CALL {{
+  CALL {{ {DETECT_STAR_HUBS} }}
+  RETURN collect({{user_id: user_id, in_degree: in_degree,
+                  out_degree: out_degree, total_inflow: total_inflow,
+                  total_outflow: total_outflow, risk_score: risk_score,
+                  hub_type: hub_type}}) AS star_hubs
+}}
+CALL {{
+  CALL {{ {DETECT_RELAY_MULE} }}
+  RETURN collect({{user_id: user_id, total_inflow_10m: total_inflow_10m,
+                  total_outflow_10m: total_outflow_10m, flow_ratio: flow_ratio,
+                  tx_count_10m: tx_count_10m, risk_score: risk_score,
+                  community_id: community_id,
+                  relay_type: relay_type}}) AS relay_mules
+}}
+RETURN fraud_islands, money_routers, circular_flows,
+       rapid_chains, star_hubs, relay_mules
+"""
+
 # ── Background batch user-stats aggregation ──────────────────
 # Runs outside hot path (in graph_analyzer batch loop)
 BATCH_UPDATE_USER_STATS = """
@@ -908,14 +1263,99 @@ RETURN total_tx, total_amount, avg_risk, flagged,
 
 MAINT_CLEAR_ALL = "MATCH (n) DETACH DELETE n"
 
+# Single-label / single-type counts are answered from the count store
+# (NodeCountFromCountStore / RelationshipCountFromCountStore) – O(labels),
+# not a scan of every node or relationship
 MAINT_COUNT_NODES = """
-MATCH (n)
-RETURN labels(n)[0] AS label, count(n) AS count
+CALL {
+  MATCH (n:User)        RETURN 'User' AS label, count(n) AS count
+  UNION ALL
+  MATCH (n:Device)      RETURN 'Device' AS label, count(n) AS count
+  UNION ALL
+  MATCH (n:IP)          RETURN 'IP' AS label, count(n) AS count
+  UNION ALL
+  MATCH (n:Transaction) RETURN 'Transaction' AS label, count(n) AS count
+  UNION ALL
+  MATCH (n:Cluster)     RETURN 'Cluster' AS label, count(n) AS count
+}
+RETURN label, count
 ORDER BY count DESC
 """
 
 MAINT_COUNT_RELS = """
-MATCH ()-[r]->()
-RETURN type(r) AS type, count(r) AS count
+CALL {
+  MATCH ()-[r:SENT]->()           RETURN 'SENT' AS type, count(r) AS count
+  UNION ALL
+  MATCH ()-[r:RECEIVED_BY]->()    RETURN 'RECEIVED_BY' AS type, count(r) AS count
+  UNION ALL
+  MATCH ()-[r:TRANSFERRED_TO]->() RETURN 'TRANSFERRED_TO' AS type, count(r) AS count
+  UNION ALL
+  MATCH ()-[r:USES_DEVICE]->()    RETURN 'USES_DEVICE' AS type, count(r) AS count
+  UNION ALL
+  MATCH ()-[r:ACCESSED_FROM]->()  RETURN 'ACCESSED_FROM' AS type, count(r) AS count
+}
+RETURN type, count
 ORDER BY count DESC
 """
+
+# One-off backfill of u.hour_hist / u.hour_total for Users written before
+# the ingest path maintained them; run by scripts/setup_neo4j.py
+# (auto-commit only: CALL IN TRANSACTIONS)
+MAINT_BACKFILL_HOUR_HIST = """
+MATCH (u:User) WHERE u.hour_hist IS NULL
+CALL {
+  WITH u
+  OPTIONAL MATCH (u)-[:SENT]->(tx:Transaction)
+  WITH u, collect(tx.timestamp.hour) AS hours
+  SET u.hour_hist  = [h IN range(0, 23) | size([x IN hours WHERE x = h])],
+      u.hour_total = size(hours)
+} IN TRANSACTIONS OF 1000 ROWS
+"""
+
+# ==============================================================
+# Hot-path queries EXPLAIN-ed at startup (plan cache warm-up +
+# index-seek check).  Anchored on the User(user_id) / Device(device_id)
+# unique indexes.
+# ==============================================================
+
+HOT_PATH_QUERIES: dict[str, str] = {
+    "QUERY_BEHAVIORAL_BUNDLE": QUERY_BEHAVIORAL_BUNDLE,
+    "QUERY_BEHAVIORAL_BUNDLE_LEAN": QUERY_BEHAVIORAL_BUNDLE_LEAN,
+    "QUERY_USER_TX_HISTORY": QUERY_USER_TX_HISTORY,
+    "QUERY_IP_ROTATION": QUERY_IP_ROTATION,
+    "QUERY_USER_HOUR_DISTRIBUTION": QUERY_USER_HOUR_DISTRIBUTION,
+    "QUERY_IDENTICAL_TX_RECEIVER": QUERY_IDENTICAL_TX_RECEIVER,
+    "QUERY_DORMANT_WAKEUP": QUERY_DORMANT_WAKEUP,
+    "QUERY_DORMANT_BUNDLE": QUERY_DORMANT_BUNDLE,
+    "QUERY_DEVICE_BUNDLE": QUERY_DEVICE_BUNDLE,
+    "QUERY_DEVICE_INFO": QUERY_DEVICE_INFO,
+    "QUERY_USER_DEVICE_HISTORY": QUERY_USER_DEVICE_HISTORY,
+    "QUERY_DEVICE_RISK_PROPAGATION": QUERY_DEVICE_RISK_PROPAGATION,
+    "QUERY_DEVICE_USERS_24H": QUERY_DEVICE_USERS_24H,
+    "QUERY_USER_GRAPH_FEATURES": QUERY_USER_GRAPH_FEATURES,
+    "QUERY_COMMUNITY_STATS": QUERY_COMMUNITY_STATS,
+    "QUERY_VELOCITY_FEATURES": QUERY_VELOCITY_FEATURES,
+    "QUERY_DEVICE_BUNDLE_BATCH": QUERY_DEVICE_BUNDLE_BATCH,
+    "QUERY_USER_GRAPH_FEATURES_BATCH": QUERY_USER_GRAPH_FEATURES_BATCH,
+    "QUERY_VELOCITY_FEATURES_BATCH": QUERY_VELOCITY_FEATURES_BATCH,
+}
+
+# One dummy value per hot-path parameter (unused ones are ignored by the
+# server): each query is also run once with these so its exact text is in
+# the plan cache.  The ids match nothing, so every run is a single seek.
+HOT_PATH_WARMUP_PARAMS: dict = {
+    "user_id": "__warmup__",
+    "user_ids": ["__warmup__"],
+    "device_ids": ["__warmup__"],
+    "sender_id": "__warmup__",
+    "receiver_id": "__warmup__",
+    "device_id": "__warmup__",
+    "community_id": -1,
+    "amount": 0.0,
+    "limit": 1,
+    "history_limit": 1,
+    "window": 60,
+    "window_hours": 1,
+    "tx_identicality_window": 1,
+    "dormant_days": 30,
+}
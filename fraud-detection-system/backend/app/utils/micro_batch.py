@@ -0,0 +1,79 @@
+"""
+Micro-batch coalescer for keyed Neo4j reads.
+
+Concurrent ``load(key)`` calls made within ``window_ms`` of the first one
+(or until ``max_batch`` distinct keys are pending) are answered by a single
+``fetch_many(keys)`` call – one UNWIND round trip instead of one per tx.
+Duplicate keys in a window share one future.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FetchMany = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class MicroBatcher:
+    """Coalesce keyed lookups into batched ``fetch_many`` calls."""
+
+    def __init__(self, fetch_many: FetchMany, window_ms: float, max_batch: int) -> None:
+        self._fetch_many = fetch_many
+        self._window_sec = max(window_ms, 0) / 1000.0
+        self._max_batch = max(max_batch, 1)
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()
+        self.batches = 0
+        self.keys = 0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.keys / self.batches if self.batches else 0.0
+
+    async def load(self, key: Hashable) -> Any:
+        """``fetch_many``'s value for *key* (None if absent)."""
+        # shield: one caller's cancellation must not cancel a shared future
+        return await asyncio.shield(self._submit(key))
+
+    def _submit(self, key: Hashable) -> "asyncio.Future[Any]":
+        fut = self._pending.get(key)
+        if fut is not None:
+            return fut
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending[key] = fut
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window_sec, self._flush)
+        return fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._run(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, batch: Dict[Hashable, asyncio.Future]) -> None:
+        self.batches += 1
+        self.keys += len(batch)
+        try:
+            results = await self._fetch_many(list(batch))
+        except Exception as exc:  # noqa: BLE001
+            for fut in batch.values():
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        for key, fut in batch.items():
+            if not fut.done():
+                fut.set_result(results.get(key))
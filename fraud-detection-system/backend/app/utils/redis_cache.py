@@ -0,0 +1,82 @@
+"""
+Redis cache-aside for hot, slow-changing graph entities.
+
+Keys are ``<namespace>:<id>`` (``dev:<device_id>``, ``community:<id>``)
+holding orjson-encoded rows with a per-namespace TTL.  Redis is an
+optimisation only: any Redis error is treated as a miss and scoring falls
+through to Neo4j.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class RedisEntityCache:
+    """Cache-aside wrapper around an async Redis client with hit / miss counters."""
+
+    def __init__(self, redis_client) -> None:
+        self.redis = redis_client
+        self._hits: Dict[str, int] = defaultdict(int)
+        self._misses: Dict[str, int] = defaultdict(int)
+
+    async def get(self, namespace: str, key: Any) -> Optional[Any]:
+        """Decoded value for ``namespace:key``, or None on miss / Redis error."""
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(f"{namespace}:{key}")
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Redis cache get failed (%s:%s): %s", namespace, key, exc)
+            raw = None
+        if raw is None:
+            self._misses[namespace] += 1
+            return None
+        self._hits[namespace] += 1
+        return orjson.loads(raw)
+
+    async def set(self, namespace: str, key: Any, value: Any, ttl_sec: int) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.setex(
+                f"{namespace}:{key}", ttl_sec, orjson.dumps(value, default=str)
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Redis cache set failed (%s:%s): %s", namespace, key, exc)
+
+    async def invalidate(self, namespace: str) -> int:
+        """Drop every key in *namespace*; returns the number deleted."""
+        if self.redis is None:
+            return 0
+        deleted = 0
+        try:
+            batch = []
+            async for k in self.redis.scan_iter(match=f"{namespace}:*", count=500):
+                batch.append(k)
+                if len(batch) >= 500:
+                    deleted += await self.redis.unlink(*batch)
+                    batch.clear()
+            if batch:
+                deleted += await self.redis.unlink(*batch)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Redis cache invalidation failed (%s): %s", namespace, exc)
+        return deleted
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        out: Dict[str, Dict[str, float]] = {}
+        for ns in sorted(set(self._hits) | set(self._misses)):
+            hits, misses = self._hits[ns], self._misses[ns]
+            total = hits + misses
+            out[ns] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+            }
+        return out
@@ -14,7 +14,7 @@ import logging
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
 
 from app.config import settings
-from app.streaming.redis_stream import get_redis_client
+from app.streaming.redis_stream import close_redis_client, get_redis_client
 from app.streaming.transaction_simulator import TransactionSimulator
 
 
@@ -80,7 +80,7 @@ async def run(total_tx: int, tps: int):
     stream_len = await redis_client.xlen(settings.REDIS_STREAM_KEY)
     logger.info(f"Redis stream length: {stream_len}")
 
-    await redis_client.close()
+    await close_redis_client()
     logger.info("Simulation complete")
 
 
@@ -329,6 +329,7 @@ def main():
                     d.device_type     = $device_type,
                     d.app_version     = $app_version,
                     d.capability_mask = $cap_mask,
+                    d.capability_mask_int = $cap_mask_int,
                     d.device_score    = 0.0,
                     d.account_count   = 0,
                     d.created_at      = datetime()
@@ -337,6 +338,7 @@ def main():
                     "dev_id": dev_id, "os": dev_os,
                     "device_type": dev_type, "app_version": app_ver,
                     "cap_mask": cap_mask,
+                    "cap_mask_int": int(cap_mask, 2) if cap_mask else None,
                 },
             )
         print(f"   {len(DEVICES)} devices created\n")
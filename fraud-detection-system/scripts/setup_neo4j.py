@@ -7,6 +7,7 @@ Usage:
     python scripts/setup_neo4j.py          # from backend/
 """
 
+import asyncio
 import sys
 import os
 
@@ -15,27 +16,30 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
 
 from app.config import settings
 from app.neo4j_manager import Neo4jManager
-from app.utils.cypher_queries import SCHEMA_CONSTRAINTS, SCHEMA_INDEXES, MAINT_COUNT_NODES
+from app.utils.cypher_queries import (
+    SCHEMA_CONSTRAINTS,
+    SCHEMA_INDEXES,
+    MAINT_BACKFILL_HOUR_HIST,
+    MAINT_COUNT_NODES,
+)
 
 
-def main():
+async def main():
     print(f"🔗 Connecting to Neo4j at {settings.NEO4J_URI} …")
     neo4j = Neo4jManager.get_instance()
 
-    # Use sync driver only (no event loop)
-    from neo4j import GraphDatabase
-
-    neo4j._driver = GraphDatabase.driver(
-        settings.NEO4J_URI,
-        auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
-        max_connection_pool_size=settings.NEO4J_MAX_POOL_SIZE,
-    )
-    neo4j._driver.verify_connectivity()
+    # Schema setup runs on the async driver (statements issued concurrently)
+    await neo4j.connect()
     print("✅ Connected")
 
     # Setup schema
     print("\n📋 Setting up schema …")
-    neo4j.setup_schema(SCHEMA_CONSTRAINTS, SCHEMA_INDEXES)
+    await neo4j.setup_schema(SCHEMA_CONSTRAINTS, SCHEMA_INDEXES)
+
+    # Backfill hour histograms for Users ingested before hour_hist was
+    # maintained on write (auto-commit: CALL IN TRANSACTIONS)
+    print("\n🕒 Backfilling hour histograms …")
+    await neo4j.run_async(MAINT_BACKFILL_HOUR_HIST)
 
     # Verify
     print("\n📊 Current node counts:")
@@ -46,9 +50,9 @@ def main():
     else:
         print("   (no nodes yet)")
 
-    neo4j._driver.close()
+    await neo4j.close()
     print("\n✅ Neo4j setup complete!")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())